@@ -0,0 +1,322 @@
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import sqlite3
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from output import CardHtmlWriter
+
+
+# Card HTML archive: every card's outerHTML is zlib-compressed on its own and appended to one data file;
+# a SQLite index maps activity URN -> (offset, length) and records which profiles each card appeared on.
+# A card whose HTML is unchanged since an earlier run is not stored again. Readers mmap the data file and
+# decompress only the cards they ask for.
+# All cards share one preset dictionary (built from the first cards archived), which is what makes
+# compressing ~5 KB snippets one by one worthwhile: most of their markup is the same.
+
+MAGIC = b"LICARDS1"
+LEVEL = 6
+ZDICT_BYTES = 32 * 1024  # zlib's window; a longer dictionary is not used
+ZDICT_SAMPLE_CARDS = 32
+FLUSH_EVERY = 64
+URN_RE = re.compile(r'data-urn="(urn:li:activity:\d+)"')
+# Ember ids change on every page load; they are ignored when comparing a card with its archived copy
+VOLATILE_RE = re.compile(r"ember\d+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value BLOB
+);
+CREATE TABLE IF NOT EXISTS cards (
+    urn TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    sha1 TEXT NOT NULL,
+    versions INTEGER NOT NULL DEFAULT 1,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profile_cards (
+    profileUrl TEXT NOT NULL,
+    urn TEXT NOT NULL,
+    run_at REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (profileUrl, urn)
+);
+CREATE INDEX IF NOT EXISTS idx_profile_cards_profile ON profile_cards (profileUrl, run_at, position);
+"""
+
+
+def card_urn(html: str) -> str:
+    # The card's own data-urn sits in its opening tag; cards without one are keyed by content
+    m = URN_RE.search(html, 0, 4096) or URN_RE.search(html)
+    if m:
+        return m.group(1)
+    return "sha1:" + hashlib.sha1(html.encode("utf-8")).hexdigest()
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha1(VOLATILE_RE.sub("ember", html).encode("utf-8")).hexdigest()
+
+
+def build_zdict(samples: List[str]) -> bytes:
+    # zlib looks for matches nearest the end of the dictionary first, so the sample cards go last
+    data = "".join(samples).encode("utf-8")
+    return data[-ZDICT_BYTES:]
+
+
+def index_path(path: str) -> str:
+    return path + ".idx"
+
+
+class CardArchive:
+    def __init__(self, path: str):
+        self.path = path
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+        # Autocommit mode: appends run inside BEGIN IMMEDIATE, which also serializes writers of the data file
+        self.conn = sqlite3.connect(index_path(path), timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._zdict: Optional[bytes] = None
+        self._mm: Optional[mmap.mmap] = None
+        self._fd: Optional[int] = None
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            os.close(self._fd)
+            self._mm = None
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def zdict(self) -> Optional[bytes]:
+        if self._zdict is None:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'zdict'").fetchone()
+            if row is not None:
+                self._zdict = bytes(row[0])
+        return self._zdict
+
+    def _compress(self, html: str, zdict: bytes) -> bytes:
+        c = zlib.compressobj(LEVEL, zlib.DEFLATED, -15, zdict=zdict)
+        return c.compress(html.encode("utf-8")) + c.flush()
+
+    def _decompress(self, blob: bytes) -> str:
+        zdict = self.zdict()
+        d = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+        return (d.decompress(blob) + d.flush()).decode("utf-8")
+
+    def write(self, profile_url: str, cards: List[Tuple[str, str]], run_at: float, start: int) -> Dict[str, int]:
+        # cards: (urn, html) in feed order from position start. Returns {"stored", "unchanged"}.
+        stats = {"stored": 0, "unchanged": 0}
+        if not cards:
+            return stats
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Cached on self only once committed: after a rollback it would compress later cards with a
+            # dictionary that never reached the index
+            zdict = self.zdict()
+            if zdict is None:
+                zdict = build_zdict([html for _, html in cards[:ZDICT_SAMPLE_CARDS]])
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('zdict', ?)", (zdict,))
+            urns = [u for u, _ in cards]
+            known = dict(self.conn.execute(f"SELECT urn, sha1 FROM cards WHERE urn IN ({', '.join('?' * len(urns))})", urns))
+            new_rows = []
+            blobs = []
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                for urn, html in cards:
+                    sha = content_hash(html)
+                    if known.get(urn) == sha:
+                        stats["unchanged"] += 1
+                        continue
+                    known[urn] = sha
+                    blob = self._compress(html, zdict)
+                    new_rows.append((urn, offset, len(blob), len(html.encode("utf-8")), sha, run_at, run_at))
+                    blobs.append(blob)
+                    offset += len(blob)
+                # One write per batch; the index below only points at it once the bytes are there
+                if blobs:
+                    f.write(b"".join(blobs))
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.conn.executemany(
+                "INSERT INTO cards (urn, offset, length, size, sha1, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(urn) DO UPDATE SET offset = excluded.offset, length = excluded.length, size = excluded.size, "
+                "sha1 = excluded.sha1, versions = versions + 1, last_seen = excluded.last_seen",
+                new_rows,
+            )
+            self.conn.executemany(
+                "UPDATE cards SET last_seen = ? WHERE urn = ?",
+                [(run_at, u) for u in urns],
+            )
+            self.conn.executemany(
+                "INSERT INTO profile_cards (profileUrl, urn, run_at, position) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(profileUrl, urn) DO UPDATE SET run_at = excluded.run_at, position = excluded.position",
+                [(profile_url, u, run_at, i) for i, u in enumerate(urns, start=start)],
+            )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self._zdict = zdict
+        stats["stored"] = len(new_rows)
+        return stats
+
+    def writer(self, profile_url: str) -> "ArchiveWriter":
+        return ArchiveWriter(self, profile_url)
+
+    def save_profile(self, profile_url: str, htmls: Iterable[str]) -> Dict[str, int]:
+        with self.writer(profile_url) as w:
+            for html in htmls:
+                w.append(html)
+        return w.stats
+
+    def _map(self, end: int) -> mmap.mmap:
+        # Remapped when the data file has grown past the current mapping (another run appended to it)
+        if self._mm is None or end > len(self._mm):
+            if self._mm is not None:
+                self._mm.close()
+                os.close(self._fd)
+            self._fd = os.open(self.path, os.O_RDONLY)
+            self._mm = mmap.mmap(self._fd, 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def _read(self, offset: int, length: int) -> str:
+        return self._decompress(self._map(offset + length)[offset : offset + length])
+
+    def get(self, urn: str) -> Optional[str]:
+        row = self.conn.execute("SELECT offset, length FROM cards WHERE urn = ?", (urn,)).fetchone()
+        return self._read(*row) if row else None
+
+    def iter_profile(self, profile_url: str) -> Iterator[Tuple[str, str]]:
+        # (urn, html) newest run first, then feed position, like the profile's JSON output
+        cur = self.conn.execute(
+            "SELECT l.urn, c.offset, c.length FROM profile_cards l JOIN cards c ON c.urn = l.urn "
+            "WHERE l.profileUrl = ? ORDER BY l.run_at DESC, l.position",
+            (profile_url,),
+        )
+        for urn, offset, length in cur.fetchall():
+            yield urn, self._read(offset, length)
+
+    def export_profile(self, profile_url: str, path: str) -> int:
+        # {username}.cards.html in the format offline.py reads
+        n = 0
+        with CardHtmlWriter(path) as w:
+            for _, html in self.iter_profile(profile_url):
+                w.append(html)
+                n += 1
+        return n
+
+    def profiles(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT profileUrl FROM profile_cards ORDER BY profileUrl")]
+
+    def stats(self) -> Dict:
+        q = lambda sql: self.conn.execute(sql).fetchone()[0]
+        live = q("SELECT COALESCE(SUM(length), 0) FROM cards")
+        raw = q("SELECT COALESCE(SUM(size), 0) FROM cards")
+        file_bytes = os.path.getsize(self.path)
+        return {
+            "cards": q("SELECT COUNT(*) FROM cards"),
+            "profiles": q("SELECT COUNT(DISTINCT profileUrl) FROM profile_cards"),
+            "html_bytes": raw,
+            "compressed_bytes": live,
+            "ratio": round(raw / live, 2) if live else None,
+            "file_bytes": file_bytes,
+            # Superseded versions of cards whose HTML changed between runs
+            "stale_bytes": file_bytes - len(MAGIC) - live,
+        }
+
+
+class ArchiveWriter:
+    # List-like append() of card outerHTML for one profile, so it can stand in for card_html_snippets;
+    # cards are written in batches
+    def __init__(self, archive: CardArchive, profile_url: str, flush_every: int = FLUSH_EVERY):
+        self.archive = archive
+        self.profile_url = profile_url
+        self.flush_every = flush_every
+        self.run_at = time.time()
+        self.count = 0
+        self.stats = {"stored": 0, "unchanged": 0}
+        self._pending: List[Tuple[str, str]] = []
+
+    def append(self, html: str) -> None:
+        self._pending.append((card_urn(html), html))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        s = self.archive.write(self.profile_url, self._pending, self.run_at, self.count)
+        self.count += len(self._pending)
+        self._pending = []
+        for k, v in s.items():
+            self.stats[k] += v
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def split_cards_html(text: str) -> List[str]:
+    # Card snippets back out of a {username}.cards.html dump
+    parts = re.split(r"\n<!-- CARD \d+ -->\n", text)
+    return [p.rstrip("\n") for p in parts[1:] if p.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query, export or fill the card HTML archive")
+    parser.add_argument("archive", help="Archive data file written with scraper.py --archive (index: <file>.idx)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_get = sub.add_parser("get", help="Print the HTML of cards by activity URN")
+    p_get.add_argument("urns", nargs="+")
+    p_export = sub.add_parser("export", help="Write {username}.cards.html (input for offline.py)")
+    p_export.add_argument("users", nargs="*", help="Usernames (default: every archived profile)")
+    p_export.add_argument("--out-dir", default=".")
+    p_import = sub.add_parser("import", help="Load existing {username}.cards.html dumps")
+    p_import.add_argument("files", nargs="+")
+    sub.add_parser("stats", help="Card counts and compression")
+    args = parser.parse_args()
+
+    with CardArchive(args.archive) as archive:
+        if args.cmd == "get":
+            for urn in args.urns:
+                html = archive.get(urn)
+                print(html if html is not None else f"<!-- {urn} not archived -->")
+        elif args.cmd == "export":
+            urls = [f"https://www.linkedin.com/in/{u}" for u in args.users] or archive.profiles()
+            os.makedirs(args.out_dir, exist_ok=True)
+            for url in urls:
+                path = os.path.join(args.out_dir, f"{url.rstrip('/').rsplit('/', 1)[-1]}.cards.html")
+                print(f"Wrote {archive.export_profile(url, path)} cards to {path}")
+        elif args.cmd == "import":
+            from offline import username_from_path
+
+            for path in args.files:
+                with open(path, encoding="utf-8") as f:
+                    cards = split_cards_html(f.read())
+                s = archive.save_profile(f"https://www.linkedin.com/in/{username_from_path(path)}", cards)
+                print(f"{path}: {s['stored']} cards stored, {s['unchanged']} already archived")
+        else:
+            print(json.dumps(archive.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
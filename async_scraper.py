@@ -0,0 +1,357 @@
+import asyncio
+import os
+from typing import Dict, List, Optional
+
+from playwright.async_api import async_playwright
+
+from ratelimit import UNLIMITED, throttle_signal
+
+from scraper import (
+    AUTH_DIR,
+    BATCH_SIZE,
+    CARD_SELECTOR,
+    CARD_SELECTOR_FALLBACK,
+    COUNT_CARDS_JS,
+    FEED_URL,
+    INCREMENTAL,
+    KNOWN_URNS_CHECKED,
+    LOGIN_EMAIL_INPUT,
+    LOGIN_PASSWORD_INPUT,
+    LOGIN_READY_SELECTOR,
+    LOGIN_SUBMIT,
+    LOGIN_URL,
+    SCROLL_BOTTOM_JS,
+    SCROLL_DOWN_JS,
+    SCROLL_MODE,
+    SCROLL_STOP_JS,
+    SCROLL_UP_JS,
+    SNAPSHOT_JS,
+    SNAPSHOT_SELECTORS,
+    WAIT_FOR_CARDS_JS,
+    ScrollRounds,
+    SessionExpired,
+    archive_summary,
+    auth_redirect,
+    load_known_urns,
+    load_session_state,
+    merge_incremental,
+    posts_url,
+    records_from_snapshots,
+    save_card_html,
+    save_user_json,
+    scroll_stop_arg,
+    session_state_path,
+    stop_reached,
+    urn_older_than,
+)
+
+
+# asyncio counterparts of login/open_user_posts/scroll_to_end/scrape_user from scraper.py. The page-side JS,
+# selectors, scroll bookkeeping (ScrollRounds) and record assembly are shared with it; only the awaits live here.
+# Extraction uses the batch engine only, so every card still costs a single page.evaluate.
+
+VIEWPORT = {"width": 1440, "height": 900}
+
+
+async def login(page, email: str, password: str) -> None:
+    await page.goto(LOGIN_URL, wait_until="domcontentloaded")
+    await page.fill(LOGIN_EMAIL_INPUT, email)
+    await page.fill(LOGIN_PASSWORD_INPUT, password)
+    await page.click(LOGIN_SUBMIT)
+    try:
+        await page.wait_for_selector(LOGIN_READY_SELECTOR, timeout=60000)
+    except Exception:
+        # As a fallback, give the page a moment (e.g., during 2FA or captcha)
+        await asyncio.sleep(3.0)
+
+
+async def is_session_valid(context) -> bool:
+    try:
+        resp = await context.request.get(FEED_URL, max_redirects=0, timeout=15000)
+        return resp.status == 200
+    except Exception:
+        return False
+
+
+async def open_user_posts(page, username: str, limiter=UNLIMITED) -> None:
+    url = posts_url(username)
+    for attempt in range(limiter.max_retries + 1):
+        last = attempt == limiter.max_retries
+        # The limiter is shared, so every worker slows down when any of them is throttled
+        await limiter.acquire_async("navigation")
+        resp = await page.goto(url, wait_until="domcontentloaded")
+        redirect = auth_redirect(page.url)
+        if redirect:
+            raise SessionExpired(f"Sent to {redirect} while opening {username}")
+        signal = throttle_signal(resp.status if resp is not None else None)
+        if signal:
+            limiter.throttled(signal)
+            if last:
+                raise RuntimeError(f"Throttled while opening {username} ({signal})")
+            continue
+        try:
+            await page.wait_for_selector(f"{CARD_SELECTOR}, {CARD_SELECTOR_FALLBACK}", timeout=60000)
+        except Exception:
+            try:
+                await page.wait_for_selector("div.feed-shared-update-v2, article", timeout=60000)
+            except Exception:
+                limiter.throttled("timeout")
+                if last:
+                    raise
+                continue
+        limiter.ok()
+        break
+    await asyncio.sleep(1.0)
+
+
+async def scroll_stop_reached(page, stop_urns: Optional[List[str]], since_ms: Optional[int] = None) -> bool:
+    arg = scroll_stop_arg(stop_urns, since_ms)
+    if arg is None:
+        return False
+    try:
+        res = await page.evaluate(SCROLL_STOP_JS, arg)
+    except Exception:
+        return False
+    return stop_reached(res, since_ms)
+
+
+async def scroll_to_end(page, max_idle_rounds: int = 8, pause_sec: float = 1.2, mode: str = SCROLL_MODE, stop_urns: Optional[List[str]] = None, since_ms: Optional[int] = None, limiter=UNLIMITED) -> Dict:
+    if mode == "adaptive":
+        return await scroll_to_end_adaptive(page, stop_urns=stop_urns, since_ms=since_ms, limiter=limiter)
+    last_count = -1
+    idle_rounds = 0
+    total_rounds = 0
+    waited = 0.0
+    while idle_rounds < max_idle_rounds and total_rounds < 500 and not await scroll_stop_reached(page, stop_urns, since_ms):
+        total_rounds += 1
+        await limiter.acquire_async("scroll")
+        try:
+            await page.evaluate(SCROLL_DOWN_JS)
+        except Exception:
+            pass
+        # Other profiles keep scrolling while this one waits
+        await asyncio.sleep(pause_sec)
+        waited += pause_sec
+        try:
+            current = await page.evaluate(COUNT_CARDS_JS)
+        except Exception:
+            current = 0
+        if current <= last_count:
+            idle_rounds += 1
+        else:
+            idle_rounds = 0
+            last_count = current
+            limiter.ok()
+        if total_rounds % 10 == 0:
+            try:
+                await page.evaluate(SCROLL_UP_JS)
+            except Exception:
+                pass
+    return {"mode": "fixed", "rounds": total_rounds, "idle_rounds": idle_rounds, "waited_sec": round(waited, 3), "cards": max(last_count, 0)}
+
+
+async def scroll_to_end_adaptive(page, max_idle_rounds: int = 3, initial_latency: float = 1.0, max_rounds: int = 500, stop_urns: Optional[List[str]] = None, since_ms: Optional[int] = None, limiter=UNLIMITED) -> Dict:
+    sel = CARD_SELECTOR + ", " + CARD_SELECTOR_FALLBACK
+    try:
+        last_count = await page.evaluate(COUNT_CARDS_JS)
+    except Exception:
+        last_count = 0
+    rounds = ScrollRounds(max_idle_rounds, initial_latency, max_rounds)
+    while rounds.more() and not await scroll_stop_reached(page, stop_urns, since_ms):
+        await limiter.acquire_async("scroll")
+        try:
+            await page.evaluate(SCROLL_BOTTOM_JS)
+        except Exception:
+            pass
+        arg, timeout_ms = rounds.start(sel, last_count)
+        current = -1
+        try:
+            current = await (await page.wait_for_function(WAIT_FOR_CARDS_JS, arg=arg, timeout=timeout_ms)).json_value()
+        except Exception:
+            pass
+        rounds.finish(current > last_count)
+        if current > last_count:
+            last_count = current
+            limiter.ok()
+        else:
+            try:
+                await page.evaluate(SCROLL_UP_JS)
+            except Exception:
+                pass
+    return rounds.stats("adaptive", last_count)
+
+
+async def card_snapshots(page, batch_size: int = BATCH_SIZE, with_html: bool = True, skip_urns: Optional[List[str]] = None) -> List[Dict]:
+    snapshots: List[Dict] = []
+    start = 0
+    while True:
+        res = await page.evaluate(SNAPSHOT_JS, {"sel": SNAPSHOT_SELECTORS, "start": start, "end": start + batch_size, "withHtml": with_html, "skipUrns": skip_urns or []})
+        snapshots.extend(res["snapshots"])
+        start += batch_size
+        if start >= res["total"]:
+            return snapshots
+
+
+async def scrape_user(
+    page,
+    username: str,
+    batch_size: int = BATCH_SIZE,
+    save_cards: bool = False,
+    scroll_mode: str = SCROLL_MODE,
+    incremental: bool = INCREMENTAL,
+    since_ms: Optional[int] = None,
+    limiter=UNLIMITED,
+    archive=None,
+) -> List[Dict]:
+    known_urns = load_known_urns(username) if incremental else []
+    await open_user_posts(page, username, limiter)
+    stats = await scroll_to_end(page, mode=scroll_mode, stop_urns=known_urns[:KNOWN_URNS_CHECKED], since_ms=since_ms, limiter=limiter)
+    print(f"Scrolled {username}: {stats['cards']} cards in {stats['rounds']} rounds, {stats['waited_sec']:.1f}s waiting ({stats['mode']})")
+    card_html_snippets: List[str] = []
+    card_urns: List[str] = []
+    scraped_profile_url = f"https://www.linkedin.com/in/{username}"
+    with_html = save_cards or archive is not None
+    snapshots = [s for s in await card_snapshots(page, batch_size, with_html=with_html, skip_urns=known_urns) if not urn_older_than(s["urn"], since_ms)]
+    items = records_from_snapshots(snapshots, scraped_profile_url, card_html_snippets, set(known_urns), card_urns)
+    if save_cards:
+        save_card_html(username, card_html_snippets)
+    if archive is not None:
+        # No await in between, so workers never interleave their writes
+        archive_writer = archive.writer(scraped_profile_url)
+        with archive_writer:
+            for html in card_html_snippets:
+                archive_writer.append(html)
+        print(archive_summary(archive_writer))
+    if incremental:
+        return merge_incremental(username, items, card_urns, known_urns)
+    return items
+
+
+class _Session:
+    # Logged-in state shared by the worker contexts. When workers get logged out, the first one logs in
+    # again (under the lock) and the others just copy its cookies into their own context.
+    def __init__(self, state: Dict, email: str, password: str, auth_dir: str):
+        self.state = state
+        self.email = email
+        self.password = password
+        self.auth_dir = auth_dir
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+    async def refresh(self, context, page, seen_generation: int) -> None:
+        async with self.lock:
+            if self.generation != seen_generation:
+                await context.add_cookies(self.state["cookies"])
+                return
+            await login(page, self.email, self.password)
+            if not await is_session_valid(context):
+                raise SessionExpired("Logging in again did not give a valid session (checkpoint or 2FA pending?)")
+            self.state = await context.storage_state()
+            self.generation += 1
+            os.makedirs(self.auth_dir, exist_ok=True)
+            await context.storage_state(path=session_state_path(self.auth_dir))
+
+
+async def _worker(worker_id: int, context, queue: "asyncio.Queue[str]", store=None, compact_json: bool = False, session: Optional[_Session] = None, **scrape_kwargs) -> None:
+    page = await context.new_page()
+    while True:
+        try:
+            u = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+        print(f"[worker {worker_id}] Scraping {u} ...")
+        try:
+            generation = session.generation if session is not None else 0
+            try:
+                data = await scrape_user(page, u, **scrape_kwargs)
+            except SessionExpired as e:
+                if session is None:
+                    raise
+                print(f"[worker {worker_id}] {e}; logging in again")
+                await session.refresh(context, page, generation)
+                data = await scrape_user(page, u, **scrape_kwargs)
+            save_user_json(u, data, compact_json)
+            if store is not None:
+                # Workers share one event loop thread, so they can share the connection
+                store.save_profile(f"https://www.linkedin.com/in/{u}", data)
+        except Exception as e:
+            print(f"[worker {worker_id}] Failed to scrape {u}: {e}")
+        finally:
+            queue.task_done()
+    await page.close()
+
+
+async def scrape_users_concurrently(
+    users: List[str],
+    email: str,
+    password: str,
+    concurrency: int = 4,
+    headless: bool = False,
+    batch_size: int = BATCH_SIZE,
+    save_cards: bool = False,
+    auth_dir: str = AUTH_DIR,
+    fresh_login: bool = False,
+    scroll_mode: str = SCROLL_MODE,
+    incremental: bool = INCREMENTAL,
+    since_ms: Optional[int] = None,
+    blocker=None,
+    db_path: Optional[str] = None,
+    archive_path: Optional[str] = None,
+    compact_json: bool = False,
+    limiter=UNLIMITED,
+) -> None:
+    queue: "asyncio.Queue[str]" = asyncio.Queue()
+    for u in users:
+        queue.put_nowait(u)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=headless)
+        # Log in once (or reuse the saved session), then hand the cookies/localStorage to every pooled context
+        saved = None if fresh_login else load_session_state(auth_dir)
+        login_context = await browser.new_context(viewport=VIEWPORT, storage_state=saved)
+        if await is_session_valid(login_context):
+            print("Reusing saved LinkedIn session")
+        else:
+            login_page = await login_context.new_page()
+            await login(login_page, email, password)
+            if await is_session_valid(login_context):
+                os.makedirs(auth_dir, exist_ok=True)
+                await login_context.storage_state(path=session_state_path(auth_dir))
+        state = await login_context.storage_state()
+        await login_context.close()
+        session = _Session(state, email, password, auth_dir)
+        contexts = [await browser.new_context(viewport=VIEWPORT, storage_state=state) for _ in range(max(1, min(concurrency, len(users))))]
+        if blocker is not None:
+            # One blocker for the whole pool, so its counters cover the run
+            for ctx in contexts:
+                await blocker.install_async(ctx)
+        for ctx in contexts:
+            limiter.install(ctx)
+        scrape_kwargs = {
+            "batch_size": batch_size,
+            "save_cards": save_cards,
+            "scroll_mode": scroll_mode,
+            "incremental": incremental,
+            "since_ms": since_ms,
+            "limiter": limiter,
+        }
+        store = None
+        if db_path:
+            from storage import PostStore
+
+            store = PostStore(db_path)
+        if archive_path:
+            from archive import CardArchive
+
+            scrape_kwargs["archive"] = CardArchive(archive_path)
+        await asyncio.gather(*(_worker(i, ctx, queue, store, compact_json, session, **scrape_kwargs) for i, ctx in enumerate(contexts, start=1)))
+        if store is not None:
+            store.close()
+        if scrape_kwargs.get("archive") is not None:
+            scrape_kwargs["archive"].close()
+        for ctx in contexts:
+            await ctx.close()
+        if blocker is not None and blocker.enabled:
+            print(blocker.summary())
+        if limiter is not UNLIMITED:
+            print(limiter.summary())
+        await browser.close()
@@ -0,0 +1,309 @@
+import argparse
+import gc
+import html
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import scraper
+
+
+# Offline benchmark harness: synthetic recent-activity feeds (same class names the selectors target)
+# served from a local HTTP server, optionally with infinite-scroll lazy loading, timed phase by phase.
+# Results are written as JSON so runs can be compared over time.
+
+BENCH_USER = "bench-user"
+PROFILE_URL = f"https://www.linkedin.com/in/{BENCH_USER}"
+FIRST_ACTIVITY_MS = 1_717_000_000_000
+
+
+def activity_id(ms: int) -> str:
+    # Creation time in the first 41 bits, like real activity IDs (19 digits)
+    return str(ms << 22 | 0x2A)
+
+
+def make_card(i: int, rng: random.Random) -> str:
+    ms = FIRST_ACTIVITY_MS - i * rng.randint(3_600_000, 86_400_000)
+    aid = activity_id(ms)
+    kind = rng.choice(["text", "image", "image", "video", "article", "repost", "job"])
+    actor = f"Bench Author {i}"
+    actor_href = f"/in/{BENCH_USER}?miniProfileUrn=urn%3Ali%3Afs_miniProfile%3A{i}"
+    header = ""
+    if kind == "repost":
+        actor = f"Original Author {i % 97}"
+        actor_href = f"https://www.linkedin.com/in/original-{i % 97}/?trk=feed"
+        header = f'<div class="update-components-header"><span>{html.escape(BENCH_USER)} reposted this</span></div>'
+    if kind == "image":
+        content = f'<div class="feed-shared-update-v2__content"><img class="update-components-image__image" alt="Post image {i}" src="https://media.example.invalid/img/{aid}.jpg"></div>'
+    elif kind == "video":
+        content = f'<div class="feed-shared-update-v2__content"><video src="https://media.example.invalid/video/{aid}.mp4"></video></div>'
+    elif kind == "article":
+        content = (
+            '<div class="feed-shared-update-v2__content"><article class="update-components-article">'
+            f'<a href="https://www.linkedin.com/pulse/bench-article-{i}?trk=x">Article {i}</a></article></div>'
+        )
+    elif kind == "job":
+        content = f'<div class="feed-shared-update-v2__content"><a href="https://www.linkedin.com/jobs/view/{4_000_000 + i}/?refId=x">Job {i}</a></div>'
+    else:
+        content = ""
+    likes = rng.choice([str(rng.randint(0, 999)), f"{rng.randint(1, 9)},{rng.randint(100, 999)}", f"{rng.randint(1, 9)}.{rng.randint(1, 9)}K"])
+    comments = rng.randint(0, 500)
+    reposts = rng.randint(0, 80)
+    age = rng.choice(["3h", "2d", "1w", "4mo", "2yr"])
+    return (
+        f'<div class="feed-shared-update-v2" data-urn="urn:li:activity:{aid}">'
+        f"{header}"
+        '<div class="update-components-actor">'
+        f'<a class="update-components-actor__meta-link" href="{actor_href}">'
+        f'<span class="update-components-actor__title"><span dir="ltr"><span aria-hidden="true">{html.escape(actor)}</span></span> • 2nd</span>'
+        "</a>"
+        f'<span class="update-components-actor__sub-description"><span aria-hidden="true">{age} • </span><span class="visually-hidden">{age} •</span></span>'
+        "</div>"
+        f'<div class="update-components-text"><span class="break-words">Synthetic post {i} with some words #bench</span></div>'
+        f"{content}"
+        '<div class="social-details-social-counts"><ul>'
+        f'<li class="social-details-social-counts__reactions"><button aria-label="{likes} reactions"><span class="social-details-social-counts__reactions-count">{likes}</span></button></li>'
+        f"<li><button>{comments} comments</button></li><li><button>{reposts} reposts</button></li>"
+        "</ul></div>"
+        f'<a class="app-aware-link" href="https://www.linkedin.com/posts/{BENCH_USER}_synthetic-activity-{aid}-AbCd?utm_source=share">Permalink</a>'
+        "</div>"
+    )
+
+
+def make_cards(n: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [make_card(i, rng) for i in range(n)]
+
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><meta charset="utf-8"><title>Bench feed</title>
+<style>.feed-shared-update-v2 {{ min-height: 240px; border-bottom: 1px solid #ddd; }}</style></head>
+<body><main><div id="feed">{cards}</div><div id="loader"></div></main>
+<script>
+const PAGE = {page_size}, TOTAL = {total}, DELAY = {delay_ms};
+let next = {initial}, busy = false;
+function loadMore() {{
+  if (busy || next >= TOTAL) return;
+  busy = true;
+  document.getElementById('loader').className = 'artdeco-loader';
+  fetch('/cards?start=' + next + '&count=' + PAGE).then((r) => r.text()).then((fragment) => {{
+    setTimeout(() => {{
+      document.getElementById('feed').insertAdjacentHTML('beforeend', fragment);
+      next += PAGE;
+      busy = false;
+      document.getElementById('loader').className = '';
+    }}, DELAY);
+  }});
+}}
+window.addEventListener('scroll', () => {{
+  if (window.innerHeight + window.scrollY >= document.documentElement.scrollHeight - 800) loadMore();
+}});
+</script></body></html>
+"""
+
+
+def serve_feed(cards: List[str], lazy: bool, page_size: int = 20, delay_ms: int = 150) -> ThreadingHTTPServer:
+    # GET /in/<user>/recent-activity/all/ -> feed page; GET /cards?start=&count= -> next fragment
+    initial = page_size if lazy else len(cards)
+    page_html = PAGE_TEMPLATE.format(
+        cards="".join(cards[:initial]), page_size=page_size, total=len(cards), delay_ms=delay_ms, initial=initial
+    ).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path.endswith("/recent-activity/all/"):
+                body = page_html
+            elif parts.path == "/cards":
+                q = parse_qs(parts.query)
+                start = int(q.get("start", ["0"])[0])
+                count = int(q.get("count", [str(page_size)])[0])
+                body = "".join(cards[start:start + count]).encode("utf-8")
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed(fn: Callable[[], object]) -> Dict:
+    t0 = time.perf_counter()
+    result = fn()
+    return {"sec": round(time.perf_counter() - t0, 6), "result": result}
+
+
+def time_extractors(cards, limit: Optional[int]) -> Dict[str, Dict]:
+    # Per-element (handles) extractors, one after another over the same cards
+    sample = cards if limit is None else cards[:limit]
+    fns = {
+        "extract_links": scraper.extract_links,
+        "extract_author": scraper.extract_author,
+        "extract_text": scraper.extract_text,
+        "extract_media": scraper.extract_media,
+        "extract_counts": scraper.extract_counts,
+        "extract_date_and_action": scraper.extract_date_and_action,
+        "detect_type": scraper.detect_type,
+        "find_all_profile_links": scraper.find_all_profile_links,
+        "extract_author_for_url": lambda c: scraper.extract_author_for_url(c, "https://www.linkedin.com/in/original-1"),
+    }
+    out = {}
+    for name, fn in fns.items():
+        t0 = time.perf_counter()
+        for c in sample:
+            fn(c)
+        sec = time.perf_counter() - t0
+        out[name] = {"sec": round(sec, 6), "cards": len(sample), "us_per_card": round(sec / max(len(sample), 1) * 1e6, 2)}
+    return out
+
+
+def bench_browser(n: int, cards_html: List[str], lazy: bool, scroll_mode: str, handles_limit: Optional[int], headless: bool) -> Dict:
+    from playwright.sync_api import sync_playwright
+
+    server = serve_feed(cards_html, lazy)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    saved_base = scraper.BASE_URL
+    scraper.BASE_URL = base_url
+    res: Dict = {}
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=headless)
+            page = browser.new_page(viewport={"width": 1440, "height": 900})
+            res["open_user_posts"] = {"sec": timed(lambda: scraper.open_user_posts(page, BENCH_USER))["sec"]}
+            t = timed(lambda: scraper.scroll_to_end(page, mode=scroll_mode))
+            res["scroll_to_end"] = {"sec": t["sec"], **t["result"]}
+            t = timed(lambda: scraper.find_cards(page))
+            cards = t["result"]
+            res["find_cards"] = {"sec": t["sec"], "cards": len(cards)}
+            res["extractors"] = time_extractors(cards, handles_limit)
+            t = timed(lambda: [scraper.record_from_snapshot(s, PROFILE_URL) for s in scraper.iter_card_snapshots(page, with_html=False)])
+            res["batch_engine"] = {"sec": t["sec"], "cards": len(t["result"]), "us_per_card": round(t["sec"] / max(len(t["result"]), 1) * 1e6, 2)}
+            # Windowed mode re-opens the feed and extracts while scrolling
+            scraper.open_user_posts(page, BENCH_USER)
+            t = timed(lambda: [scraper.record_from_snapshot(s, PROFILE_URL) for s in scraper.iter_windowed_snapshots(page, with_html=False)])
+            res["windowed"] = {"sec": t["sec"], "cards": len(t["result"]), "js_heap_bytes": page.evaluate("() => performance.memory ? performance.memory.usedJSHeapSize : null")}
+            browser.close()
+    finally:
+        scraper.BASE_URL = saved_base
+        server.shutdown()
+    return res
+
+
+def bench_offline(cards_html: List[str]) -> Dict:
+    from offline import extract_records, iter_snapshots
+    from textparse import parse_counts, parse_date_action
+
+    doc = "".join(cards_html)
+    t = timed(lambda: extract_records([doc], PROFILE_URL))
+    records = t["result"]
+    res = {"offline_extract": {"sec": t["sec"], "cards": len(t["result"]), "cards_per_sec": round(len(t["result"]) / max(t["sec"], 1e-9), 1)}}
+    snaps = list(iter_snapshots(doc))
+    t = timed(lambda: [(parse_counts(s["cardText"], s["likeAria"], s["likeSpan"]), parse_date_action(s["dateTexts"])) for s in snaps])
+    res["textparse"] = {"sec": t["sec"], "us_per_card": round(t["sec"] / max(len(snaps), 1) * 1e6, 2)}
+    t = timed(lambda: [(scraper.counts_from_text(s["likeAria"], s["likeSpan"], s["cardText"]), scraper.date_action_from_texts(s["dateTexts"])) for s in snaps])
+    res["textparse_reference"] = {"sec": t["sec"], "us_per_card": round(t["sec"] / max(len(snaps), 1) * 1e6, 2)}
+    res.update(bench_records(records))
+    return res
+
+
+def bench_records(records: List) -> Dict:
+    # records.Post vs the 16-key dicts records used to be: container memory, then serialization throughput
+    # of the old stdlib path against output.dumps (orjson when installed)
+    import output
+    from records import Post
+
+    def allocated(fn: Callable[[], object]) -> int:
+        # Containers only: both sides share the same value objects. The full collection also empties the
+        # tuple free list, which otherwise still holds Post.from_dict's freed argument tuples
+        # (up to 2000 of them, i.e. another ~168 B per record at 1000 records)
+        tracemalloc.start()
+        keep = fn()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del keep
+        return size
+
+    dicts = [r.to_dict() for r in records]
+    posts = [Post.from_dict(d) for d in dicts]
+    n = max(len(records), 1)
+    res: Dict = {"record_memory": {
+        "dict_bytes_per_record": round(allocated(lambda: [dict(d) for d in dicts]) / n, 1),
+        "post_bytes_per_record": round(allocated(lambda: [Post.from_dict(d) for d in dicts]) / n, 1),
+    }}
+
+    def throughput(fn: Callable[[], str]) -> Dict:
+        t = timed(fn)
+        mb = len(t["result"].encode("utf-8")) / 1e6
+        return {"sec": t["sec"], "mb": round(mb, 3), "mb_per_sec": round(mb / max(t["sec"], 1e-9), 1)}
+
+    res["serialize"] = {
+        "backend": "orjson" if output.orjson is not None else "json",
+        "json_indent_stdlib": throughput(lambda: json.dumps(dicts, ensure_ascii=False, indent=2)),
+        "json_indent": throughput(lambda: output.dumps(posts, indent=True)),
+        "json_compact": throughput(lambda: output.dumps(posts)),
+        "ndjson_stdlib": throughput(lambda: "\n".join(json.dumps(d, ensure_ascii=False) for d in dicts)),
+        "ndjson": throughput(lambda: "\n".join(output.dumps(p) for p in posts)),
+    }
+    return res
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmarks over synthetic recent-activity feeds")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="Feed sizes in cards")
+    parser.add_argument("--lazy", action="store_true", help="Serve the feed with infinite-scroll lazy loading")
+    parser.add_argument("--scroll-mode", choices=["adaptive", "fixed"], default=scraper.SCROLL_MODE)
+    parser.add_argument("--handles-limit", type=int, default=None, help="Only time the per-element extractors on the first N cards")
+    parser.add_argument("--no-browser", action="store_true", help="Skip the Playwright phases (offline extractor and text parsing only)")
+    parser.add_argument("--headed", action="store_true", help="Show the browser window")
+    parser.add_argument("--out", default="bench_results.json", help="Where to write the JSON results")
+    args = parser.parse_args()
+
+    results = {
+        "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "lazy": args.lazy,
+        "scroll_mode": args.scroll_mode,
+        "runs": [],
+    }
+    for n in args.sizes:
+        cards_html = make_cards(n)
+        run: Dict = {"cards": n, "html_bytes": sum(len(c) for c in cards_html)}
+        run.update(bench_offline(cards_html))
+        if not args.no_browser:
+            run.update(bench_browser(n, cards_html, args.lazy, args.scroll_mode, args.handles_limit, headless=not args.headed))
+        results["runs"].append(run)
+        print(json.dumps(run))
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import fnmatch
+from typing import Dict, List, Optional
+
+
+# Request blocking profiles installed with context.route(): drop images/video/fonts and tracking beacons
+# while letting documents, scripts, CSS and the XHR/fetch calls that load more posts through.
+# Extraction only reads src/href attributes, so nothing it needs is lost.
+
+BLOCK_PROFILES: Dict[str, List[str]] = {
+    "off": [],
+    "media": ["image", "media", "font"],
+    "lean": ["image", "media", "font", "beacon", "ping", "manifest", "texttrack"],
+}
+ANALYTICS_PATTERNS = [
+    "*px.ads.linkedin.com*",
+    "*/li/track*",
+    "*/tscp-serving/*",
+    "*/sensorCollect*",
+    "*/platform-telemetry*",
+    "*doubleclick.net*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*bat.bing.com*",
+]
+# Rough transfer sizes per blocked request, used only for the "bytes saved" estimate
+EST_BYTES = {"image": 60_000, "media": 1_500_000, "font": 40_000, "beacon": 1_000, "ping": 500, "other": 5_000}
+
+
+class RequestBlocker:
+    def __init__(self, profile: str = "lean", allow: Optional[List[str]] = None, deny: Optional[List[str]] = None):
+        # allow/deny: URL glob patterns; allow always wins, deny blocks regardless of resource type
+        if profile not in BLOCK_PROFILES:
+            raise ValueError(f"Unknown block profile: {profile!r} (choose from {', '.join(BLOCK_PROFILES)})")
+        self.profile = profile
+        self.blocked_types = set(BLOCK_PROFILES[profile])
+        self.allow = list(allow or [])
+        self.deny = list(deny or []) + (ANALYTICS_PATTERNS if profile == "lean" else [])
+        self.blocked: Dict[str, int] = {}
+        self.allowed = 0
+        self.est_bytes_saved = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.blocked_types or self.deny)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        if any(fnmatch.fnmatchcase(url, p) for p in self.allow):
+            return False
+        if resource_type == "document":
+            return False
+        denied = any(fnmatch.fnmatchcase(url, p) for p in self.deny)
+        # Scripts and XHR/fetch load more posts; only explicit deny patterns (trackers) stop them
+        if resource_type in ("xhr", "fetch", "script"):
+            return denied
+        return resource_type in self.blocked_types or denied
+
+    def _count(self, url: str, resource_type: str) -> bool:
+        if self.should_block(url, resource_type):
+            self.blocked[resource_type] = self.blocked.get(resource_type, 0) + 1
+            self.est_bytes_saved += EST_BYTES.get(resource_type, EST_BYTES["other"])
+            return True
+        self.allowed += 1
+        return False
+
+    def handle(self, route) -> None:
+        req = route.request
+        if self._count(req.url, req.resource_type):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def handle_async(self, route) -> None:
+        req = route.request
+        if self._count(req.url, req.resource_type):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def install(self, context) -> None:
+        # Works on a BrowserContext or a Page
+        if self.enabled:
+            context.route("**/*", self.handle)
+
+    async def install_async(self, context) -> None:
+        if self.enabled:
+            await context.route("**/*", self.handle_async)
+
+    def stats(self) -> Dict:
+        return {
+            "profile": self.profile,
+            "blocked": sum(self.blocked.values()),
+            "blocked_by_type": dict(self.blocked),
+            "allowed": self.allowed,
+            "est_bytes_saved": self.est_bytes_saved,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        by_type = ", ".join(f"{k}={v}" for k, v in sorted(s["blocked_by_type"].items())) or "none"
+        return f"Blocked {s['blocked']} requests ({by_type}), ~{s['est_bytes_saved'] / 1_000_000:.1f} MB saved, {s['allowed']} allowed [{s['profile']}]"
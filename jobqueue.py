@@ -0,0 +1,274 @@
+import argparse
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+
+# Durable profile queue in SQLite. Each username is a job (pending -> running -> done/failed) claimed
+# under a lease: a worker that dies simply lets its lease expire and the job is picked up again.
+# Several processes (or hosts sharing the file on a volume with working POSIX locks) can pull from the
+# same queue; claims happen inside an IMMEDIATE transaction so no two workers get the same job.
+# The database uses the rollback journal (journal_mode=DELETE), not WAL: WAL keeps its index in shared
+# memory, which only works for processes on one host and breaks on NFS and similar network filesystems.
+
+LEASE_SEC = 900.0
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 60.0
+BACKOFF_MAX = 3600.0
+BUSY_TIMEOUT_SEC = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    username TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_until REAL,
+    next_run_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    added_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, next_run_at);
+"""
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def backoff_delay(attempts: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    # Exponential with full jitter: attempt 1 waits up to base, attempt 2 up to 2*base, ...
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+class JobQueue:
+    def __init__(
+        self,
+        path: str,
+        owner: Optional[str] = None,
+        lease_sec: float = LEASE_SEC,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff_base: float = BACKOFF_BASE,
+    ):
+        self.path = path
+        self.owner = owner or worker_id()
+        self.lease_sec = lease_sec
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        # username -> stops and joins the lease-renewing thread of a job being worked on
+        self._heartbeats: Dict[str, Callable[[], None]] = {}
+        self.conn = self._connect()
+        self.conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode; transactions are opened explicitly where claims need them
+        # (the timeout is SQLite's busy timeout: writers wait for each other's locks instead of failing)
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SEC, isolation_level=None)
+        try:
+            # Also turns WAL off on a queue created by an older version
+            conn.execute("PRAGMA journal_mode=DELETE")
+        except sqlite3.OperationalError:
+            pass
+        return conn
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def add(self, usernames: Iterable[str]) -> int:
+        # Already-known usernames keep their status, so finished profiles are not scraped again
+        now = time.time()
+        cur = self.conn.executemany(
+            "INSERT OR IGNORE INTO jobs (username, added_at, updated_at) VALUES (?, ?, ?)",
+            [(u, now, now) for u in usernames],
+        )
+        return cur.rowcount
+
+    def claim(self) -> Optional[str]:
+        # Oldest ready job: pending and due, or running with an expired lease (its worker is gone).
+        # Every claim counts as an attempt, so a profile that keeps killing its worker still runs out.
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', last_error = 'lease expired', lease_owner = NULL, lease_until = NULL, "
+                "updated_at = ? WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, self.max_attempts),
+            )
+            row = self.conn.execute(
+                "SELECT username FROM jobs WHERE (status = 'pending' AND next_run_at <= ?) "
+                "OR (status = 'running' AND lease_until < ?) ORDER BY next_run_at, added_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE username = ?",
+                (self.owner, now + self.lease_sec, now, row[0]),
+            )
+            self.conn.execute("COMMIT")
+            return row[0]
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def renew(self, username: str, conn: Optional[sqlite3.Connection] = None) -> bool:
+        # False when the lease was lost (expired and taken over by another worker)
+        now = time.time()
+        cur = (conn or self.conn).execute(
+            "UPDATE jobs SET lease_until = ?, updated_at = ? WHERE username = ? AND status = 'running' AND lease_owner = ?",
+            (now + self.lease_sec, now, username, self.owner),
+        )
+        return cur.rowcount == 1
+
+    def _stop_heartbeat(self, username: str) -> None:
+        # Before any terminal write, so the renewing thread never takes its own job's end for a lost lease
+        halt = self._heartbeats.pop(username, None)
+        if halt is not None:
+            halt()
+
+    def complete(self, username: str) -> None:
+        self._stop_heartbeat(username)
+        now = time.time()
+        self.conn.execute(
+            "UPDATE jobs SET status = 'done', lease_owner = NULL, lease_until = NULL, last_error = NULL, "
+            "updated_at = ?, finished_at = ? WHERE username = ? AND lease_owner = ?",
+            (now, now, username, self.owner),
+        )
+
+    def fail(self, username: str, error: str) -> str:
+        # Back to pending after a backoff, or 'failed' for good after max_attempts; returns the new status
+        self._stop_heartbeat(username)
+        now = time.time()
+        row = self.conn.execute("SELECT attempts FROM jobs WHERE username = ? AND lease_owner = ?", (username, self.owner)).fetchone()
+        if row is None:
+            return "lost"
+        attempts = row[0]
+        status = "failed" if attempts >= self.max_attempts else "pending"
+        next_run_at = now + backoff_delay(attempts, self.backoff_base) if status == "pending" else now
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, attempts = ?, next_run_at = ?, last_error = ?, lease_owner = NULL, "
+            "lease_until = NULL, updated_at = ? WHERE username = ?",
+            (status, attempts, next_run_at, error[:2000], now, username),
+        )
+        return status
+
+    def release(self, username: str) -> None:
+        # Give a job back untouched (e.g. on Ctrl+C)
+        self._stop_heartbeat(username)
+        self.conn.execute(
+            "UPDATE jobs SET status = 'pending', lease_owner = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE username = ? AND status = 'running' AND lease_owner = ?",
+            (time.time(), username, self.owner),
+        )
+
+    @contextmanager
+    def heartbeat(self, username: str):
+        # Renews the lease from a background thread (own connection) while the job is being worked on
+        stop = threading.Event()
+
+        def beat():
+            conn = self._connect()
+            try:
+                while not stop.wait(self.lease_sec / 3):
+                    if not self.renew(username, conn):
+                        print(f"Lost the lease on {username}")
+                        return
+            finally:
+                conn.close()
+
+        t = threading.Thread(target=beat, daemon=True)
+        t.start()
+
+        def halt() -> None:
+            stop.set()
+            t.join()
+
+        self._heartbeats[username] = halt
+        try:
+            yield
+        finally:
+            self._stop_heartbeat(username)
+
+    def claimed(self, wait_sec: float = 0.0) -> Iterator[str]:
+        # Claims jobs one at a time until none are ready. wait_sec > 0 keeps polling while jobs are
+        # still backing off or leased to others.
+        while True:
+            u = self.claim()
+            if u is None:
+                counts = self.counts()
+                if wait_sec <= 0 or not counts.get("pending", 0) + counts.get("running", 0):
+                    return
+                time.sleep(wait_sec)
+                continue
+            try:
+                with self.heartbeat(u):
+                    yield u
+            except GeneratorExit:
+                self.release(u)
+                raise
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+
+    def jobs(self, status: Optional[str] = None) -> List[Dict]:
+        cols = ["username", "status", "attempts", "lease_owner", "lease_until", "next_run_at", "last_error", "finished_at"]
+        sql = f"SELECT {', '.join(cols)} FROM jobs"
+        args = ()
+        if status:
+            sql += " WHERE status = ?"
+            args = (status,)
+        return [dict(zip(cols, r)) for r in self.conn.execute(sql + " ORDER BY added_at", args)]
+
+    def requeue(self, status: str = "failed") -> int:
+        cur = self.conn.execute(
+            "UPDATE jobs SET status = 'pending', attempts = 0, next_run_at = 0, updated_at = ? WHERE status = ?",
+            (time.time(), status),
+        )
+        return cur.rowcount
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the scraper's profile job queue")
+    parser.add_argument("queue", help="Queue database, e.g. queue.db (shared by every worker)")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_add = sub.add_parser("add", help="Add usernames (already queued ones keep their status)")
+    p_add.add_argument("usernames", nargs="*")
+    p_add.add_argument("--from-file", help="Text file with one username per line")
+    p_status = sub.add_parser("status", help="Job counts, or the jobs with a given status")
+    p_status.add_argument("--list", choices=["pending", "running", "done", "failed"])
+    p_requeue = sub.add_parser("requeue", help="Put failed (or done) jobs back to pending")
+    p_requeue.add_argument("--status", choices=["failed", "done"], default="failed")
+    args = parser.parse_args()
+
+    q = JobQueue(args.queue)
+    try:
+        if args.cmd == "add":
+            users = list(args.usernames)
+            if args.from_file:
+                with open(args.from_file, encoding="utf-8") as f:
+                    users += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+            print(f"Queued {q.add(users)} new of {len(users)} usernames")
+        elif args.cmd == "status":
+            if args.list:
+                for job in q.jobs(args.list):
+                    print(json.dumps(job))
+            else:
+                print(json.dumps(q.counts()))
+        else:
+            print(f"Requeued {q.requeue(args.status)} jobs")
+    finally:
+        q.close()
+
+
+if __name__ == "__main__":
+    main()
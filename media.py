@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import hashlib
+import http.client
+import json
+import mimetypes
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+
+# Media stage: downloads the imgUrl/videoUrl of scraped records into a content-addressed store
+# (objects/<sha256[:2]>/<sha256><ext>), so an image shared by many reposts is kept once. An index maps
+# every fetched URL to its hash and is checked first, so nothing is downloaded twice. URLs are indexed by
+# media_key(): LinkedIn's CDN (licdn.com) signs them with e= (expiry) and t= (token) parameters that change from run
+# to run, so those are left out. Interrupted downloads resume from their partial file with a Range request.
+# Standard library only: asyncio bounds the concurrency, a small keep-alive pool reuses connections.
+
+CONCURRENCY = 8
+MAX_BYTES = 50 * 1024 * 1024  # Per file
+CHUNK = 256 * 1024
+TIMEOUT = 30.0
+SIGNATURE_PARAMS = ("e", "t")  # media.licdn.com / dms.licdn.com expiry and signature
+SIGNED_HOSTS = ("licdn.com",)  # Only these hosts (and their subdomains) have SIGNATURE_PARAMS left out
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0 Safari/537.36"
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    url TEXT PRIMARY KEY,
+    sha256 TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    path TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_media_sha ON media (sha256);
+"""
+
+
+class TooLarge(Exception):
+    pass
+
+
+def media_key(url: str) -> str:
+    # The URL without its signature/expiry parameters: the same file fetched on another run has the same key
+    # Elsewhere e= / t= may well select a different file, so the URL is kept as is
+    u = urlsplit(url)
+    host = (u.hostname or "").lower()
+    if not u.query or not any(host == h or host.endswith("." + h) for h in SIGNED_HOSTS):
+        return url
+    query = "&".join(p for p in u.query.split("&") if p.split("=", 1)[0] not in SIGNATURE_PARAMS)
+    return urlunsplit((u.scheme, u.netloc, u.path, query, ""))
+
+
+class ConnectionPool:
+    # Idle keep-alive connections per (scheme, host, port), shared by the download threads
+    def __init__(self, timeout: float = TIMEOUT):
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def get(self, scheme: str, host: str, port: Optional[int]) -> Tuple[Tuple[str, str, int], http.client.HTTPConnection]:
+        key = (scheme, host, port or (443 if scheme == "https" else 80))
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return key, idle.pop()
+            self.opened += 1
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return key, cls(key[1], key[2], timeout=self.timeout)
+
+    def put(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            self._idle.setdefault(key, []).append(conn)
+
+    def close(self) -> None:
+        with self._lock:
+            for conns in self._idle.values():
+                for c in conns:
+                    c.close()
+            self._idle.clear()
+
+
+class MediaStore:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(root, "partial"), exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(root, "index.db"))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(INDEX_SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # The index's url column holds media_key(url); callers pass the key to lookup/partial_path/commit
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        row = self.conn.execute("SELECT sha256, size, content_type, path FROM media WHERE url = ?", (key,)).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.root, row[3])):
+            return None
+        return dict(zip(("sha256", "size", "content_type", "path"), row))
+
+    def partial_path(self, key: str) -> str:
+        return os.path.join(self.root, "partial", hashlib.sha1(key.encode("utf-8")).hexdigest() + ".part")
+
+    def commit(self, key: str, part: str, content_type: Optional[str]) -> Dict:
+        # Moves a finished download to its content address (or drops it if that content is already stored)
+        h = hashlib.sha256()
+        with open(part, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK), b""):
+                h.update(chunk)
+        sha = h.hexdigest()
+        ext = mimetypes.guess_extension((content_type or "").split(";")[0].strip()) or os.path.splitext(urlsplit(key).path)[1][:8]
+        rel = os.path.join("objects", sha[:2], sha + ext)
+        dest = os.path.join(self.root, rel)
+        size = os.path.getsize(part)
+        if os.path.exists(dest):
+            os.remove(part)
+        else:
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            os.replace(part, dest)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO media (url, sha256, size, content_type, path, fetched_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, sha, size, content_type, rel, time.time()),
+            )
+        return {"sha256": sha, "size": size, "content_type": content_type, "path": rel}
+
+
+def fetch_to_file(pool: ConnectionPool, url: str, part: str, max_bytes: int = MAX_BYTES, max_redirects: int = 5) -> Optional[str]:
+    # Blocking download into part (resuming it if present); returns the Content-Type
+    for _ in range(max_redirects + 1):
+        u = urlsplit(url)
+        have = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"User-Agent": USER_AGENT, "Accept": "*/*"}
+        if have:
+            headers["Range"] = f"bytes={have}-"
+        key, conn = pool.get(u.scheme, u.hostname, u.port)
+        target = u.path or "/"
+        if u.query:
+            target += "?" + u.query
+        try:
+            conn.request("GET", target, headers=headers)
+            resp = conn.getresponse()
+        except Exception:
+            conn.close()
+            raise
+        reusable = True
+        try:
+            if resp.status in (301, 302, 303, 307, 308) and resp.getheader("Location"):
+                resp.read()
+                url = resp.getheader("Location")
+                if url.startswith("/"):
+                    url = f"{u.scheme}://{u.netloc}{url}"
+                continue
+            if resp.status == 416 and have:
+                # Range past the end: the partial file is already complete
+                resp.read()
+                return None
+            if resp.status not in (200, 206):
+                resp.read()
+                raise RuntimeError(f"HTTP {resp.status}")
+            append = resp.status == 206
+            length = resp.getheader("Content-Length")
+            total = (have if append else 0) + (int(length) if length and length.isdigit() else 0)
+            if total > max_bytes:
+                reusable = False
+                raise TooLarge(f"{total} bytes")
+            written = have if append else 0
+            with open(part, "ab" if append else "wb") as f:
+                while True:
+                    chunk = resp.read(CHUNK)
+                    if not chunk:
+                        break
+                    written += len(chunk)
+                    if written > max_bytes:
+                        reusable = False
+                        raise TooLarge(f"over {max_bytes} bytes")
+                    f.write(chunk)
+            return resp.getheader("Content-Type")
+        except BaseException:
+            reusable = False
+            raise
+        finally:
+            if reusable and not resp.will_close:
+                pool.put(key, conn)
+            else:
+                conn.close()
+    raise RuntimeError("Too many redirects")
+
+
+async def download_all(
+    urls: Iterable[str],
+    root: str = "media",
+    concurrency: int = CONCURRENCY,
+    max_bytes: int = MAX_BYTES,
+    max_total_bytes: Optional[int] = None,
+    timeout: float = TIMEOUT,
+) -> Dict:
+    # Returns counts plus {"files": {url: sha256}} for everything now in the store. URLs with the same
+    # media_key (the same file under different signatures) are fetched once and counted as one.
+    store = MediaStore(root)
+    pool = ConnectionPool(timeout)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    sem = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    stats = {"cached": 0, "downloaded": 0, "deduped": 0, "too_large": 0, "failed": 0, "skipped": 0, "bytes": 0}
+    files: Dict[str, str] = {}
+    errors: Dict[str, str] = {}
+    known_hashes = {r[0] for r in store.conn.execute("SELECT DISTINCT sha256 FROM media")}
+
+    by_key: Dict[str, List[str]] = {}
+    for url in urls:
+        by_key.setdefault(media_key(url), []).append(url)
+
+    async def one(key: str, same: List[str]) -> None:
+        # Fetched with the first URL seen; the others only differ in their signature
+        url = same[0]
+        hit = store.lookup(key)
+        if hit is not None:
+            stats["cached"] += 1
+            files.update(dict.fromkeys(same, hit["sha256"]))
+            return
+        async with sem:
+            if max_total_bytes is not None and stats["bytes"] >= max_total_bytes:
+                stats["skipped"] += 1
+                return
+            part = store.partial_path(key)
+            try:
+                ctype = await loop.run_in_executor(executor, fetch_to_file, pool, url, part, max_bytes)
+            except TooLarge:
+                stats["too_large"] += 1
+                if os.path.exists(part):
+                    os.remove(part)
+                return
+            except Exception as e:
+                # The partial file stays, so the next run resumes it
+                stats["failed"] += 1
+                errors[url] = str(e)
+                return
+            info = store.commit(key, part, ctype)
+            files.update(dict.fromkeys(same, info["sha256"]))
+            if info["sha256"] in known_hashes:
+                stats["deduped"] += 1
+            else:
+                known_hashes.add(info["sha256"])
+                stats["downloaded"] += 1
+                stats["bytes"] += info["size"]
+
+    try:
+        await asyncio.gather(*(one(k, same) for k, same in by_key.items()))
+    finally:
+        executor.shutdown(wait=True)
+        pool.close()
+        store.close()
+    return {**stats, "connections": pool.opened, "errors": errors, "files": files}
+
+
+def media_urls(records: Iterable[Dict]) -> Iterator[str]:
+    for rec in records:
+        for k in ("imgUrl", "videoUrl"):
+            u = rec.get(k)
+            if u and u.startswith(("http://", "https://")):
+                yield u
+
+
+def download_media(records: Iterable[Dict], root: str = "media", **kwargs) -> Dict:
+    # Blocking entry point for scraper.py. Playwright's sync API keeps an event loop running on the calling
+    # thread, where asyncio.run() refuses to start, so the downloads then get a thread (and loop) of their own.
+    urls = list(media_urls(records))
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(download_all(urls, root, **kwargs))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(lambda: asyncio.run(download_all(urls, root, **kwargs))).result()
+
+
+def summary(stats: Dict) -> str:
+    return (
+        f"Media: {stats['downloaded']} downloaded ({stats['bytes'] / 1_000_000:.1f} MB), {stats['cached']} cached, "
+        f"{stats['deduped']} duplicates, {stats['too_large']} too large, {stats['failed']} failed, {stats['skipped']} over the total cap"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Download the images/videos of scraped posts into a content-addressed store")
+    parser.add_argument("inputs", nargs="+", help="{username}.json or .ndjson[.gz] outputs")
+    parser.add_argument("--root", default="media", help="Store directory (objects/, partial/, index.db)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES / 1024 / 1024, help="Skip files larger than this")
+    parser.add_argument("--max-total-mb", type=float, help="Stop downloading new files after this much")
+    args = parser.parse_args()
+
+    from output import iter_ndjson
+
+    records: List[Dict] = []
+    for path in args.inputs:
+        if ".ndjson" in path:
+            compression = "gzip" if path.endswith(".gz") else "zstd" if path.endswith(".zst") else None
+            records.extend(iter_ndjson(path, compression))
+        else:
+            with open(path, encoding="utf-8") as f:
+                records.extend(json.load(f))
+    stats = download_media(
+        records,
+        args.root,
+        concurrency=args.concurrency,
+        max_bytes=int(args.max_mb * 1024 * 1024),
+        max_total_bytes=int(args.max_total_mb * 1024 * 1024) if args.max_total_mb else None,
+    )
+    print(summary(stats))
+    for url, err in list(stats["errors"].items())[:20]:
+        print(f"  {err}: {url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from playwright.sync_api import JSHandle
+
+
+# Per-phase wall time, per-extractor time and Playwright round trips for one scraped profile.
+# NULL_METRICS is the default everywhere: its methods do nothing and wrap() hands objects back unchanged,
+# so a run without --metrics pays one no-op call per phase/round.
+
+PROM_PREFIX = "linkedin_scraper"
+
+
+class NullMetrics:
+    enabled = False
+
+    def phase(self, name: str):
+        return nullcontext()
+
+    def timed(self, name: str, fn: Callable, *args):
+        return fn(*args)
+
+    def timed_iter(self, name: str, items: Iterable) -> Iterable:
+        return items
+
+    def add(self, name: str, n: int = 1) -> None:
+        pass
+
+    def set(self, name: str, value) -> None:
+        pass
+
+    def sample_cards(self, n: int) -> None:
+        pass
+
+    def wrap(self, obj):
+        return obj
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Metrics(NullMetrics):
+    enabled = True
+
+    def __init__(self, username: str = ""):
+        self.username = username
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        # name -> {"sec", "count", "playwright_calls"}
+        self.phases: Dict[str, Dict] = {}
+        # extractor name -> {"sec", "count"}
+        self.extractors: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = {"playwright_calls": 0}
+        self.values: Dict[str, object] = {}
+        # (seconds since start, cards loaded)
+        self.cards_over_time: List[Tuple[float, int]] = []
+
+    def _add_phase(self, name: str, sec: float, calls: int, count: int = 1) -> None:
+        p = self.phases.setdefault(name, {"sec": 0.0, "count": 0, "playwright_calls": 0})
+        p["sec"] += sec
+        p["count"] += count
+        p["playwright_calls"] += calls
+
+    @contextmanager
+    def phase(self, name: str):
+        calls = self.counters["playwright_calls"]
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._add_phase(name, time.perf_counter() - t0, self.counters["playwright_calls"] - calls)
+
+    def timed(self, name: str, fn: Callable, *args):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            e = self.extractors.setdefault(name, {"sec": 0.0, "count": 0})
+            e["sec"] += time.perf_counter() - t0
+            e["count"] += 1
+
+    def timed_iter(self, name: str, items: Iterable) -> Iterator:
+        # Phase time spent producing items only (whatever the consumer does in between is not counted);
+        # the phase "count" is the number of items produced
+        it = iter(items)
+        sec = 0.0
+        calls = n = 0
+        try:
+            while True:
+                c0 = self.counters["playwright_calls"]
+                t0 = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    sec += time.perf_counter() - t0
+                    calls += self.counters["playwright_calls"] - c0
+                n += 1
+                yield item
+        finally:
+            self._add_phase(name, sec, calls, n)
+
+    def add(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value) -> None:
+        self.values[name] = value
+
+    def sample_cards(self, n: int) -> None:
+        self.cards_over_time.append((round(time.perf_counter() - self._t0, 3), n))
+
+    def wrap(self, obj):
+        return CountingProxy(obj, self)
+
+    def to_dict(self) -> Dict:
+        extract = self.phases.get("extract", {})
+        cards = extract.get("count", 0)
+        extract_calls = extract.get("playwright_calls", 0)
+        return {
+            "username": self.username,
+            "started": self.started,
+            "total_sec": round(time.perf_counter() - self._t0, 6),
+            "phases": {k: {**v, "sec": round(v["sec"], 6)} for k, v in self.phases.items()},
+            "extractors": {k: {**v, "sec": round(v["sec"], 6)} for k, v in self.extractors.items()},
+            "counters": dict(self.counters),
+            "cards": cards,
+            "playwright_calls_per_card": round(extract_calls / cards, 3) if cards else None,
+            **self.values,
+            "cards_over_time": self.cards_over_time,
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class CountingProxy:
+    # Stands in for a Playwright Page/ElementHandle/JSHandle: every method call is counted as one
+    # round trip, and handles it returns are wrapped too
+    __slots__ = ("_obj", "_metrics")
+
+    def __init__(self, obj, metrics: Metrics):
+        self._obj = obj
+        self._metrics = metrics
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._obj, name)
+        if not callable(attr):
+            return attr
+        metrics = self._metrics
+
+        def call(*args, **kwargs):
+            metrics.counters["playwright_calls"] += 1
+            return _wrap_result(attr(*args, **kwargs), metrics)
+
+        return call
+
+
+def _wrap_result(result, metrics: Metrics):
+    if isinstance(result, JSHandle):
+        return CountingProxy(result, metrics)
+    if isinstance(result, list) and result and isinstance(result[0], JSHandle):
+        return [CountingProxy(r, metrics) for r in result]
+    return result
+
+
+def _prom_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def prometheus_text(runs: List[Metrics]) -> str:
+    # Prometheus text exposition format, for node_exporter's textfile collector
+    series: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def emit(name: str, kind: str, help_text: str, labels: Dict[str, str], value) -> None:
+        full = f"{PROM_PREFIX}_{name}"
+        series.setdefault(full, (kind, help_text, []))[2].append(f"{full}{_prom_labels(labels)} {value}")
+
+    for m in runs:
+        user = {"user": m.username} if m.username else {}
+        d = m.to_dict()
+        emit("run_seconds", "gauge", "Wall time of the run", user, d["total_sec"])
+        for phase, p in d["phases"].items():
+            emit("phase_seconds", "gauge", "Wall time per phase", {**user, "phase": phase}, p["sec"])
+            emit("phase_playwright_calls", "gauge", "Playwright calls made during the phase", {**user, "phase": phase}, p["playwright_calls"])
+        for ex, e in d["extractors"].items():
+            emit("extractor_seconds", "gauge", "Time spent in each per-element extractor", {**user, "extractor": ex}, e["sec"])
+        for k, v in m.values.items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                emit(k, "gauge", k.replace("_", " ").capitalize(), user, v)
+        if not m.username:
+            # Run-wide entry (login, rate limiter): no per-card numbers
+            continue
+        for k, v in d["counters"].items():
+            emit(f"{k}_total", "counter", f"Count of {k.replace('_', ' ')}", user, v)
+        emit("cards", "gauge", "Cards extracted", user, d["cards"])
+        if d["playwright_calls_per_card"] is not None:
+            emit("playwright_calls_per_card", "gauge", "Playwright calls per extracted card", user, d["playwright_calls_per_card"])
+    lines = []
+    for name, (kind, help_text, samples) in series.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(runs: List[Metrics], path: str) -> None:
+    # Write then rename, so the textfile collector never reads a half-written file
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text(runs))
+    os.replace(tmp, path)
+
+
+def metrics_path(username: str) -> str:
+    return f"{username}.metrics.json"
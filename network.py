@@ -0,0 +1,301 @@
+import argparse
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from output import dumps
+from scraper import (
+    build_record,
+    clean_url,
+    type_from_flags,
+)
+from textparse import parse_date_action
+
+
+# Structured extraction from the feed's own API responses (Voyager JSON) instead of rendered DOM text.
+# LinkedIn returns "normalized" payloads: entities live in `included` and reference each other by URN
+# through "*field" keys, so responses are merged into one entity table and resolved after scrolling.
+
+FEED_RESPONSE_PATTERNS = ("/voyager/api/graphql", "/voyager/api/feed/", "/voyager/api/identity/profileUpdates")
+EMBEDDED_PAYLOADS_JS = "() => Array.from(document.querySelectorAll(\"code[id^='bpr-guid-']\")).map((el) => el.textContent)"
+ACTIVITY_URN_RE = re.compile(r"urn:li:activity:\d+")
+
+
+def _field(obj: Optional[Dict], name: str, entities: Dict[str, Dict]):
+    # obj[name], or the entity referenced by obj["*name"]
+    if not isinstance(obj, dict):
+        return None
+    v = obj.get(name)
+    if v is not None:
+        return v
+    ref = obj.get("*" + name)
+    if isinstance(ref, str):
+        return entities.get(ref)
+    return None
+
+
+def _path(obj, names: List[str], entities: Dict[str, Dict]):
+    for name in names:
+        obj = _field(obj, name, entities)
+        if obj is None:
+            return None
+    return obj
+
+
+def _text(obj, entities: Dict[str, Dict]) -> Optional[str]:
+    # TextViewModel: {"text": "..."} or nested {"text": {"text": "..."}}
+    while isinstance(obj, dict):
+        obj = _field(obj, "text", entities)
+    return obj if isinstance(obj, str) else None
+
+
+def _is_update(entity: Dict) -> bool:
+    t = entity.get("$type", "")
+    return t.endswith("feed.Update") or t.endswith("render.UpdateV2")
+
+
+def activity_urn(update: Dict) -> Optional[str]:
+    for v in (
+        (update.get("metadata") or {}).get("backendUrn"),
+        (update.get("updateMetadata") or {}).get("urn"),
+        update.get("entityUrn"),
+        update.get("urn"),
+    ):
+        if isinstance(v, str):
+            m = ACTIVITY_URN_RE.search(v)
+            if m:
+                return m.group(0)
+    return None
+
+
+def _vector_image_url(img: Optional[Dict]) -> Optional[str]:
+    if not isinstance(img, dict):
+        return None
+    root = img.get("rootUrl") or ""
+    artifacts = img.get("artifacts") or []
+    if not artifacts:
+        return img.get("url")
+    best = max(artifacts, key=lambda a: a.get("width") or 0)
+    seg = best.get("fileIdentifyingUrlPathSegment") or ""
+    return (root + seg) or None
+
+
+def _image_url(content: Dict, entities: Dict[str, Dict]) -> Optional[str]:
+    comp = _field(content, "imageComponent", entities)
+    if not isinstance(comp, dict):
+        return None
+    for image in comp.get("images") or []:
+        for attr in image.get("attributes") or []:
+            vector = _path(attr, ["detailData", "vectorImage"], entities) or _field(attr, "vectorImage", entities)
+            url = _vector_image_url(vector)
+            if url:
+                return url
+    return None
+
+
+def _video_url(content: Dict, entities: Dict[str, Dict]) -> Optional[str]:
+    comp = _field(content, "linkedInVideoComponent", entities)
+    meta = _field(comp, "videoPlayMetadata", entities)
+    if not isinstance(meta, dict):
+        return None
+    for stream in meta.get("progressiveStreams") or []:
+        for loc in stream.get("streamingLocations") or []:
+            if loc.get("url"):
+                return loc["url"]
+    return None
+
+
+def _article_url(content: Dict, entities: Dict[str, Dict]) -> Optional[str]:
+    comp = _field(content, "articleComponent", entities)
+    return _path(comp, ["navigationContext", "actionTarget"], entities)
+
+
+def _job_url(content: Dict, entities: Dict[str, Dict]) -> Optional[str]:
+    for name in ("jobComponent", "entityComponent"):
+        target = _path(_field(content, name, entities), ["ctaButton", "navigationContext", "actionTarget"], entities) or _path(
+            _field(content, name, entities), ["navigationContext", "actionTarget"], entities
+        )
+        if isinstance(target, str) and "/jobs/view/" in target:
+            return target
+    return None
+
+
+def _share_url(update: Dict, entities: Dict[str, Dict]) -> Optional[str]:
+    url = _path(update, ["socialContent", "shareUrl"], entities)
+    if url:
+        return url
+    urn = activity_urn(update)
+    return f"https://www.linkedin.com/feed/update/{urn}/" if urn else None
+
+
+def _counts(update: Dict, urn: Optional[str], entities: Dict[str, Dict], counts_by_activity: Dict[str, Dict]) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
+    counts = _path(update, ["socialDetail", "totalSocialActivityCounts"], entities)
+    if not isinstance(counts, dict) and urn:
+        counts = counts_by_activity.get(urn)
+    if not isinstance(counts, dict):
+        return None, None, None, None
+    return counts.get("numLikes"), counts.get("numComments"), counts.get("numShares"), counts.get("numImpressions")
+
+
+def record_from_update(update: Dict, entities: Dict[str, Dict], scraped_profile_url: str, counts_by_activity: Optional[Dict[str, Dict]] = None) -> Dict:
+    counts_by_activity = counts_by_activity or {}
+    urn = activity_urn(update)
+    actor = _field(update, "actor", entities) or {}
+    content = _field(update, "content", entities) or {}
+    reshared = _field(update, "resharedUpdate", entities)
+    author = _text(_field(actor, "name", entities), entities)
+    author_url = clean_url(_path(actor, ["navigationContext", "actionTarget"], entities))
+    profiles = [author_url] if author_url and "/in/" in author_url else []
+    names = {author_url: author}
+    shared_post_url = _article_url(content, entities)
+    post_content = _text(_field(update, "commentary", entities), entities)
+    if isinstance(reshared, dict):
+        # Reposts carry the original post (and its author) as a nested update
+        r_actor = _field(reshared, "actor", entities) or {}
+        r_url = clean_url(_path(r_actor, ["navigationContext", "actionTarget"], entities))
+        if r_url and "/in/" in r_url:
+            profiles.append(r_url)
+            names[r_url] = _text(_field(r_actor, "name", entities), entities)
+        shared_post_url = _share_url(reshared, entities)
+        content = _field(reshared, "content", entities) or content
+        post_content = post_content or _text(_field(reshared, "commentary", entities), entities)
+    img_url = _image_url(content, entities)
+    video_url = _video_url(content, entities)
+    post_type = type_from_flags(video_url is not None or _field(content, "linkedInVideoComponent", entities) is not None,
+                                _field(content, "articleComponent", entities) is not None,
+                                img_url is not None)
+    sub = _text(_field(actor, "subDescription", entities), entities)
+    return build_record(
+        scraped_profile_url,
+        (clean_url(_share_url(update, entities)), author_url, clean_url(shared_post_url), clean_url(_job_url(content, entities))),
+        author,
+        post_content,
+        (img_url, video_url),
+        _counts(update, urn, entities, counts_by_activity),
+        parse_date_action([sub] if sub else []),
+        post_type,
+        profiles,
+        lambda url: names.get(url),
+    )
+
+
+class FeedResponseCollector:
+    # Listens to page responses while the feed loads/scrolls and keeps the Voyager entities they carry
+    def __init__(self):
+        self.entities: Dict[str, Dict] = {}
+        # Ordered set of update URNs (dict keys keep insertion order)
+        self.update_order: Dict[str, None] = {}
+        self.responses = 0
+        self.errors = 0
+        self._page = None
+
+    def attach(self, page) -> None:
+        self._page = page
+        page.on("response", self.on_response)
+
+    def detach(self) -> None:
+        if self._page is not None:
+            try:
+                self._page.remove_listener("response", self.on_response)
+            except Exception:
+                pass
+            self._page = None
+
+    def on_response(self, response) -> None:
+        url = response.url
+        if not any(p in url for p in FEED_RESPONSE_PATTERNS):
+            return
+        try:
+            payload = response.json()
+        except Exception:
+            self.errors += 1
+            return
+        self.responses += 1
+        self.add_payload(payload)
+
+    def collect_embedded(self, page) -> None:
+        # The first page of updates is often server-rendered into <code id="bpr-guid-..."> blocks
+        try:
+            blobs = page.evaluate(EMBEDDED_PAYLOADS_JS)
+        except Exception:
+            return
+        for blob in blobs:
+            try:
+                # Read after scrolling, but they hold the newest updates: keep them ahead of the XHR pages
+                self.add_payload(json.loads(blob), first=True)
+            except Exception:
+                continue
+
+    def add_payload(self, payload, first: bool = False) -> None:
+        # first: the payload's updates go before those collected so far (server-rendered first page)
+        if not isinstance(payload, dict):
+            return
+        if first:
+            later, self.update_order = self.update_order, {}
+        for entity in payload.get("included") or []:
+            if not isinstance(entity, dict) or not entity.get("entityUrn"):
+                continue
+            urn = entity["entityUrn"]
+            self.entities[urn] = entity
+            if _is_update(entity):
+                self.update_order.setdefault(urn, None)
+        # Feed order comes from the "*elements" lists in the response data
+        for urn in self._element_refs(payload.get("data")):
+            self.update_order.pop(urn, None)
+            self.update_order[urn] = None
+        if first:
+            for urn in later:
+                self.update_order.setdefault(urn, None)
+
+    def _element_refs(self, obj) -> Iterator[str]:
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if k == "*elements" and isinstance(v, list):
+                    for urn in v:
+                        if isinstance(urn, str):
+                            yield urn
+                else:
+                    yield from self._element_refs(v)
+        elif isinstance(obj, list):
+            for v in obj:
+                yield from self._element_refs(v)
+
+    def iter_updates(self) -> Iterator[Dict]:
+        # Nested (reshared) updates are reached through their parent
+        nested = {e["*resharedUpdate"] for e in self.entities.values() if isinstance(e.get("*resharedUpdate"), str)}
+        for urn in self.update_order:
+            entity = self.entities.get(urn)
+            if entity is not None and _is_update(entity) and urn not in nested:
+                yield entity
+
+    def iter_records(self, scraped_profile_url: str) -> Iterator[Tuple[Optional[str], Dict]]:
+        # (activity urn, record) in feed order
+        counts_by_activity: Dict[str, Dict] = {}
+        for e in self.entities.values():
+            if e.get("$type", "").endswith("SocialActivityCounts"):
+                m = ACTIVITY_URN_RE.search(e.get("entityUrn") or e.get("urn") or "")
+                if m:
+                    counts_by_activity[m.group(0)] = e
+        for update in self.iter_updates():
+            try:
+                yield activity_urn(update), record_from_update(update, self.entities, scraped_profile_url, counts_by_activity)
+            except Exception:
+                continue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Turn recorded Voyager feed payloads into post records")
+    parser.add_argument("payloads", nargs="+", help="JSON files with recorded feed responses")
+    parser.add_argument("--profile-url", required=True, help="Scraped profile URL, e.g. https://www.linkedin.com/in/username")
+    args = parser.parse_args()
+
+    collector = FeedResponseCollector()
+    for path in args.payloads:
+        with open(path, encoding="utf-8") as f:
+            collector.add_payload(json.load(f))
+    records = [rec for _, rec in collector.iter_records(args.profile_url)]
+    print(dumps(records, indent=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+import argparse
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional
+
+from selectolax.lexbor import LexborHTMLParser
+from urllib.parse import urlsplit
+
+from output import write_json
+from scraper import (
+    ARTICLE_LINK_SELECTOR,
+    ARTICLE_SELECTOR,
+    AUTHOR_SELECTORS,
+    AUTHOR_TITLE_SELECTOR,
+    CARD_SELECTOR,
+    CARD_SELECTOR_FALLBACK,
+    CONTENT_SELECTORS,
+    DATE_SELECTOR,
+    EXTERNAL_LINK_SELECTOR,
+    IMAGE_SELECTOR,
+    JOB_LINK_SELECTOR,
+    LIKE_BUTTON_SELECTOR,
+    LIKE_SPAN_SELECTOR,
+    POST_LINK_SELECTOR,
+    PROFILE_LINK_SELECTOR,
+    SHARED_POST_SELECTOR,
+    TEXT_SELECTORS,
+    VIDEO_SELECTOR,
+    record_from_snapshot,
+    records_from_snapshots,
+)
+
+
+# Browser-free extraction: builds the same card snapshot as SNAPSHOT_JS in scraper.py from saved
+# outerHTML, so record_from_snapshot() yields the records scrape_user() would have produced.
+
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+    "nav", "ol", "p", "pre", "section", "table", "tr", "ul",
+}
+_SKIP_TAGS = {"script", "style", "template", "noscript", "head", "_comment"}
+_WS = re.compile(r"\s+")
+
+
+def inner_text(node) -> Optional[str]:
+    # Approximate HTMLElement.innerText without layout: collapse whitespace, break lines at block elements
+    if node is None:
+        return None
+    parts: List[str] = []
+
+    def walk(n) -> None:
+        for child in n.iter(include_text=True):
+            tag = child.tag
+            if tag == "-text":
+                parts.append(_WS.sub(" ", child.text_content or ""))
+            elif tag == "br":
+                parts.append("\n")
+            elif tag in _SKIP_TAGS:
+                continue
+            elif tag in _BLOCK_TAGS:
+                parts.append("\n")
+                walk(child)
+                parts.append("\n")
+            else:
+                walk(child)
+
+    walk(node)
+    lines = [line.strip() for line in "".join(parts).split("\n")]
+    return "\n".join(line for line in lines if line)
+
+
+def _qa(node, sel: str) -> list:
+    # Like Element.querySelectorAll: descendants only (lexbor also matches the node itself)
+    try:
+        return [n for n in node.css(sel) if n.mem_id != node.mem_id]
+    except Exception:
+        return []
+
+
+def _q(node, sel: str):
+    try:
+        n = node.css_first(sel)
+    except Exception:
+        return None
+    if n is not None and n.mem_id == node.mem_id:
+        found = _qa(node, sel)
+        return found[0] if found else None
+    return n
+
+
+def _attr(node, name: str) -> Optional[str]:
+    if node is None:
+        return None
+    v = node.attributes.get(name)
+    # Valueless attributes come back as None; the DOM reports them as ""
+    if v is None and name in node.attributes:
+        return ""
+    return v
+
+
+def _path(href: str) -> str:
+    return urlsplit(href).path
+
+
+def snapshot_from_node(card, with_html: bool = False) -> Dict:
+    content = card
+    for s in CONTENT_SELECTORS:
+        el = _q(card, s)
+        if el is not None:
+            content = el
+            break
+    vid = _q(content, VIDEO_SELECTOR)
+    img = _q(content, IMAGE_SELECTOR)
+    article = _q(content, ARTICLE_LINK_SELECTOR)
+    like_btn = _q(card, LIKE_BUTTON_SELECTOR)
+    profile_hrefs = [_attr(a, "href") for a in _qa(card, PROFILE_LINK_SELECTOR)]
+    author_titles: Dict[str, Optional[str]] = {}
+    for href in profile_hrefs:
+        if not href:
+            continue
+        path = _path(href)
+        if path in author_titles:
+            continue
+        author_titles[path] = None
+        container = _q(card, f"a[href*='{path}']")
+        if container is None:
+            continue
+        for _ in range(4):
+            container = container.parent
+            if container is None:
+                break
+            t = (inner_text(_q(container, AUTHOR_TITLE_SELECTOR)) or "").strip()
+            if t:
+                author_titles[path] = t
+                break
+    return {
+        "urn": _attr(card, "data-urn"),
+        "html": card.html if with_html else None,
+        "linkHrefs": [h for h in (_attr(a, "href") for a in _qa(card, POST_LINK_SELECTOR)) if h],
+        "articleHref": _attr(article, "href"),
+        "externalHref": None if article is not None else _attr(_q(content, EXTERNAL_LINK_SELECTOR), "href"),
+        "authorHref": _attr(_q(card, PROFILE_LINK_SELECTOR), "href"),
+        "sharedHref": _attr(_q(card, SHARED_POST_SELECTOR), "href"),
+        "jobHref": _attr(_q(card, JOB_LINK_SELECTOR), "href"),
+        "authorTexts": [inner_text(_q(card, s)) for s in AUTHOR_SELECTORS],
+        "texts": [inner_text(_q(card, s)) for s in TEXT_SELECTORS],
+        "videoSrc": _attr(vid, "src"),
+        "imgSrc": (_attr(img, "src") or _attr(img, "data-delayed-url")) if img is not None else None,
+        "hasVideo": vid is not None,
+        "hasArticle": _q(content, ARTICLE_SELECTOR) is not None,
+        "hasImage": img is not None,
+        "likeAria": (_attr(like_btn, "aria-label") or "") if like_btn is not None else None,
+        "likeSpan": inner_text(_q(card, LIKE_SPAN_SELECTOR)),
+        "cardText": inner_text(card) or "",
+        "dateTexts": [(inner_text(e) or "").strip() for e in _qa(card, DATE_SELECTOR)],
+        "profileHrefs": profile_hrefs,
+        "authorTitles": author_titles,
+    }
+
+
+def find_card_nodes(html: str) -> list:
+    tree = LexborHTMLParser(html)
+    cards = tree.css(CARD_SELECTOR)
+    if not cards:
+        cards = tree.css(CARD_SELECTOR_FALLBACK)
+    return cards
+
+
+def iter_snapshots(html: str, with_html: bool = False):
+    for card in find_card_nodes(html):
+        yield snapshot_from_node(card, with_html)
+
+
+def extract_records(html_chunks: Iterable[str], scraped_profile_url: str) -> List[Dict]:
+    # Same de-duplication as scrape_user(): one record per activity URN
+    return records_from_snapshots((snap for html in html_chunks for snap in iter_snapshots(html)), scraped_profile_url)
+
+
+def record_from_card_html(html: str, scraped_profile_url: str) -> Optional[Dict]:
+    # One card's outerHTML -> its record (None if the card selector doesn't match); picklable for worker processes
+    cards = find_card_nodes(html)
+    if not cards:
+        return None
+    return record_from_snapshot(snapshot_from_node(cards[0]), scraped_profile_url)
+
+
+def username_from_path(path: str) -> str:
+    # "{username}.cards.html" as written by scrape_user(save_cards=True)
+    name = os.path.basename(path)
+    for suffix in (".cards.html", ".html"):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-extract posts from saved LinkedIn card HTML without a browser")
+    parser.add_argument("inputs", nargs="+", help="Card HTML files, e.g. username.cards.html")
+    parser.add_argument("--out-dir", default=".", help="Directory for the {username}.json outputs")
+    parser.add_argument("--profile-url", help="Scraped profile URL (default: derived from the file name)")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for path in args.inputs:
+        u = username_from_path(path)
+        profile_url = args.profile_url or f"https://www.linkedin.com/in/{u}"
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        t0 = time.perf_counter()
+        data = extract_records([html], profile_url)
+        elapsed = time.perf_counter() - t0
+        out = os.path.join(args.out_dir, f"{u}.json")
+        write_json(data, out)
+        rate = len(data) / elapsed if elapsed > 0 else 0.0
+        print(f"Wrote {len(data)} posts to {out} ({rate:.0f} cards/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import gzip
+import io
+import json
+from collections.abc import Mapping
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Streaming writers for scraped records: NDJSON (optionally gzip/zstd compressed), a pretty JSON
+# array produced from it without loading every record at once, and incremental card HTML dumps.
+# Records (plain dicts or records.Post) are serialized with orjson when it is installed and the stdlib
+# json module otherwise; both produce the same bytes.
+
+COMPRESSION_SUFFIX = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise SystemExit("zstd compression needs the 'zstandard' package: pip install zstandard")
+    return zstandard
+
+
+def open_text(path: str, mode: str, compression: Optional[str] = None):
+    # mode is "w", "a" or "r"; always UTF-8 text. Appending to a compressed file adds a gzip member / zstd
+    # frame, which the readers here read through
+    if compression is None:
+        return open(path, mode, encoding="utf-8")
+    if compression == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    if compression == "zstd":
+        zstd = _zstandard()
+        raw = open(path, mode + "b")
+        if mode in ("w", "a"):
+            stream = zstd.ZstdCompressor().stream_writer(raw)
+        else:
+            stream = zstd.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    raise ValueError(f"Unknown compression: {compression!r}")
+
+
+def _plain(obj):
+    # json.dumps fallback for records.Post
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj, indent: bool = False) -> str:
+    # indent=True: json.dumps(obj, ensure_ascii=False, indent=2); otherwise compact (no spaces)
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+        except TypeError:
+            # Lone surrogates or integers past 64 bits: leave those to the stdlib
+            pass
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_plain)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_plain)
+
+
+def ndjson_path(username: str, compression: Optional[str] = None) -> str:
+    return f"{username}.ndjson{COMPRESSION_SUFFIX[compression]}"
+
+
+def write_ndjson(records: Iterable[Dict], path: str, compression: Optional[str] = None, append: bool = False) -> int:
+    # One JSON object per line, handed to the file as soon as each record arrives
+    n = 0
+    with open_text(path, "a" if append else "w", compression) as f:
+        for rec in records:
+            f.write(dumps(rec))
+            f.write("\n")
+            f.flush()
+            n += 1
+    return n
+
+
+def iter_ndjson(path: str, compression: Optional[str] = None) -> Iterator[Dict]:
+    with open_text(path, "r", compression) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def write_json_array(records: Iterable[Dict], path: str, compact: bool = False) -> int:
+    # Byte-for-byte what write_json(list(records), path, compact) writes, one record at a time
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for rec in records:
+            if compact:
+                f.write("[" if n == 0 else ",")
+                f.write(dumps(rec))
+            else:
+                f.write("[\n  " if n == 0 else ",\n  ")
+                f.write(dumps(rec, indent=True).replace("\n", "\n  "))
+            n += 1
+        f.write(("]" if compact else "\n]") if n else "[]")
+    return n
+
+
+def write_json(records: List[Dict], path: str, compact: bool = False) -> int:
+    # The whole list in one call: json.dump(records, f, ensure_ascii=False, indent=2), or a single line when compact
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(records, indent=not compact))
+    return len(records)
+
+
+def ndjson_to_json(path: str, json_path: str, compression: Optional[str] = None, previous: Optional[List[Dict]] = None, compact: bool = False, skip: int = 0) -> int:
+    # previous: records already in json_path that should follow the streamed ones (incremental runs)
+    # skip: leading NDJSON records left there by earlier runs (already part of previous)
+    def records():
+        yield from islice(iter_ndjson(path, compression), skip, None)
+        if previous:
+            yield from previous
+
+    return write_json_array(records(), json_path, compact)
+
+
+class CardHtmlWriter:
+    # Appends card outerHTML to {username}.cards.html as it is collected; list-like append() so it can
+    # stand in for the in-memory card_html_snippets list
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._f = open(path, "w", encoding="utf-8")
+        self._f.write("<!-- Saved LinkedIn card HTML snippets for analysis -->\n")
+
+    def append(self, html: str) -> None:
+        self.count += 1
+        self._f.write(f"\n<!-- CARD {self.count} -->\n")
+        self._f.write(html)
+        self._f.write("\n")
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HtmlTee:
+    # Hands each card's outerHTML to several append() sinks (e.g. the .cards.html dump and the archive)
+    def __init__(self, sinks: List):
+        self.sinks = sinks
+
+    def append(self, html: str) -> None:
+        for s in self.sinks:
+            s.append(html)
+
+
+def html_sink(*sinks):
+    # None when nothing wants card HTML (so the snapshot JS skips outerHTML), the sink itself when there is one
+    sinks = [s for s in sinks if s is not None]
+    if not sinks:
+        return None
+    return sinks[0] if len(sinks) == 1 else HtmlTee(sinks)
@@ -0,0 +1,64 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional
+
+from metrics import NULL_METRICS
+from offline import record_from_card_html
+from ratelimit import UNLIMITED
+from scraper import (
+    BATCH_SIZE,
+    CARD_HTML_JS,
+    iter_windowed_snapshots,
+    urn_older_than,
+)
+
+
+# Pipelined extraction: the scroll loop only pulls each new card's outerHTML out of the page (keyed by
+# activity URN) and keeps scrolling, while a process pool turns the HTML into records with the offline
+# (selectolax) extractor. Parsing happens during the scroll waits, so a profile takes about its scroll time.
+
+
+def iter_pipelined_records(
+    page,
+    scraped_profile_url: str,
+    workers: int = 2,
+    batch_size: int = BATCH_SIZE,
+    detach: str = "mark",
+    stop_urns: Optional[List[str]] = None,
+    since_ms: Optional[int] = None,
+    card_html_snippets: Optional[List[str]] = None,
+    seen_urns: Optional[set] = None,
+    card_urns: Optional[List[str]] = None,
+    metrics=NULL_METRICS,
+    limiter=UNLIMITED,
+) -> Iterator[Dict]:
+    # Yields records in feed order; same de-duplication (seen_urns) and outputs as iter_records_from_snapshots
+    if seen_urns is None:
+        seen_urns = set()
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        cards = iter_windowed_snapshots(
+            page, batch_size, detach=detach, stop_urns=stop_urns, since_ms=since_ms, metrics=metrics, snapshot_js=CARD_HTML_JS, limiter=limiter,
+        )
+        for card in cards:
+            urn_val = card["urn"] or ""
+            if urn_older_than(urn_val, since_ms):
+                continue
+            if urn_val.startswith("urn:li:activity:"):
+                if urn_val in seen_urns:
+                    continue
+                seen_urns.add(urn_val)
+            if card_urns is not None:
+                card_urns.append(urn_val)
+            if card_html_snippets is not None:
+                card_html_snippets.append(card["html"])
+            pending.append(pool.submit(record_from_card_html, card["html"], scraped_profile_url))
+            # Hand back whatever is already parsed without waiting on the rest
+            while pending and pending[0].done():
+                rec = pending.popleft().result()
+                if rec is not None:
+                    yield rec
+        while pending:
+            rec = pending.popleft().result()
+            if rec is not None:
+                yield rec
@@ -0,0 +1,190 @@
+from typing import Callable, Dict, Optional
+
+from scraper import CRASH_RETRIES, MAX_HEAP_MB, RECYCLE_AFTER
+
+
+# Page recycling for long sequential runs. A page (with its own context, hence its own renderer) that has
+# scrolled through many infinite feeds keeps growing and every navigation gets slower, so it is replaced
+# after `recycle_after` profiles or once its JS heap passes `max_heap_mb`. The replacement is a spare
+# context/page prepared ahead of time from the logged-in session, with the blocker/limiter already installed.
+# Renderer crashes and a dead browser are recovered from here too: run() retries the profile on a fresh page.
+
+HEAP_JS = "() => (performance.memory ? performance.memory.usedJSHeapSize : 0)"
+CRASH_MESSAGES = ("crashed", "Target closed", "has been closed", "Browser closed", "disconnected")
+
+
+class PagePool:
+    def __init__(
+        self,
+        browser_type,
+        launch_kwargs: Optional[Dict] = None,
+        context_kwargs: Optional[Dict] = None,
+        setup: Optional[Callable] = None,
+        recycle_after: int = RECYCLE_AFTER,
+        max_heap_mb: float = MAX_HEAP_MB,
+        spare: bool = True,
+        crash_retries: int = CRASH_RETRIES,
+    ):
+        # setup(context) runs on every new context (request blocking, rate limiter listener, ...).
+        # recycle_after / max_heap_mb of 0 turn that trigger off.
+        self.browser_type = browser_type
+        self.launch_kwargs = launch_kwargs or {}
+        self.context_kwargs = context_kwargs or {}
+        self.setup = setup
+        self.recycle_after = recycle_after
+        self.max_heap_mb = max_heap_mb
+        self.use_spare = spare
+        self.crash_retries = crash_retries
+        self.state = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self._spare = None
+        # Renderer crashes are tracked per page, so a spare dying in the background doesn't fail the active one
+        self._crashed_pages = set()
+        self._browser_crashed = False
+        self.profiles = 0
+        self.stats = {"recycled": 0, "recycled_for_memory": 0, "crashes": 0, "browser_restarts": 0, "retries": 0}
+
+    def start(self, storage_state=None):
+        # First context/page, from a saved session (path or dict) if any; log in on it, then call session_ready()
+        self.state = storage_state
+        self._launch()
+        self.context, self.page = self._new_page()
+        return self.page
+
+    def session_ready(self) -> None:
+        # The logged-in state every later context starts from; the spare is prepared right away.
+        # Also called after logging in again mid-run, so a spare from the old session is replaced.
+        self.state = self.context.storage_state()
+        if self._spare is not None:
+            self._crashed_pages.discard(self._spare[1])
+            try:
+                self._spare[0].close()
+            except Exception:
+                pass
+            self._spare = None
+        self._prepare_spare()
+
+    def _launch(self) -> None:
+        self.browser = self.browser_type.launch(**self.launch_kwargs)
+        self.browser.on("disconnected", lambda _: self._mark_browser_crashed())
+
+    def _mark_browser_crashed(self) -> None:
+        self._browser_crashed = True
+
+    def _new_page(self):
+        context = self.browser.new_context(**self.context_kwargs, storage_state=self.state)
+        if self.setup is not None:
+            self.setup(context)
+        page = context.new_page()
+        page.on("crash", self._crashed_pages.add)
+        return context, page
+
+    def _prepare_spare(self) -> None:
+        if self.use_spare and self._spare is None:
+            try:
+                self._spare = self._new_page()
+            except Exception as e:
+                print(f"Could not prepare a spare page: {e}")
+
+    def _close_current(self) -> None:
+        self._crashed_pages.discard(self.page)
+        try:
+            # Keep whatever cookies the session refreshed meanwhile
+            self.state = self.context.storage_state()
+        except Exception:
+            pass
+        try:
+            self.context.close()
+        except Exception:
+            pass
+
+    def _swap(self) -> None:
+        self._close_current()
+        if self._spare is not None and self._spare[1] in self._crashed_pages:
+            print("The spare page had crashed, starting a new one")
+            self._crashed_pages.discard(self._spare[1])
+            try:
+                self._spare[0].close()
+            except Exception:
+                pass
+            self._spare = None
+        if self._spare is not None:
+            self.context, self.page = self._spare
+            self._spare = None
+        else:
+            self.context, self.page = self._new_page()
+        self.profiles = 0
+        self._prepare_spare()
+
+    def heap_mb(self) -> float:
+        try:
+            return self.page.evaluate(HEAP_JS) / 1024 / 1024
+        except Exception:
+            return 0.0
+
+    def profile_done(self) -> None:
+        # Called after each profile; recycles the page when it has done enough or grown too big
+        self.profiles += 1
+        if self.recycle_after and self.profiles >= self.recycle_after:
+            self.stats["recycled"] += 1
+            self._swap()
+            return
+        if self.max_heap_mb:
+            heap = self.heap_mb()
+            if heap > self.max_heap_mb:
+                print(f"Page JS heap at {heap:.0f} MB, recycling the page")
+                self.stats["recycled"] += 1
+                self.stats["recycled_for_memory"] += 1
+                self._swap()
+
+    def is_crash(self, exc: BaseException) -> bool:
+        return self._browser_crashed or self.page in self._crashed_pages or any(m in str(exc) for m in CRASH_MESSAGES)
+
+    def restart(self) -> None:
+        # After a crash: new page on a live browser, or a relaunched browser (the spare died with the old one)
+        self.stats["crashes"] += 1
+        self._browser_crashed = False
+        if self.browser.is_connected():
+            self._swap()
+            return
+        self.stats["browser_restarts"] += 1
+        self._spare = None
+        self._crashed_pages.clear()
+        try:
+            self.browser.close()
+        except Exception:
+            pass
+        self._launch()
+        self.context, self.page = self._new_page()
+        self.profiles = 0
+        self._prepare_spare()
+
+    def run(self, fn: Callable, label: str = ""):
+        # fn(page) for one profile, retried on a fresh page/browser when the renderer or browser dies
+        for attempt in range(self.crash_retries + 1):
+            try:
+                return fn(self.page)
+            except Exception as e:
+                if not self.is_crash(e):
+                    raise
+                # Restart even when giving up, so the next profile gets a working page
+                self.restart()
+                if attempt >= self.crash_retries:
+                    raise
+                print(f"Page or browser crashed during {label or 'a profile'} ({e}); retrying on a fresh page")
+                self.stats["retries"] += 1
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"Page pool: {s['recycled']} recycles ({s['recycled_for_memory']} for memory), {s['crashes']} crashes, "
+            f"{s['browser_restarts']} browser restarts, {s['retries']} profile retries"
+        )
+
+    def close(self) -> None:
+        try:
+            self.browser.close()
+        except Exception:
+            pass
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+# Token-bucket pacing for navigations and scroll requests, shared by every page of a run, with
+# multiplicative slow-down on throttling signals (HTTP 429/999, feed pages that never render) and a
+# slow linear ramp back to full speed once things are quiet. Redirects to a login/authwall/checkpoint
+# page are not throttling but an expired session: scraper.py logs in again instead (SessionExpired).
+# The configured rates live in scraper.py (NAV_PER_MIN, SCROLL_PER_MIN).
+
+THROTTLE_STATUSES = (429, 999)  # LinkedIn answers 999 to clients it has flagged
+
+
+def throttle_signal(status: Optional[int]) -> Optional[str]:
+    # Name of the throttling signal a navigation ended on, if any
+    if status in THROTTLE_STATUSES:
+        return f"http_{status}"
+    return None
+
+
+class TokenBucket:
+    def __init__(self, per_min: float, burst: float = 1.0):
+        self.per_min = per_min
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float, factor: float) -> float:
+        # Takes a token (possibly going negative, i.e. reserving a future one); returns how long to wait
+        if not self.per_min:
+            return 0.0
+        rate = self.per_min * factor / 60.0
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= 1.0
+        return 0.0 if self.tokens >= 0 else -self.tokens / rate
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        nav_per_min: float,
+        scroll_per_min: float,
+        burst: float = 2.0,
+        decrease: float = 0.5,
+        min_factor: float = 0.05,
+        recover_per_min: float = 0.1,
+        cooldown_sec: float = 60.0,
+        max_cooldown_sec: float = 900.0,
+        max_retries: int = 2,
+    ):
+        # Rates of 0 mean unlimited. factor scales every bucket: 1.0 = configured rates; halved per throttle signal, then regains
+        # recover_per_min (10% of the configured rate per quiet minute by default)
+        self.buckets = {"navigation": TokenBucket(nav_per_min, burst), "scroll": TokenBucket(scroll_per_min, burst)}
+        self.decrease = decrease
+        self.min_factor = min_factor
+        self.recover_per_min = recover_per_min
+        self.cooldown_sec = cooldown_sec
+        self.max_cooldown_sec = max_cooldown_sec
+        self.max_retries = max_retries
+        self.factor = 1.0
+        self.pause_until = 0.0
+        self.consecutive = 0
+        self.signals: Dict[str, int] = {}
+        self.waited_sec = 0.0
+        self._last_recover = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, kind: str) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._recover(now)
+            wait = max(0.0, self.pause_until - now) + self.buckets[kind].reserve(now, self.factor)
+            self.waited_sec += wait
+            return wait
+
+    def acquire(self, kind: str = "navigation") -> None:
+        wait = self._reserve(kind)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, kind: str = "navigation") -> None:
+        wait = self._reserve(kind)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _recover(self, now: float) -> None:
+        if now < self.pause_until:
+            # No recovery while paused; the ramp starts when the pause ends
+            self._last_recover = self.pause_until
+            return
+        self.factor = min(1.0, self.factor + self.recover_per_min * (now - self._last_recover) / 60.0)
+        self._last_recover = now
+
+    def throttled(self, signal: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.consecutive += 1
+            self.factor = max(self.min_factor, self.factor * self.decrease)
+            cooldown = min(self.max_cooldown_sec, self.cooldown_sec * 2 ** (self.consecutive - 1))
+            self.pause_until = max(self.pause_until, now + cooldown)
+            self._last_recover = self.pause_until
+            self.signals[signal] = self.signals.get(signal, 0) + 1
+        print(f"Throttling signal ({signal}): pausing {cooldown:.0f}s, rate now {self.factor:.0%} of configured")
+
+    def ok(self) -> None:
+        # A navigation/scroll went through cleanly
+        with self._lock:
+            if time.monotonic() >= self.pause_until:
+                self.consecutive = 0
+
+    def on_response(self, response) -> None:
+        # page/context "response" listener: catches 429/999 on the feed's own XHR/fetch calls while scrolling
+        try:
+            if response.status in THROTTLE_STATUSES and "linkedin.com" in response.url and response.request.resource_type in ("xhr", "fetch"):
+                self.throttled(f"http_{response.status}")
+        except Exception:
+            pass
+
+    def install(self, context) -> None:
+        # Works on a BrowserContext or a Page, sync or async API
+        context.on("response", self.on_response)
+
+    def rate(self, kind: str = "navigation") -> float:
+        # Current allowed requests per minute
+        return self.buckets[kind].per_min * self.factor
+
+    def stats(self) -> Dict:
+        with self._lock:
+            self._recover(time.monotonic())
+            return {
+                "factor": round(self.factor, 3),
+                "navigation_per_min": round(self.rate("navigation"), 2),
+                "scroll_per_min": round(self.rate("scroll"), 2),
+                "paused_sec": round(max(0.0, self.pause_until - time.monotonic()), 1),
+                "signals": dict(self.signals),
+                "waited_sec": round(self.waited_sec, 1),
+            }
+
+    def summary(self) -> str:
+        s = self.stats()
+        signals = ", ".join(f"{k}={v}" for k, v in sorted(s["signals"].items())) or "none"
+        return f"Rate limiter: {s['navigation_per_min']} navigations/min, {s['scroll_per_min']} scrolls/min ({s['factor']:.0%}), throttling signals: {signals}, {s['waited_sec']}s spent waiting"
+
+
+class _Unlimited(RateLimiter):
+    # Default when no limiter is passed: never waits and never retries, still cheap to call
+    def __init__(self):
+        super().__init__(0.0, 0.0, max_retries=0)
+
+    def acquire(self, kind: str = "navigation") -> None:
+        pass
+
+    async def acquire_async(self, kind: str = "navigation") -> None:
+        pass
+
+    def throttled(self, signal: str) -> None:
+        pass
+
+    def ok(self) -> None:
+        pass
+
+    def install(self, context) -> None:
+        pass
+
+
+UNLIMITED = _Unlimited()
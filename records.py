@@ -0,0 +1,57 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Dict, Optional
+
+
+# The post record. Every output format uses these 16 keys in this order. Post keeps them in __slots__
+# (about a third of a 16-key dict's memory) and still reads like a read-only dict: rec["postUrl"],
+# rec.get(...), dict(rec), iteration and == against plain dicts all work, so code that also handles
+# records loaded back from JSON treats both the same way.
+
+RECORD_KEYS = [
+    "postUrl", "sharedJobUrl", "imgUrl", "postContent", "type", "likeCount", "commentCount", "repostCount",
+    "postDate", "action", "author", "authorUrl", "profileUrl", "postTimestamp", "videoUrl", "sharedPostUrl",
+]
+_KEYS = frozenset(RECORD_KEYS)
+_values = attrgetter(*RECORD_KEYS)
+
+
+@dataclass(eq=False)
+class Post(Mapping):
+    __slots__ = tuple(RECORD_KEYS)
+
+    postUrl: Optional[str]
+    sharedJobUrl: Optional[str]
+    imgUrl: Optional[str]
+    postContent: Optional[str]
+    type: str
+    likeCount: Optional[int]
+    commentCount: Optional[int]
+    repostCount: Optional[int]
+    postDate: Optional[str]
+    action: Optional[str]
+    author: Optional[str]
+    authorUrl: Optional[str]
+    profileUrl: str
+    postTimestamp: Optional[str]
+    videoUrl: Optional[str]
+    sharedPostUrl: Optional[str]
+
+    def __getitem__(self, key: str):
+        if key not in _KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(RECORD_KEYS)
+
+    def __len__(self) -> int:
+        return len(RECORD_KEYS)
+
+    def to_dict(self) -> Dict:
+        return dict(zip(RECORD_KEYS, _values(self)))
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Post":
+        return cls(*(d.get(k) for k in RECORD_KEYS))
@@ -3,12 +3,19 @@ import json
 import os
 import re
 import time
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from playwright.sync_api import sync_playwright
 from urllib.parse import urlsplit, urlunsplit
 from datetime import datetime, timezone
 
+from blocking import BLOCK_PROFILES, RequestBlocker
+from metrics import NULL_METRICS, Metrics, metrics_path, write_prometheus
+from ratelimit import UNLIMITED, RateLimiter, throttle_signal
+from output import CardHtmlWriter, html_sink, iter_ndjson, ndjson_path, ndjson_to_json, write_json, write_ndjson
+from records import Post
+from textparse import parse_counts, parse_date_action
+
 
 def parse_int(text: Optional[str]) -> Optional[int]:
     if not text:
@@ -40,148 +47,610 @@ USERS: List[str] = [
     "karimatiyeh",
 ]
 HEADLESS = False  # Set True to run without opening a window
+BASE_URL = "https://www.linkedin.com"  # Where profiles are opened from (bench.py points this at a local server)
+ENGINE = "batch"  # "batch" = one page.evaluate per batch of cards, "handles" = per-element Playwright calls,
+# "network" = parse the feed's JSON API responses (see network.py), falling back to "batch"
+BATCH_SIZE = 200  # Cards extracted per page.evaluate round trip
+SAVE_CARDS = False  # Write {username}.cards.html for offline re-extraction (see offline.py)
+ARCHIVE_PATH: Optional[str] = None  # Keep every card's HTML, compressed and indexed by URN, in this archive (see archive.py)
+AUTH_DIR = ".auth"  # Saved login (storage_state) is reused from here; delete it to force a fresh login
+SCROLL_MODE = "adaptive"  # "adaptive" = wait for new cards / loader, "fixed" = sleep pause_sec after every scroll
+INCREMENTAL = False  # Stop scrolling at the newest already-collected activity and merge new posts into {username}.json
+KNOWN_URNS_CHECKED = 20  # Newest known URNs looked for while scrolling in incremental mode
+SINCE: Optional[str] = None  # Only posts on/after this ISO date, e.g. "2024-05-01"
+MAX_AGE: Optional[str] = None  # Only posts newer than this, e.g. "30d", "12h", "2w"
+STREAM = False  # Write {username}.ndjson record by record while extracting instead of one list at the end
+COMPRESSION: Optional[str] = None  # None, "gzip" or "zstd" for the NDJSON stream
+WRITE_JSON = True  # Also write the pretty-printed {username}.json (from the stream when STREAM is on)
+JSON_COMPACT = False  # Write {username}.json on one line without indentation (same keys and values)
+BLOCK_PROFILE = "off"  # "off", "media" (images/video/fonts) or "lean" (media + trackers); see blocking.py
+BLOCK_ALLOW: List[str] = []  # URL globs never blocked
+BLOCK_DENY: List[str] = []  # URL globs always blocked (besides the profile)
+# The rate limiter is on by default; set both to 0 (or pass --nav-per-min 0 --scroll-per-min 0) to turn it off
+NAV_PER_MIN = 10.0  # Profile navigations per minute across all pages (0 = unlimited); slowed down automatically on throttling
+SCROLL_PER_MIN = 120.0  # Scroll requests per minute across all pages (0 = unlimited)
+RECYCLE_AFTER = 10  # Replace the page (and its context/renderer) after this many profiles (0 = never); see pool.py
+MAX_HEAP_MB = 1024.0  # ... or as soon as its JS heap is above this after a profile (0 = no limit)
+SPARE_PAGE = True  # Keep a logged-in spare page ready so a recycle doesn't wait for a new context
+CRASH_RETRIES = 2  # Times a profile is retried on a fresh page/browser after a renderer or browser crash
+CONCURRENCY = 1  # Profiles scraped in parallel; >1 switches to the async_playwright context pool (see async_scraper.py)
+METRICS = False  # Write {username}.metrics.json (per-phase timings, Playwright calls per card) and a Prometheus textfile
+PROM_PATH = "scraper_metrics.prom"  # Prometheus textfile written when METRICS is on
+WINDOWED = False  # Extract cards while scrolling and empty them out of the DOM, so long feeds don't pile up in memory
+WINDOW_DETACH = "blank"  # Processed cards: "blank" = keep an empty shell (with data-urn), "remove" = drop the node
+DB_PATH: Optional[str] = None  # Also upsert every post into this SQLite database (see storage.py)
+QUEUE_PATH: Optional[str] = None  # Pull profiles from this durable SQLite job queue instead of looping over USERS (see jobqueue.py)
+PIPELINE_WORKERS = 0  # >0: hand card HTML to this many worker processes while scrolling continues (see pipeline.py)
+MEDIA_DIR: Optional[str] = None  # Download post images/videos into this content-addressed store after each profile (see media.py)
+MEDIA_MAX_MB = 50.0  # Media files larger than this are skipped
+
+
+# -------------------------
+# Selectors shared by the Playwright (handles), in-page (batch) and offline extractors
+# -------------------------
+CARD_SELECTOR = "div.feed-shared-update-v2[data-urn^='urn:li:activity:']"
+CARD_SELECTOR_FALLBACK = "[role='article'][data-urn^='urn:li:activity:']"
+CONTENT_SELECTORS = ["div.feed-shared-update-v2__content", "div.update-components-entity__content-wrapper"]
+VIDEO_SELECTOR = "video, video source"
+ARTICLE_SELECTOR = "a[href*='/pulse/'], a[href*='/articles/'], div.update-components-article, article.update-components-article"
+IMAGE_SELECTOR = "img:not([class*='avatar']):not([class*='EntityPhoto']):not([alt*='profile']):not([alt=''])"
+POST_LINK_SELECTOR = (
+    "a[href*='/posts/'], "
+    "a[href*='/feed/update/urn:li:activity:'], "
+    "a[href*='/activity/'], "
+    "a[href*='activity-'], "
+    "a[href*='/feed/update/']"
+)
+ARTICLE_LINK_SELECTOR = "a[href*='/pulse/'], a[href*='/articles/']"
+EXTERNAL_LINK_SELECTOR = "a[href^='http']"
+PROFILE_LINK_SELECTOR = "a[href*='/in/']"
+SHARED_POST_SELECTOR = "a[href*='/posts/'], a[href*='/feed/update/']"
+JOB_LINK_SELECTOR = "a[href*='/jobs/view/']"
+LIKE_BUTTON_SELECTOR = "li.social-details-social-counts__reactions button[aria-label]"
+LIKE_SPAN_SELECTOR = "span.social-details-social-counts__reactions-count"
+TEXT_SELECTORS = [
+    "div.update-components-text",
+    "div.feed-shared-inline-show-more-text",
+    "div.feed-shared-text",
+    "span.break-words",
+]
+AUTHOR_SELECTORS = [
+    "span.update-components-actor__title span[dir='ltr']",
+    "span.feed-shared-actor__title span[dir='ltr']",
+    "span.update-components-actor__title",
+    "span.feed-shared-actor__title",
+]
+AUTHOR_TITLE_SELECTOR = "span.update-components-actor__title span[dir='ltr'], span.feed-shared-actor__title span[dir='ltr']"
+LOGIN_READY_SELECTOR = "nav.global-nav__content, header.global-nav, div.feed-shared-update-v2, article, a[href*='/feed/']"
+COUNT_CARDS_JS = f"() => document.querySelectorAll({json.dumps(CARD_SELECTOR + ', ' + CARD_SELECTOR_FALLBACK)}).length"
+SCROLL_DOWN_JS = "window.scrollBy(0, Math.floor(window.innerHeight * 0.9))"
+SCROLL_UP_JS = "window.scrollBy(0, -Math.floor(window.innerHeight * 0.3))"
+SCROLL_BOTTOM_JS = "window.scrollTo(0, document.documentElement.scrollHeight)"
+LOADER_SELECTOR = ".artdeco-loader, .scaffold-finite-scroll__loader, [role='progressbar']"
+# Whether any known URN is loaded, plus the URN of the last (oldest) loaded card
+SCROLL_STOP_JS = """
+({ sel, urns }) => {
+  const cards = document.querySelectorAll(sel);
+  const known = new Set(urns);
+  let hit = false;
+  if (known.size) {
+    for (const el of cards) {
+      if (known.has(el.getAttribute('data-urn'))) { hit = true; break; }
+    }
+  }
+  return { known: hit, lastUrn: cards.length ? cards[cards.length - 1].getAttribute('data-urn') : null };
+}
+"""
+# Resolves with the new card count once more cards exist, or -1 when nothing is loading after settleAt
+WAIT_FOR_CARDS_JS = """
+({ sel, loader, prev, settleAt }) => {
+  const n = document.querySelectorAll(sel).length;
+  if (n > prev) return n;
+  if (Date.now() >= settleAt && !document.querySelector(loader)) return -1;
+  return false;
+}
+"""
+DATE_SELECTOR = (
+    "span.update-components-actor__sub-description span.visually-hidden, "
+    "span.feed-shared-actor__sub-description span.visually-hidden, "
+    "span.update-components-actor__sub-description, "
+    "span.feed-shared-actor__sub-description, time"
+)
+
+
+LOGIN_URL = "https://www.linkedin.com/login"
+FEED_URL = "https://www.linkedin.com/feed/"
+LOGIN_EMAIL_INPUT = 'input[name="session_key"]'
+LOGIN_PASSWORD_INPUT = 'input[name="session_password"]'
+LOGIN_SUBMIT = 'button[type="submit"]'
 
 
 def login(page, email: str, password: str) -> None:
-    page.goto("https://www.linkedin.com/login", wait_until="domcontentloaded")
-    page.fill('input[name="session_key"]', email)
-    page.fill('input[name="session_password"]', password)
-    page.click('button[type="submit"]')
+    page.goto(LOGIN_URL, wait_until="domcontentloaded")
+    page.fill(LOGIN_EMAIL_INPUT, email)
+    page.fill(LOGIN_PASSWORD_INPUT, password)
+    page.click(LOGIN_SUBMIT)
     # Avoid networkidle; wait for a post-login element (nav/feed) or URL change
     try:
-        page.wait_for_selector(
-            "nav.global-nav__content, header.global-nav, div.feed-shared-update-v2, article, a[href*='/feed/']",
-            timeout=60000,
-        )
+        page.wait_for_selector(LOGIN_READY_SELECTOR, timeout=60000)
     except Exception:
         # As a fallback, give the page a moment (e.g., during 2FA or captcha)
         time.sleep(3.0)
 
 
-def open_user_posts(page, username: str) -> None:
-    url = f"https://www.linkedin.com/in/{username}/recent-activity/all/"
-    page.goto(url, wait_until="domcontentloaded")
+def session_state_path(auth_dir: str = AUTH_DIR) -> str:
+    return os.path.join(auth_dir, "storage_state.json")
+
+
+def load_session_state(auth_dir: str = AUTH_DIR) -> Optional[str]:
+    # Path to a saved storage_state with a non-expired li_at cookie, else None
+    path = session_state_path(auth_dir)
     try:
-        page.wait_for_selector("div.feed-shared-update-v2[data-urn^='urn:li:activity:'], [role='article'][data-urn^='urn:li:activity:']", timeout=60000)
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
     except Exception:
-        # Fallback to more generic selectors before giving up
-        page.wait_for_selector("div.feed-shared-update-v2, article", timeout=60000)
+        return None
+    now = time.time()
+    for c in state.get("cookies", []):
+        if c.get("name") == "li_at" and (c.get("expires", -1) in (-1, None) or c["expires"] > now):
+            return path
+    return None
+
+
+def save_session_state(context, auth_dir: str = AUTH_DIR) -> None:
+    try:
+        os.makedirs(auth_dir, exist_ok=True)
+        context.storage_state(path=session_state_path(auth_dir))
+    except Exception as e:
+        print(f"Could not save session state: {e}")
+
+
+def is_session_valid(context) -> bool:
+    # Cheap check without rendering: the feed answers 200 when logged in and redirects to login/authwall otherwise
+    try:
+        resp = context.request.get(FEED_URL, max_redirects=0, timeout=15000)
+        return resp.status == 200
+    except Exception:
+        return False
+
+
+def ensure_logged_in(context, page, email: str, password: str, auth_dir: str = AUTH_DIR, force: bool = False) -> None:
+    # force: log in even if the feed still answers, e.g. after a profile page was sent to an authwall/checkpoint
+    if not force and is_session_valid(context):
+        print("Reusing saved LinkedIn session")
+        return
+    login(page, email, password)
+    if is_session_valid(context):
+        save_session_state(context, auth_dir)
+    elif force:
+        raise SessionExpired("Logging in again did not give a valid session (checkpoint or 2FA pending?)")
+
+
+AUTH_REDIRECT_PATHS = ("/checkpoint/", "/authwall", "/uas/login", "/login")
+
+
+class SessionExpired(RuntimeError):
+    # A navigation ended on a login/authwall/checkpoint page: log in again rather than slow down
+    pass
+
+
+def auth_redirect(url: Optional[str]) -> Optional[str]:
+    # Path of the login/authwall/checkpoint page a navigation ended on, if any
+    path = urlsplit(url or "").path
+    return path if path.startswith(AUTH_REDIRECT_PATHS) else None
+
+
+def posts_url(username: str) -> str:
+    return f"{BASE_URL}/in/{username}/recent-activity/all/"
+
+
+def open_user_posts(page, username: str, limiter=UNLIMITED) -> None:
+    url = posts_url(username)
+    # Throttling (429/999, a feed that never renders) slows the limiter down and retries after its pause,
+    # up to limiter.max_retries times. A redirect to a login page raises SessionExpired for the caller to log in again.
+    for attempt in range(limiter.max_retries + 1):
+        last = attempt == limiter.max_retries
+        limiter.acquire("navigation")
+        resp = page.goto(url, wait_until="domcontentloaded")
+        redirect = auth_redirect(page.url)
+        if redirect:
+            raise SessionExpired(f"Sent to {redirect} while opening {username}")
+        signal = throttle_signal(resp.status if resp is not None else None)
+        if signal:
+            limiter.throttled(signal)
+            if last:
+                raise RuntimeError(f"Throttled while opening {username} ({signal})")
+            continue
+        try:
+            page.wait_for_selector(f"{CARD_SELECTOR}, {CARD_SELECTOR_FALLBACK}", timeout=60000)
+        except Exception:
+            # Fallback to more generic selectors before giving up
+            try:
+                page.wait_for_selector("div.feed-shared-update-v2, article", timeout=60000)
+            except Exception:
+                limiter.throttled("timeout")
+                if last:
+                    raise
+                continue
+        limiter.ok()
+        break
     time.sleep(1.0)
 
 
-def scroll_to_end(page, max_idle_rounds: int = 8, pause_sec: float = 1.2) -> None:
+def scroll_to_end(page, max_idle_rounds: int = 8, pause_sec: float = 1.2, mode: str = SCROLL_MODE, stop_urns: Optional[List[str]] = None, since_ms: Optional[int] = None, metrics=NULL_METRICS, limiter=UNLIMITED) -> Dict:
+    # Returns {"mode", "rounds", "idle_rounds", "waited_sec", "cards"} so both modes can be compared
+    # stop_urns: activity URNs collected on an earlier run; scrolling stops once any of them is loaded
+    # since_ms: epoch ms cutoff; scrolling stops once the last loaded card is older
+    if mode == "adaptive":
+        return scroll_to_end_adaptive(page, stop_urns=stop_urns, since_ms=since_ms, metrics=metrics, limiter=limiter)
     # Scroll until no new cards are added for several rounds; also click "show more" buttons if present
     def count_cards() -> int:
         try:
-            return page.evaluate("() => document.querySelectorAll(\"div.feed-shared-update-v2[data-urn^='urn:li:activity:'], [role='article'][data-urn^='urn:li:activity:']\").length")
+            return page.evaluate(COUNT_CARDS_JS)
         except Exception:
             return 0
     last_count = -1
     idle_rounds = 0
     total_rounds = 0
-    while idle_rounds < max_idle_rounds and total_rounds < 500:
+    waited = 0.0
+    while idle_rounds < max_idle_rounds and total_rounds < 500 and not scroll_stop_reached(page, stop_urns, since_ms):
         total_rounds += 1
+        limiter.acquire("scroll")
         # Scroll down
         try:
-            page.evaluate("window.scrollBy(0, Math.floor(window.innerHeight * 0.9))")
+            page.evaluate(SCROLL_DOWN_JS)
         except Exception:
             pass
         time.sleep(pause_sec)
+        waited += pause_sec
         # Count cards
         current = count_cards()
+        metrics.sample_cards(current)
         if current <= last_count:
             idle_rounds += 1
         else:
             idle_rounds = 0
             last_count = current
+            limiter.ok()
         # Occasional small scroll up to trigger lazy loaders
         if total_rounds % 10 == 0:
             try:
-                page.evaluate("window.scrollBy(0, -Math.floor(window.innerHeight * 0.3))")
+                page.evaluate(SCROLL_UP_JS)
             except Exception:
                 pass
     # End of scrolling loop
+    return {"mode": "fixed", "rounds": total_rounds, "idle_rounds": idle_rounds, "waited_sec": round(waited, 3), "cards": max(last_count, 0)}
+
+
+def stop_reached(res: Dict, since_ms: Optional[int]) -> bool:
+    if res.get("known"):
+        return True
+    return since_ms is not None and urn_older_than(res.get("lastUrn"), since_ms)
+
+
+def scroll_stop_arg(stop_urns: Optional[List[str]], since_ms: Optional[int] = None) -> Optional[Dict]:
+    # SCROLL_STOP_JS argument, or None when there is nothing to stop on
+    if not stop_urns and since_ms is None:
+        return None
+    return {"sel": CARD_SELECTOR + ", " + CARD_SELECTOR_FALLBACK, "urns": stop_urns or []}
+
+
+def scroll_stop_reached(page, stop_urns: Optional[List[str]], since_ms: Optional[int] = None) -> bool:
+    arg = scroll_stop_arg(stop_urns, since_ms)
+    if arg is None:
+        return False
+    try:
+        res = page.evaluate(SCROLL_STOP_JS, arg)
+    except Exception:
+        return False
+    return stop_reached(res, since_ms)
+
+
+def next_wait_timeout(latency_ema: float, min_wait: float = 0.5, max_wait: float = 10.0) -> float:
+    # Allow a few times the recent load latency before calling a round idle
+    return min(max_wait, max(min_wait, 3.0 * latency_ema))
+
+
+class ScrollRounds:
+    # Round bookkeeping shared by the adaptive scroll loops (sync, windowed and async_scraper.py): how long to
+    # wait for new cards after each scroll, and when to give up
+    def __init__(self, max_idle_rounds: int = 3, initial_latency: float = 1.0, max_rounds: int = 500):
+        self.max_idle_rounds = max_idle_rounds
+        self.max_rounds = max_rounds
+        self.latency = initial_latency
+        self.idle_rounds = 0
+        self.rounds = 0
+        self.waited = 0.0
+        self._t0 = 0.0
+
+    def more(self) -> bool:
+        return self.idle_rounds < self.max_idle_rounds and self.rounds < self.max_rounds
+
+    def start(self, sel: str, prev: int) -> Tuple[Dict, int]:
+        # Begins a round (right after the scroll): WAIT_FOR_CARDS_JS argument and timeout in ms
+        self.rounds += 1
+        timeout = next_wait_timeout(self.latency)
+        self._t0 = time.monotonic()
+        # settleAt: before then the loader may simply not have been inserted yet
+        settle_at = int((time.time() + min(self.latency, timeout)) * 1000)
+        return {"sel": sel, "loader": LOADER_SELECTOR, "prev": prev, "settleAt": settle_at}, int(timeout * 1000)
+
+    def finish(self, progressed: bool) -> None:
+        elapsed = time.monotonic() - self._t0
+        self.waited += elapsed
+        if progressed:
+            self.idle_rounds = 0
+            self.latency = 0.7 * self.latency + 0.3 * elapsed
+        else:
+            self.idle_rounds += 1
+
+    def stats(self, mode: str, cards: int) -> Dict:
+        return {"mode": mode, "rounds": self.rounds, "idle_rounds": self.idle_rounds, "waited_sec": round(self.waited, 3), "cards": cards}
+
+
+def scroll_to_end_adaptive(page, max_idle_rounds: int = 3, initial_latency: float = 1.0, max_rounds: int = 500, stop_urns: Optional[List[str]] = None, since_ms: Optional[int] = None, metrics=NULL_METRICS, limiter=UNLIMITED) -> Dict:
+    # Jump to the bottom, then wait on the DOM (not a timer) until more cards render or the loader goes away
+    sel = CARD_SELECTOR + ", " + CARD_SELECTOR_FALLBACK
+    try:
+        last_count = page.evaluate(COUNT_CARDS_JS)
+    except Exception:
+        last_count = 0
+    rounds = ScrollRounds(max_idle_rounds, initial_latency, max_rounds)
+    while rounds.more() and not scroll_stop_reached(page, stop_urns, since_ms):
+        limiter.acquire("scroll")
+        try:
+            page.evaluate(SCROLL_BOTTOM_JS)
+        except Exception:
+            pass
+        arg, timeout_ms = rounds.start(sel, last_count)
+        current = -1
+        try:
+            current = page.wait_for_function(WAIT_FOR_CARDS_JS, arg=arg, timeout=timeout_ms).json_value()
+        except Exception:
+            pass
+        rounds.finish(current > last_count)
+        metrics.sample_cards(max(current, last_count))
+        if current > last_count:
+            last_count = current
+            limiter.ok()
+        else:
+            # Small scroll up to re-trigger lazy loaders before the next attempt
+            try:
+                page.evaluate(SCROLL_UP_JS)
+            except Exception:
+                pass
+    return rounds.stats("adaptive", last_count)
 
 
 def find_cards(page):
     # Only select top-level feed cards that represent a post, identified by activity URN
-    cards = page.query_selector_all("div.feed-shared-update-v2[data-urn^='urn:li:activity:']")
+    cards = page.query_selector_all(CARD_SELECTOR)
     # Fallback: some builds use role='article' with data-urn on the element
     if not cards:
-        cards = page.query_selector_all("[role='article'][data-urn^='urn:li:activity:']")
+        cards = page.query_selector_all(CARD_SELECTOR_FALLBACK)
     return cards
 
 
-def extract_counts(card) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
+# -------------------------
+# Parsing helpers shared by every extraction engine.
+# They take the raw attribute/text values pulled out of a card and apply the regexes.
+# -------------------------
+def clean_url(u: Optional[str]) -> Optional[str]:
+    # Clean URL parameters/fragments
+    if not u:
+        return u
+    try:
+        parts = urlsplit(u)
+        if not parts.scheme and not parts.netloc and parts.path.startswith("/"):
+            # Make absolute to linkedin.com for relative paths
+            return "https://www.linkedin.com" + parts.path
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    except Exception:
+        return u
+
+
+def clean_title(t: str) -> str:
+    # keep first line, strip bullets like "• 1st"
+    t = t.split("\n")[0].strip()
+    return re.sub(r"\s*•\s*.*$", "", t).strip()
+
+
+def pick_post_url(hrefs: List[str], urn: Optional[str]) -> Optional[str]:
+    # Rank candidates: posts with '-activity-' > activity/update > others
+    for href in hrefs:
+        if "/posts/" in href and "-activity-" in href:
+            return href
+    for href in hrefs:
+        if "activity" in href or "/feed/update/" in href:
+            return href
+    # Fallback: build from card's data-urn if no link found
+    if urn:
+        m = re.search(r"urn:li:activity:(\d+)", urn)
+        if m:
+            return f"https://www.linkedin.com/feed/update/urn:li:activity:{m.group(1)}/"
+    return None
+
+
+def pick_shared_url(article_href: Optional[str], external_href: Optional[str]) -> Optional[str]:
+    # Prefer LinkedIn article links (pulse/articles), then any external http(s) link in content
+    if article_href:
+        return article_href
+    # Ignore obvious profile/company/job links which are handled elsewhere
+    href = external_href
+    if href and ("linkedin.com/in/" not in href) and ("linkedin.com/company/" not in href) and ("linkedin.com/jobs/view/" not in href):
+        return href
+    return None
+
+
+def author_from_texts(texts: List[Optional[str]]) -> Optional[str]:
+    # texts holds the inner text of the first match of each AUTHOR_SELECTORS entry (None when absent)
+    for t in texts:
+        if t is None:
+            continue
+        t = t.strip()
+        if not t:
+            continue
+        t = clean_title(t)
+        if t:
+            return t
+    return None
+
+
+def text_from_texts(texts: List[Optional[str]]) -> Optional[str]:
+    for t in texts:
+        if t is None:
+            continue
+        t = t.strip()
+        if t:
+            return t
+    return None
+
+
+def media_from_attrs(video_src: Optional[str], img_src: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    img_url = None
+    if img_src and "data:image" not in img_src:
+        img_url = img_src
+    return img_url, video_src
+
+
+def type_from_flags(has_video: bool, has_article: bool, has_image: bool) -> str:
+    # Priority: video > article > image > text
+    if has_video:
+        return "video"
+    if has_article:
+        return "article"
+    if has_image:
+        return "image"
+    return "text"
+
+
+def counts_from_text(like_aria: Optional[str], like_span_text: Optional[str], text: str) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
     like_count = comment_count = repost_count = view_count = None
+    # Prefer structured like count first (aria-label or dedicated span)
+    if like_aria is not None:
+        m = re.search(r'([0-9][\d,\.]*\s*[kmb]?)\s+reactions?', like_aria, flags=re.I)
+        if m:
+            like_count = parse_int(m.group(1))
+    if like_count is None and like_span_text is not None:
+        like_count = parse_int(like_span_text.strip())
+    text = text.lower()
+    if like_count is None:
+        m_like = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+(likes|reactions?)\b", text)
+        if m_like:
+            like_count = parse_int(m_like.group(1))
+    m_comment = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+comments?\b", text)
+    if m_comment:
+        comment_count = parse_int(m_comment.group(1))
+    m_repost = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+reposts?\b", text)
+    if m_repost:
+        repost_count = parse_int(m_repost.group(1))
+    m_views = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+views?\b", text)
+    if m_views:
+        view_count = parse_int(m_views.group(1))
+    return like_count, comment_count, repost_count, view_count
+
+
+def date_action_from_texts(texts: List[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    # texts holds the stripped inner text of every DATE_SELECTOR match, in document order
+    post_date = None
+    action = None
+    ts_text = None
+    text = " ".join(texts)
+    # Prefer relative time tokens like 4mo, 2w, 3d, 5h, 10yr
+    # Normalize verbose forms like "10 years ago" -> "10yr"
+    rel = None
+    # 1) Compact tokens
+    m_rel = re.search(r"\b(\d+)\s*(h|hr|hrs|hour|hours|d|day|days|w|wk|wks|week|weeks|mo|month|months|y|yr|yrs|year|years)\b", text, flags=re.I)
+    if not m_rel:
+        # Look for forms like "10 years ago"
+        m_rel = re.search(r"\b(\d+)\s+(h|hr|hrs|hour|hours|d|day|days|w|wk|wks|week|weeks|mo|month|months|y|yr|yrs|year|years)\s+ago\b", text, flags=re.I)
+    if m_rel:
+        num = m_rel.group(1)
+        unit = m_rel.group(2).lower()
+        if unit in {"h", "hr", "hrs", "hour", "hours"}:
+            rel = f"{num}h"
+        elif unit in {"d", "day", "days"}:
+            rel = f"{num}d"
+        elif unit in {"w", "wk", "wks", "week", "weeks"}:
+            rel = f"{num}w"
+        elif unit in {"mo", "month", "months"}:
+            rel = f"{num}mo"
+        elif unit in {"y", "yr", "yrs", "year", "years"}:
+            rel = f"{num}yr"
+    if rel:
+        ts_text = rel
+        post_date = rel
+    else:
+        # Fallback to first non-empty snippet
+        for raw in texts:
+            if raw:
+                ts_text = raw
+                post_date = ts_text
+                break
+    m_act = re.search(r"(reposted|shared|commented|liked)", text, flags=re.I)
+    if m_act:
+        action = m_act.group(1).lower()
+    return post_date, action, ts_text
+
+
+def _content(card):
+    # Limit search to the content area, not headers/avatars
+    for sel in CONTENT_SELECTORS:
+        el = card.query_selector(sel)
+        if el:
+            return el
+    return card
+
+
+def extract_counts(card) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
+    like_aria = like_span_text = None
     try:
-        # Prefer structured like count first (aria-label or dedicated span)
-        try:
-            like_btn = card.query_selector('li.social-details-social-counts__reactions button[aria-label]')
-            if like_btn:
-                al = like_btn.get_attribute('aria-label') or ''
-                m = re.search(r'([0-9][\d,\.]*\s*[kmb]?)\s+reactions?', al, flags=re.I)
-                if m:
-                    like_count = parse_int(m.group(1))
-            if like_count is None:
-                like_span = card.query_selector('span.social-details-social-counts__reactions-count')
-                if like_span:
-                    like_count = parse_int((like_span.inner_text() or '').strip())
-        except Exception:
-            pass
-        text = card.inner_text().lower()
-        if like_count is None:
-            m_like = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+(likes|reactions?)\b", text)
-            if m_like:
-                like_count = parse_int(m_like.group(1))
-        m_comment = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+comments?\b", text)
-        if m_comment:
-            comment_count = parse_int(m_comment.group(1))
-        m_repost = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+reposts?\b", text)
-        if m_repost:
-            repost_count = parse_int(m_repost.group(1))
-        m_views = re.search(r"([0-9][\d,\.]*\s*[kmb]?)\s+views?\b", text)
-        if m_views:
-            view_count = parse_int(m_views.group(1))
+        like_btn = card.query_selector(LIKE_BUTTON_SELECTOR)
+        if like_btn:
+            like_aria = like_btn.get_attribute('aria-label') or ''
+        like_span = card.query_selector(LIKE_SPAN_SELECTOR)
+        if like_span:
+            like_span_text = like_span.inner_text() or ''
     except Exception:
         pass
-    return like_count, comment_count, repost_count, view_count
+    try:
+        text = card.inner_text()
+    except Exception:
+        # Keep whatever the structured like count gave us
+        text = ""
+    return counts_from_text(like_aria, like_span_text, text)
 
 
 def extract_media(card) -> Tuple[Optional[str], Optional[str]]:
-    img_url = None
-    video_url = None
-    # Limit search to the content area, not headers/avatars
-    content = card.query_selector("div.feed-shared-update-v2__content") or card.query_selector("div.update-components-entity__content-wrapper") or card
+    video_src = None
+    img_src = None
+    content = _content(card)
     try:
-        vid = content.query_selector("video, video source")
+        vid = content.query_selector(VIDEO_SELECTOR)
         if vid:
-            video_url = vid.get_attribute("src")
+            video_src = vid.get_attribute("src")
     except Exception:
         pass
     try:
         # Exclude avatars/profile images and icons
-        img = content.query_selector("img:not([class*='avatar']):not([class*='EntityPhoto']):not([alt*='profile']):not([alt=''])")
+        img = content.query_selector(IMAGE_SELECTOR)
         if img:
-            src = img.get_attribute("src") or img.get_attribute("data-delayed-url")
-            if src and "data:image" not in src:
-                img_url = src
+            img_src = img.get_attribute("src") or img.get_attribute("data-delayed-url")
     except Exception:
         pass
-    return img_url, video_url
+    return media_from_attrs(video_src, img_src)
 
 
 def detect_type(card) -> str:
-    # Priority: video > article > image > text
     try:
-        content = card.query_selector("div.feed-shared-update-v2__content") or card.query_selector("div.update-components-entity__content-wrapper") or card
-        if content.query_selector("video, video source"):
+        content = _content(card)
+        if content.query_selector(VIDEO_SELECTOR):
             return "video"
         # Only treat as article when an actual LinkedIn article is shared or post is an article
-        if content.query_selector("a[href*='/pulse/'], a[href*='/articles/'], div.update-components-article, article.update-components-article"):
+        if content.query_selector(ARTICLE_SELECTOR):
             return "article"
         # Exclude avatars/profile images
-        if content.query_selector("img:not([class*='avatar']):not([class*='EntityPhoto']):not([alt*='profile']):not([alt=''])"):
+        if content.query_selector(IMAGE_SELECTOR):
             return "image"
     except Exception:
         pass
@@ -189,22 +658,14 @@ def detect_type(card) -> str:
 
 
 def extract_text(card) -> Optional[str]:
-    selectors = [
-        "div.update-components-text",
-        "div.feed-shared-inline-show-more-text",
-        "div.feed-shared-text",
-        "span.break-words",
-    ]
-    for sel in selectors:
+    texts: List[Optional[str]] = []
+    for sel in TEXT_SELECTORS:
         try:
             el = card.query_selector(sel)
-            if el:
-                t = el.inner_text().strip()
-                if t:
-                    return t
+            texts.append(el.inner_text() if el else None)
         except Exception:
-            continue
-    return None
+            texts.append(None)
+    return text_from_texts(texts)
 
 
 def extract_links(card) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
@@ -214,183 +675,119 @@ def extract_links(card) -> Tuple[Optional[str], Optional[str], Optional[str], Op
     shared_job_url = None
     try:
         # Prefer canonical "posts/...-activity-<id>-<suffix>" permalinks, then activity/update links
-        candidates = card.query_selector_all(
-            "a[href*='/posts/'], "
-            "a[href*='/feed/update/urn:li:activity:'], "
-            "a[href*='/activity/'], "
-            "a[href*='activity-'], "
-            "a[href*='/feed/update/']"
-        )
-        # Rank candidates: posts with '-activity-' > activity/update > others
-        ranked: List[str] = []
-        for a in candidates:
+        hrefs: List[str] = []
+        for a in card.query_selector_all(POST_LINK_SELECTOR):
             href = a.get_attribute("href")
-            if not href:
-                continue
-            ranked.append(href)
-        # Select best
-        for href in ranked:
-            if "/posts/" in href and "-activity-" in href:
-                post_url = href
-                break
-        if not post_url:
-            for href in ranked:
-                if "activity" in href or "/feed/update/" in href:
-                    post_url = href
-                    break
-        # Fallback: build from card's data-urn if no link found
-        if not post_url:
-            urn = card.get_attribute("data-urn")
-            if urn:
-                m = re.search(r"urn:li:activity:(\d+)", urn)
-                if m:
-                    post_url = f"https://www.linkedin.com/feed/update/urn:li:activity:{m.group(1)}/"
+            if href:
+                hrefs.append(href)
+        post_url = pick_post_url(hrefs, card.get_attribute("data-urn"))
     except Exception:
         pass
     # If we still don't have a shared_post_url, check for article/external links in content
-    if not shared_post_url:
-        try:
-            content = card.query_selector("div.feed-shared-update-v2__content") or card.query_selector("div.update-components-entity__content-wrapper") or card
-            # Prefer LinkedIn article links (pulse/articles)
-            link = content.query_selector("a[href*='/pulse/'], a[href*='/articles/']")
-            if link:
-                shared_post_url = link.get_attribute("href")
-            if not shared_post_url:
-                # Any external http(s) link in content
-                ext = content.query_selector("a[href^='http']")
-                if ext:
-                    href = ext.get_attribute("href")
-                    # Ignore obvious profile/company/job links which are handled elsewhere
-                    if href and ("linkedin.com/in/" not in href) and ("linkedin.com/company/" not in href) and ("linkedin.com/jobs/view/" not in href):
-                        shared_post_url = href
-        except Exception:
-            pass
     try:
-        al = card.query_selector("a[href*='/in/']")
+        content = _content(card)
+        link = content.query_selector(ARTICLE_LINK_SELECTOR)
+        article_href = link.get_attribute("href") if link else None
+        external_href = None
+        if not article_href:
+            ext = content.query_selector(EXTERNAL_LINK_SELECTOR)
+            if ext:
+                external_href = ext.get_attribute("href")
+        shared_post_url = pick_shared_url(article_href, external_href)
+    except Exception:
+        pass
+    try:
+        al = card.query_selector(PROFILE_LINK_SELECTOR)
         if al:
             author_url = al.get_attribute("href")
     except Exception:
         pass
     try:
-        sp = card.query_selector("a[href*='/posts/'], a[href*='/feed/update/']")
+        sp = card.query_selector(SHARED_POST_SELECTOR)
         if sp:
             shared_post_url = sp.get_attribute("href")
     except Exception:
         pass
     try:
-        sj = card.query_selector("a[href*='/jobs/view/']")
+        sj = card.query_selector(JOB_LINK_SELECTOR)
         if sj:
             shared_job_url = sj.get_attribute("href")
     except Exception:
         pass
-    # Clean URL parameters/fragments
-    def clean(u: Optional[str]) -> Optional[str]:
-        if not u:
-            return u
-        try:
-            parts = urlsplit(u)
-            if not parts.scheme and not parts.netloc and parts.path.startswith("/"):
-                # Make absolute to linkedin.com for relative paths
-                return "https://www.linkedin.com" + parts.path
-            return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
-        except Exception:
-            return u
-    return clean(post_url), clean(author_url), clean(shared_post_url), clean(shared_job_url)
+    return clean_url(post_url), clean_url(author_url), clean_url(shared_post_url), clean_url(shared_job_url)
 
 
 def extract_author(card) -> Optional[str]:
+    texts: List[Optional[str]] = []
     try:
-        selectors = [
-            "span.update-components-actor__title span[dir='ltr']",
-            "span.feed-shared-actor__title span[dir='ltr']",
-            "span.update-components-actor__title",
-            "span.feed-shared-actor__title",
-        ]
-        for sel in selectors:
+        for sel in AUTHOR_SELECTORS:
             el = card.query_selector(sel)
-            if not el:
-                continue
-            t = el.inner_text().strip()
-            if not t:
-                continue
-            # keep first line, strip bullets like "• 1st"
-            t = t.split("\n")[0].strip()
-            t = re.sub(r"\s*•\s*.*$", "", t).strip()
-            if t:
-                return t
+            texts.append(el.inner_text() if el else None)
     except Exception:
         pass
-    return None
+    return author_from_texts(texts)
 
 
 def extract_date_and_action(card) -> Tuple[Optional[str], Optional[str], Optional[str]]:
     # Returns (postDate, action, timestampText)
-    post_date = None
-    action = None
-    ts_text = None
     try:
         # Collect possible timestamp containers
-        els = card.query_selector_all(
-            "span.update-components-actor__sub-description span.visually-hidden, "
-            "span.feed-shared-actor__sub-description span.visually-hidden, "
-            "span.update-components-actor__sub-description, "
-            "span.feed-shared-actor__sub-description, time"
-        )
-        text = " ".join([e.inner_text().strip() for e in els if e])
-        # Prefer relative time tokens like 4mo, 2w, 3d, 5h, 10yr
-        # Normalize verbose forms like "10 years ago" -> "10yr"
-        rel = None
-        # 1) Compact tokens
-        m_rel = re.search(r"\b(\d+)\s*(h|hr|hrs|hour|hours|d|day|days|w|wk|wks|week|weeks|mo|month|months|y|yr|yrs|year|years)\b", text, flags=re.I)
-        if not m_rel:
-            # Look for forms like "10 years ago"
-            m_rel = re.search(r"\b(\d+)\s+(h|hr|hrs|hour|hours|d|day|days|w|wk|wks|week|weeks|mo|month|months|y|yr|yrs|year|years)\s+ago\b", text, flags=re.I)
-        if m_rel:
-            num = m_rel.group(1)
-            unit = m_rel.group(2).lower()
-            if unit in {"h", "hr", "hrs", "hour", "hours"}:
-                rel = f"{num}h"
-            elif unit in {"d", "day", "days"}:
-                rel = f"{num}d"
-            elif unit in {"w", "wk", "wks", "week", "weeks"}:
-                rel = f"{num}w"
-            elif unit in {"mo", "month", "months"}:
-                rel = f"{num}mo"
-            elif unit in {"y", "yr", "yrs", "year", "years"}:
-                rel = f"{num}yr"
-        if rel:
-            ts_text = rel
-            post_date = rel
-        else:
-            # Fallback to first non-empty snippet
-            for e in els:
-                raw = e.inner_text().strip()
-                if raw:
-                    ts_text = raw
-                    post_date = ts_text
-                    break
-        m_act = re.search(r"(reposted|shared|commented|liked)", text, flags=re.I)
-        if m_act:
-            action = m_act.group(1).lower()
+        els = card.query_selector_all(DATE_SELECTOR)
+        return date_action_from_texts([e.inner_text().strip() for e in els if e])
     except Exception:
-        pass
-    return post_date, action, ts_text
+        return None, None, None
 
 
-def iso_from_linkedin_id(id_str: str) -> Optional[str]:
+def ms_from_linkedin_id(id_str: str) -> Optional[int]:
+    # Activity IDs carry their creation time (epoch ms) in the first 41 bits
     try:
         n = int(id_str)
         b = bin(n)[2:]
         if len(b) < 41:
             return None
-        first41 = b[:41]
-        ms = int(first41, 2)
+        return int(b[:41], 2)
+    except Exception:
+        return None
+
+
+def iso_from_linkedin_id(id_str: str) -> Optional[str]:
+    ms = ms_from_linkedin_id(id_str)
+    if ms is None:
+        return None
+    try:
         dt = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
         return dt.isoformat(timespec="milliseconds").replace("+00:00", "Z")
     except Exception:
         return None
 
 
+def urn_older_than(urn: Optional[str], since_ms: Optional[int]) -> bool:
+    # False when there is no cutoff or the URN carries no activity id
+    if since_ms is None or not urn:
+        return False
+    m = re.search(r"urn:li:activity:(\d+)", urn)
+    if not m:
+        return False
+    ms = ms_from_linkedin_id(m.group(1))
+    return ms is not None and ms < since_ms
+
+
+def parse_since(since: Optional[str] = None, max_age: Optional[str] = None) -> Optional[int]:
+    # --since 2024-05-01 / 2024-05-01T12:00:00Z or --max-age 30d / 12h / 2w -> cutoff in epoch ms
+    if since:
+        dt = datetime.fromisoformat(since.replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
+    if max_age:
+        m = re.match(r"^\s*(\d+)\s*([hdw]?)\s*$", max_age.lower())
+        if not m:
+            raise ValueError(f"Invalid max age: {max_age!r} (expected e.g. 30d, 12h, 2w)")
+        hours = int(m.group(1)) * {"h": 1, "d": 24, "w": 24 * 7, "": 24}[m.group(2)]
+        return int((time.time() - hours * 3600) * 1000)
+    return None
+
+
 def extract_iso_from_posturl(post_url: Optional[str]) -> Optional[str]:
     if not post_url:
         return None
@@ -404,28 +801,23 @@ def extract_iso_from_posturl(post_url: Optional[str]) -> Optional[str]:
         return None
 
 
-def find_all_profile_links(card) -> List[str]:
+def profile_links_from_hrefs(hrefs: List[Optional[str]]) -> List[str]:
     urls: List[str] = []
+    for href in hrefs:
+        if not href:
+            continue
+        # Clean using same clean logic as extract_links
+        href = clean_url(href)
+        if href not in urls:
+            urls.append(href)
+    return urls
+
+
+def find_all_profile_links(card) -> List[str]:
     try:
-        links = card.query_selector_all("a[href*='/in/']")
-        for l in links:
-            href = l.get_attribute("href")
-            if not href:
-                continue
-            # Clean using same clean logic as extract_links
-            try:
-                parts = urlsplit(href)
-                if not parts.scheme and not parts.netloc and parts.path.startswith("/"):
-                    href = "https://www.linkedin.com" + parts.path
-                else:
-                    href = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
-            except Exception:
-                pass
-            if href not in urls:
-                urls.append(href)
+        return profile_links_from_hrefs([l.get_attribute("href") for l in card.query_selector_all(PROFILE_LINK_SELECTOR)])
     except Exception:
-        pass
-    return urls
+        return []
 
 
 def extract_author_for_url(card, profile_url: str) -> Optional[str]:
@@ -443,13 +835,11 @@ def extract_author_for_url(card, profile_url: str) -> Optional[str]:
             if not container:
                 break
             try:
-                title = container.query_selector("span.update-components-actor__title span[dir='ltr'], span.feed-shared-actor__title span[dir='ltr']")
+                title = container.query_selector(AUTHOR_TITLE_SELECTOR)
                 if title:
                     t = title.inner_text().strip()
                     if t:
-                        t = t.split("\n")[0].strip()
-                        t = re.sub(r"\s*•\s*.*$", "", t).strip()
-                        return t
+                        return clean_title(t)
             except Exception:
                 continue
     except Exception:
@@ -457,111 +847,898 @@ def extract_author_for_url(card, profile_url: str) -> Optional[str]:
     return None
 
 
-def scrape_user(page, username: str):
-    open_user_posts(page, username)
-    scroll_to_end(page)
-    items = []
-    card_html_snippets: List[str] = []
-    scraped_profile_url = f"https://www.linkedin.com/in/{username}"
-    seen_urns = set()
-    for c in find_cards(page):
-        urn_val = c.get_attribute("data-urn") or ""
-        if urn_val.startswith("urn:li:activity:"):
-            if urn_val in seen_urns:
-                continue
-            seen_urns.add(urn_val)
+def build_record(
+    scraped_profile_url: str,
+    links: Tuple[Optional[str], Optional[str], Optional[str], Optional[str]],
+    author: Optional[str],
+    post_content: Optional[str],
+    media: Tuple[Optional[str], Optional[str]],
+    counts: Tuple[Optional[int], Optional[int], Optional[int], Optional[int]],
+    date_action: Tuple[Optional[str], Optional[str], Optional[str]],
+    post_type: str,
+    all_profiles: List[str],
+    author_for_url: Callable[[str], Optional[str]],
+) -> Post:
+    postUrl, authorUrl, sharedPostUrl, sharedJobUrl = links
+    imgUrl, videoUrl = media
+    likeCount, commentCount, repostCount, viewCount = counts
+    postDate, action, timestampText = date_action
+    # Derive action:
+    # - If LinkedIn text said "reposted/shared" keep that as repost
+    # - Else, only treat as repost when a shared post URL exists
+    # - Job shares (sharedJobUrl only) are treated as original posts
+    derived_action = action
+    if not derived_action:
+        if sharedPostUrl:
+            derived_action = "repost"
+        else:
+            derived_action = "post"
+    # If there are other profile links inside card (not the scraped one), treat as repost
+    try:
+        other_profiles = [u for u in all_profiles if not u.startswith(scraped_profile_url)]
+        if other_profiles:
+            derived_action = "repost"
+            authorUrl = other_profiles[0]
+            # Try to extract the original author's display name
+            name_for_url = author_for_url(authorUrl)
+            if name_for_url:
+                author = name_for_url
+    except Exception:
+        pass
+    iso_ts = extract_iso_from_posturl(postUrl)
+    return Post(
+        postUrl=postUrl,
+        sharedJobUrl=sharedJobUrl,
+        imgUrl=imgUrl,
+        postContent=post_content,
+        type=post_type,
+        likeCount=likeCount,
+        commentCount=commentCount,
+        repostCount=repostCount,
+        postDate=postDate,
+        action=derived_action,
+        author=author,
+        authorUrl=authorUrl,
+        profileUrl=scraped_profile_url,
+        postTimestamp=iso_ts,
+        videoUrl=videoUrl,
+        sharedPostUrl=sharedPostUrl,
+    )
+
+
+def extract_card_record(card, scraped_profile_url: str, metrics=NULL_METRICS) -> Post:
+    # Reference path: one Playwright round trip per query/attribute/text
+    timed = metrics.timed
+    return build_record(
+        scraped_profile_url,
+        timed("extract_links", extract_links, card),
+        timed("extract_author", extract_author, card),
+        timed("extract_text", extract_text, card),
+        timed("extract_media", extract_media, card),
+        timed("extract_counts", extract_counts, card),
+        timed("extract_date_and_action", extract_date_and_action, card),
+        timed("detect_type", detect_type, card),
+        timed("find_all_profile_links", find_all_profile_links, card),
+        lambda url: timed("extract_author_for_url", extract_author_for_url, card, url),
+    )
+
+
+# -------------------------
+# Batch engine: a single page.evaluate collects the raw values of many cards at once.
+# The snapshot mirrors, field for field, what the extract_* functions read through element handles.
+# -------------------------
+# take ("mark"/"blank"/"remove", windowed mode): only cards not taken before, which are then marked (and emptied/removed)
+SNAPSHOT_JS = r"""
+({ sel, start, end, withHtml, skipUrns, take }) => {
+  const pending = take ? ":not([data-scraped])" : "";
+  let cards = Array.from(document.querySelectorAll(sel.card + pending));
+  if (!cards.length) cards = Array.from(document.querySelectorAll(sel.cardFallback + pending));
+  if (skipUrns && skipUrns.length) {
+    const skip = new Set(skipUrns);
+    cards = cards.filter((c) => !skip.has(c.getAttribute('data-urn')));
+  }
+  const q = (root, s) => { try { return root.querySelector(s); } catch (e) { return null; } };
+  const qa = (root, s) => { try { return Array.from(root.querySelectorAll(s)); } catch (e) { return []; } };
+  const txt = (el) => (el ? (el.innerText || '') : null);
+  const attr = (el, name) => (el ? el.getAttribute(name) : null);
+  // Same path that urllib.parse.urlsplit() yields: drop fragment, query, scheme and netloc
+  const pyPath = (href) => {
+    let h = href.split('#')[0].split('?')[0];
+    const m = h.match(/^[a-zA-Z][a-zA-Z0-9+.\-]*:(.*)$/);
+    if (m) h = m[1];
+    if (h.startsWith('//')) { const i = h.indexOf('/', 2); h = i < 0 ? '' : h.slice(i); }
+    return h;
+  };
+  const out = [];
+  for (const card of cards.slice(start, end)) {
+    let content = card;
+    for (const s of sel.content) { const el = q(card, s); if (el) { content = el; break; } }
+    const vid = q(content, sel.video);
+    const img = q(content, sel.image);
+    const article = q(content, sel.articleLink);
+    const likeBtn = q(card, sel.likeButton);
+    const profileHrefs = qa(card, sel.profileLink).map((a) => a.getAttribute('href'));
+    const authorTitles = {};
+    for (const href of profileHrefs) {
+      if (!href) continue;
+      const path = pyPath(href);
+      if (path in authorTitles) continue;
+      authorTitles[path] = null;
+      let container = q(card, "a[href*='" + path + "']");
+      if (!container) continue;
+      for (let i = 0; i < 4; i++) {
+        container = container.parentElement;
+        if (!container) break;
+        const t = (txt(q(container, sel.authorTitle)) || '').trim();
+        if (t) { authorTitles[path] = t; break; }
+      }
+    }
+    out.push({
+      urn: card.getAttribute('data-urn'),
+      html: withHtml ? card.outerHTML : null,
+      linkHrefs: qa(card, sel.postLink).map((a) => a.getAttribute('href')).filter(Boolean),
+      articleHref: attr(article, 'href'),
+      externalHref: article ? null : attr(q(content, sel.externalLink), 'href'),
+      authorHref: attr(q(card, sel.profileLink), 'href'),
+      sharedHref: attr(q(card, sel.sharedPost), 'href'),
+      jobHref: attr(q(card, sel.jobLink), 'href'),
+      authorTexts: sel.author.map((s) => txt(q(card, s))),
+      texts: sel.text.map((s) => txt(q(card, s))),
+      videoSrc: attr(vid, 'src'),
+      imgSrc: img ? (img.getAttribute('src') || img.getAttribute('data-delayed-url')) : null,
+      hasVideo: !!vid,
+      hasArticle: !!q(content, sel.article),
+      hasImage: !!img,
+      likeAria: likeBtn ? (likeBtn.getAttribute('aria-label') || '') : null,
+      likeSpan: txt(q(card, sel.likeSpan)),
+      cardText: card.innerText || '',
+      dateTexts: qa(card, sel.date).map((e) => (e.innerText || '').trim()),
+      profileHrefs: profileHrefs,
+      authorTitles: authorTitles,
+    });
+  }
+  if (take) {
+    for (const card of cards.slice(start, end)) {
+      card.setAttribute('data-scraped', '1');
+      if (take === 'remove') card.remove();
+      else if (take === 'blank') card.replaceChildren();
+    }
+  }
+  return { total: cards.length, snapshots: out };
+}
+"""
+# Same contract as SNAPSHOT_JS with take set, but only {urn, html}: parsing happens out of the page (pipeline.py)
+CARD_HTML_JS = r"""
+({ sel, start, end, take }) => {
+  const pending = ":not([data-scraped])";
+  let cards = Array.from(document.querySelectorAll(sel.card + pending));
+  if (!cards.length) cards = Array.from(document.querySelectorAll(sel.cardFallback + pending));
+  const batch = cards.slice(start, end);
+  const out = batch.map((card) => ({ urn: card.getAttribute('data-urn'), html: card.outerHTML }));
+  for (const card of batch) {
+    card.setAttribute('data-scraped', '1');
+    if (take === 'remove') card.remove();
+    else if (take === 'blank') card.replaceChildren();
+  }
+  return { total: cards.length, snapshots: out };
+}
+"""
+
+# outerHTML of every rendered card by data-urn, without marking anything: the network engine reads its records
+# from the API responses and only needs the card HTML for --save-cards / --archive
+CARD_HTML_BY_URN_JS = r"""
+(sel) => {
+  let cards = Array.from(document.querySelectorAll(sel.card));
+  if (!cards.length) cards = Array.from(document.querySelectorAll(sel.cardFallback));
+  const out = {};
+  for (const card of cards) {
+    const urn = card.getAttribute('data-urn');
+    if (urn && !(urn in out)) out[urn] = card.outerHTML;
+  }
+  return out;
+}
+"""
+
+SNAPSHOT_SELECTORS = {
+    "card": CARD_SELECTOR,
+    "cardFallback": CARD_SELECTOR_FALLBACK,
+    "content": CONTENT_SELECTORS,
+    "video": VIDEO_SELECTOR,
+    "image": IMAGE_SELECTOR,
+    "article": ARTICLE_SELECTOR,
+    "postLink": POST_LINK_SELECTOR,
+    "articleLink": ARTICLE_LINK_SELECTOR,
+    "externalLink": EXTERNAL_LINK_SELECTOR,
+    "profileLink": PROFILE_LINK_SELECTOR,
+    "sharedPost": SHARED_POST_SELECTOR,
+    "jobLink": JOB_LINK_SELECTOR,
+    "likeButton": LIKE_BUTTON_SELECTOR,
+    "likeSpan": LIKE_SPAN_SELECTOR,
+    "text": TEXT_SELECTORS,
+    "author": AUTHOR_SELECTORS,
+    "authorTitle": AUTHOR_TITLE_SELECTOR,
+    "date": DATE_SELECTOR,
+}
+
+
+def record_from_snapshot(snap: Dict, scraped_profile_url: str) -> Post:
+    links = (
+        clean_url(pick_post_url(snap["linkHrefs"], snap["urn"])),
+        clean_url(snap["authorHref"]),
+        clean_url(snap["sharedHref"] or pick_shared_url(snap["articleHref"], snap["externalHref"])),
+        clean_url(snap["jobHref"]),
+    )
+    titles = snap["authorTitles"]
+
+    def author_for_url(url: str) -> Optional[str]:
+        t = titles.get(urlsplit(url).path)
+        return clean_title(t) if t else None
+
+    return build_record(
+        scraped_profile_url,
+        links,
+        author_from_texts(snap["authorTexts"]),
+        text_from_texts(snap["texts"]),
+        media_from_attrs(snap["videoSrc"], snap["imgSrc"]),
+        # Compiled single-pass equivalents of counts_from_text / date_action_from_texts
+        parse_counts(snap["cardText"], snap["likeAria"], snap["likeSpan"]),
+        parse_date_action(snap["dateTexts"]),
+        type_from_flags(snap["hasVideo"], snap["hasArticle"], snap["hasImage"]),
+        profile_links_from_hrefs(snap["profileHrefs"]),
+        author_for_url,
+    )
+
+
+def iter_card_snapshots(page, batch_size: int = BATCH_SIZE, with_html: bool = True, skip_urns: Optional[List[str]] = None):
+    # One page.evaluate per batch of cards instead of dozens of calls per card
+    start = 0
+    while True:
+        res = page.evaluate(SNAPSHOT_JS, {"sel": SNAPSHOT_SELECTORS, "start": start, "end": start + batch_size, "withHtml": with_html, "skipUrns": skip_urns or []})
+        for snap in res["snapshots"]:
+            yield snap
+        start += batch_size
+        if start >= res["total"]:
+            break
+
+
+def iter_windowed_snapshots(
+    page,
+    batch_size: int = BATCH_SIZE,
+    with_html: bool = True,
+    detach: str = WINDOW_DETACH,
+    max_idle_rounds: int = 3,
+    initial_latency: float = 1.0,
+    max_rounds: int = 500,
+    stop_urns: Optional[List[str]] = None,
+    since_ms: Optional[int] = None,
+    metrics=NULL_METRICS,
+    snapshot_js: str = SNAPSHOT_JS,
+    limiter=UNLIMITED,
+):
+    # Windowed scrolling: take the cards that have loaded, empty them out of the DOM, scroll, wait for the
+    # next ones. The live DOM (and each round's querySelectorAll) only ever holds the cards not yet taken.
+    pending_sel = f"{CARD_SELECTOR}:not([data-scraped]), {CARD_SELECTOR_FALLBACK}:not([data-scraped])"
+    stop = set(stop_urns or [])
+    rounds = ScrollRounds(max_idle_rounds, initial_latency, max_rounds)
+    taken = 0
+    while True:
+        # Drain everything loaded so far, batch_size cards per round trip (taking removes them from the pending set)
+        last_urn = None
+        hit_known = False
+        while True:
+            res = page.evaluate(snapshot_js, {"sel": SNAPSHOT_SELECTORS, "start": 0, "end": batch_size, "withHtml": with_html, "skipUrns": [], "take": detach})
+            for snap in res["snapshots"]:
+                taken += 1
+                last_urn = snap["urn"] or last_urn
+                hit_known = hit_known or snap["urn"] in stop
+                yield snap
+            if res["total"] <= batch_size:
+                break
+        metrics.sample_cards(taken)
+        if hit_known or urn_older_than(last_urn, since_ms) or not rounds.more():
+            break
+        limiter.acquire("scroll")
         try:
-            html = c.evaluate("el => el.outerHTML")
-            if html:
-                card_html_snippets.append(html)
+            page.evaluate(SCROLL_BOTTOM_JS)
         except Exception:
             pass
-        postUrl, authorUrl, sharedPostUrl, sharedJobUrl = extract_links(c)
-        author = extract_author(c)
-        postContent = extract_text(c)
-        imgUrl, videoUrl = extract_media(c)
-        likeCount, commentCount, repostCount, viewCount = extract_counts(c)
-        postDate, action, timestampText = extract_date_and_action(c)
-        # Derive action:
-        # - If LinkedIn text said "reposted/shared" keep that as repost
-        # - Else, only treat as repost when a shared post URL exists
-        # - Job shares (sharedJobUrl only) are treated as original posts
-        derived_action = action
-        if not derived_action:
-            if sharedPostUrl:
-                derived_action = "repost"
-            else:
-                derived_action = "post"
-        # If there are other profile links inside card (not the scraped one), treat as repost
+        arg, timeout_ms = rounds.start(pending_sel, 0)
+        found = -1
         try:
-            all_profiles = find_all_profile_links(c)
-            other_profiles = [u for u in all_profiles if not u.startswith(scraped_profile_url)]
-            if other_profiles:
-                derived_action = "repost"
-                authorUrl = other_profiles[0]
-                # Try to extract the original author's display name
-                name_for_url = extract_author_for_url(c, authorUrl)
-                if name_for_url:
-                    author = name_for_url
+            found = page.wait_for_function(WAIT_FOR_CARDS_JS, arg=arg, timeout=timeout_ms).json_value()
         except Exception:
             pass
-        iso_ts = extract_iso_from_posturl(postUrl)
-        items.append({
-            "postUrl": postUrl,
-            "sharedJobUrl": sharedJobUrl,
-            "imgUrl": imgUrl,
-            "postContent": postContent,
-            "type": detect_type(c),
-            "likeCount": likeCount,
-            "commentCount": commentCount,
-            "repostCount": repostCount,
-            "postDate": postDate,
-            "action": derived_action,
-            "author": author,
-            "authorUrl": authorUrl,
-            "profileUrl": scraped_profile_url,
-            "postTimestamp": iso_ts,
-            "videoUrl": videoUrl,
-            "sharedPostUrl": sharedPostUrl,
-        })
-    # Save raw card HTML for analysis
+        rounds.finish(found > 0)
+        if found > 0:
+            limiter.ok()
+        else:
+            try:
+                page.evaluate(SCROLL_UP_JS)
+            except Exception:
+                pass
+    stats = rounds.stats("windowed", taken)
+    metrics.set("scroll_rounds", stats["rounds"])
+    metrics.set("scroll_idle_rounds", stats["idle_rounds"])
+    metrics.set("scroll_waited_sec", stats["waited_sec"])
+    print(f"Scrolled (windowed): {taken} cards in {stats['rounds']} rounds, {stats['waited_sec']:.1f}s waiting")
+
+
+def records_from_snapshots(
+    snapshots,
+    scraped_profile_url: str,
+    card_html_snippets: Optional[List[str]] = None,
+    seen_urns: Optional[set] = None,
+    card_urns: Optional[List[str]] = None,
+) -> List[Dict]:
+    return list(iter_records_from_snapshots(snapshots, scraped_profile_url, card_html_snippets, seen_urns, card_urns))
+
+
+def iter_records_from_snapshots(
+    snapshots,
+    scraped_profile_url: str,
+    card_html_snippets: Optional[List[str]] = None,
+    seen_urns: Optional[set] = None,
+    card_urns: Optional[List[str]] = None,
+):
+    # One record per activity URN, in feed order; URNs already in seen_urns are skipped
+    if seen_urns is None:
+        seen_urns = set()
+    for snap in snapshots:
+        urn_val = snap["urn"] or ""
+        if urn_val.startswith("urn:li:activity:"):
+            if urn_val in seen_urns:
+                continue
+            seen_urns.add(urn_val)
+        if card_urns is not None:
+            card_urns.append(urn_val)
+        if card_html_snippets is not None and snap["html"]:
+            card_html_snippets.append(snap["html"])
+        yield record_from_snapshot(snap, scraped_profile_url)
+
+
+def compare_engines(page, scraped_profile_url: str) -> List[Tuple[int, str, object, object]]:
+    # Run both engines over the same loaded DOM and report (card index, key, handles value, batch value) mismatches
+    diffs = []
+    handle_records = [extract_card_record(c, scraped_profile_url) for c in find_cards(page)]
+    batch_records = [record_from_snapshot(s, scraped_profile_url) for s in iter_card_snapshots(page, with_html=False)]
+    for i, (a, b) in enumerate(zip(handle_records, batch_records)):
+        for k in a:
+            if a[k] != b.get(k):
+                diffs.append((i, k, a[k], b.get(k)))
+    if len(handle_records) != len(batch_records):
+        diffs.append((-1, "count", len(handle_records), len(batch_records)))
+    return diffs
+
+
+def card_html_path(username: str) -> str:
+    return f"{username}.cards.html"
+
+
+def save_card_html(username: str, card_html_snippets: List[str]) -> None:
     # The following code block saves the raw LinkedIn card HTML snippets for analysis.
-    # try:
-    #     with open(f"{username}.cards.html", "w", encoding="utf-8") as f:
-    #         f.write("<!-- Saved LinkedIn card HTML snippets for analysis -->\n")
-    #         for i, html in enumerate(card_html_snippets, start=1):
-    #             f.write(f"\n<!-- CARD {i} -->\n")
-    #             f.write(html)
-    #             f.write("\n")
-    # except Exception:
-    #     pass
+    try:
+        with CardHtmlWriter(card_html_path(username)) as w:
+            for html in card_html_snippets:
+                w.append(html)
+    except Exception:
+        pass
+
+
+def archive_summary(writer) -> str:
+    return f"Archived {writer.stats['stored']} cards to {writer.archive.path} ({writer.stats['unchanged']} unchanged since an earlier run)"
+
+
+def state_path(username: str) -> str:
+    return f"{username}.state.json"
+
+
+def load_known_urns(username: str) -> List[str]:
+    # Activity URNs of every card collected so far, newest first
+    try:
+        with open(state_path(username), encoding="utf-8") as f:
+            return json.load(f).get("urns", [])
+    except Exception:
+        return []
+
+
+def load_user_json(username: str) -> List[Dict]:
+    try:
+        with open(f"{username}.json", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return []
+
+
+def save_known_urns(username: str, new_urns: List[str], known_urns: List[str]) -> None:
+    try:
+        with open(state_path(username), "w", encoding="utf-8") as f:
+            json.dump({"urns": [u for u in new_urns if u] + known_urns}, f)
+    except Exception as e:
+        print(f"Could not save incremental state for {username}: {e}")
+
+
+def merge_incremental(username: str, new_items: List[Dict], new_urns: List[str], known_urns: List[str]) -> List[Dict]:
+    # New posts go in front of the previous output (the feed is newest first); remember their URNs.
+    # Without saved URNs this was a full scrape, which replaces the previous output.
+    merged = new_items + load_user_json(username) if known_urns else new_items
+    save_known_urns(username, new_urns, known_urns)
+    print(f"Incremental: {len(new_items)} new posts for {username}")
+    return merged
+
+
+def iter_user_posts(
+    page,
+    username: str,
+    engine: str = ENGINE,
+    batch_size: int = BATCH_SIZE,
+    scroll_mode: str = SCROLL_MODE,
+    known_urns: Optional[List[str]] = None,
+    since_ms: Optional[int] = None,
+    card_html_snippets: Optional[List[str]] = None,
+    card_urns: Optional[List[str]] = None,
+    metrics=NULL_METRICS,
+    windowed: bool = WINDOWED,
+    window_detach: str = WINDOW_DETACH,
+    pipeline_workers: int = PIPELINE_WORKERS,
+    limiter=UNLIMITED,
+):
+    # Generator behind scrape_user(): yields each post record as soon as it is extracted.
+    # card_html_snippets / card_urns (when given) receive each emitted card's outerHTML / data-urn.
+    known_urns = known_urns or []
+    # With metrics on, every Playwright call made through the page (and the handles it returns) is counted
+    page = metrics.wrap(page)
+    collector = None
+    if engine == "network":
+        from network import FeedResponseCollector
+
+        # Must listen before navigation: the first updates arrive with the initial page load
+        collector = FeedResponseCollector()
+        collector.attach(page)
+    try:
+        with metrics.phase("open"):
+            open_user_posts(page, username, limiter)
+        scraped_profile_url = f"https://www.linkedin.com/in/{username}"
+        if pipeline_workers > 0 and collector is None:
+            from pipeline import iter_pipelined_records
+
+            # Cards stay in the page (only marked) unless --windowed also asks for them to be emptied
+            records = iter_pipelined_records(
+                page, scraped_profile_url, pipeline_workers, batch_size, detach=(window_detach if windowed else "mark"),
+                stop_urns=known_urns[:KNOWN_URNS_CHECKED], since_ms=since_ms, card_html_snippets=card_html_snippets,
+                seen_urns=set(known_urns), card_urns=card_urns, metrics=metrics, limiter=limiter,
+            )
+            yield from metrics.timed_iter("extract", records)
+            return
+        if windowed and collector is None:
+            # Cards are snapshotted (batch engine) while scrolling, so there is no separate scroll phase
+            snapshots = (
+                s for s in iter_windowed_snapshots(
+                    page, batch_size, with_html=card_html_snippets is not None, detach=window_detach,
+                    stop_urns=known_urns[:KNOWN_URNS_CHECKED], since_ms=since_ms, metrics=metrics, limiter=limiter,
+                )
+                if not urn_older_than(s["urn"], since_ms)
+            )
+            yield from metrics.timed_iter("extract", iter_records_from_snapshots(snapshots, scraped_profile_url, card_html_snippets, set(known_urns), card_urns))
+            return
+        # Checking the newest few is enough: the feed is in reverse chronological order
+        with metrics.phase("scroll"):
+            stats = scroll_to_end(page, mode=scroll_mode, stop_urns=known_urns[:KNOWN_URNS_CHECKED], since_ms=since_ms, metrics=metrics, limiter=limiter)
+    finally:
+        # Also when opening or scrolling raises (e.g. SessionExpired): the listener must not outlive this profile on a reused page
+        if collector is not None:
+            collector.detach()
+    metrics.set("scroll_rounds", stats["rounds"])
+    metrics.set("scroll_idle_rounds", stats["idle_rounds"])
+    metrics.set("scroll_waited_sec", stats["waited_sec"])
+    print(f"Scrolled {username}: {stats['cards']} cards in {stats['rounds']} rounds, {stats['waited_sec']:.1f}s waiting ({stats['mode']})")
+    # Shared by all engines, so a fallback after a failed batch does not repeat cards already yielded
+    seen_urns = set(known_urns)
+    if collector is not None:
+        collector.collect_embedded(page)
+        # All card HTML in one call after the scroll; posts the DOM never rendered have none
+        html_by_urn: Dict[str, str] = {}
+        if card_html_snippets is not None:
+            try:
+                html_by_urn = page.evaluate(CARD_HTML_BY_URN_JS, {"card": CARD_SELECTOR, "cardFallback": CARD_SELECTOR_FALLBACK}) or {}
+            except Exception as e:
+                print(f"Could not read card HTML for {username} ({e})")
+        emitted = 0
+        for urn_val, rec in metrics.timed_iter("extract", collector.iter_records(scraped_profile_url)):
+            if urn_older_than(urn_val, since_ms) or (urn_val and urn_val in seen_urns):
+                continue
+            if urn_val:
+                seen_urns.add(urn_val)
+            if card_urns is not None:
+                card_urns.append(urn_val or "")
+            if card_html_snippets is not None and html_by_urn.get(urn_val or ""):
+                card_html_snippets.append(html_by_urn[urn_val])
+            emitted += 1
+            yield rec
+        print(f"Network engine: {emitted} posts from {collector.responses} feed responses")
+        if emitted:
+            return
+        # Nothing recognisable in the responses (API change?): read the rendered cards instead
+        engine = "batch"
+    if engine == "batch":
+        try:
+            snapshots = (
+                s for s in metrics.timed_iter("snapshot", iter_card_snapshots(page, batch_size, with_html=card_html_snippets is not None, skip_urns=known_urns))
+                if not urn_older_than(s["urn"], since_ms)
+            )
+            yield from metrics.timed_iter("extract", iter_records_from_snapshots(snapshots, scraped_profile_url, card_html_snippets, seen_urns, card_urns))
+            return
+        except Exception as e:
+            # Fall back to the per-element path (e.g. page navigated mid-batch)
+            print(f"Batch extraction failed for {username} ({e}); falling back to element handles")
+
+    def handle_records():
+        for c in find_cards(page):
+            urn_val = c.get_attribute("data-urn") or ""
+            if urn_older_than(urn_val, since_ms):
+                continue
+            if urn_val.startswith("urn:li:activity:"):
+                if urn_val in seen_urns:
+                    continue
+                seen_urns.add(urn_val)
+            if card_urns is not None:
+                card_urns.append(urn_val)
+            if card_html_snippets is not None:
+                try:
+                    html = c.evaluate("el => el.outerHTML")
+                    if html:
+                        card_html_snippets.append(html)
+                except Exception:
+                    pass
+            yield extract_card_record(c, scraped_profile_url, metrics)
+
+    yield from metrics.timed_iter("extract", handle_records())
+
+
+def scrape_user(
+    page,
+    username: str,
+    engine: str = ENGINE,
+    batch_size: int = BATCH_SIZE,
+    save_cards: bool = SAVE_CARDS,
+    scroll_mode: str = SCROLL_MODE,
+    incremental: bool = INCREMENTAL,
+    since_ms: Optional[int] = None,
+    metrics=NULL_METRICS,
+    windowed: bool = WINDOWED,
+    window_detach: str = WINDOW_DETACH,
+    pipeline_workers: int = PIPELINE_WORKERS,
+    limiter=UNLIMITED,
+    archive=None,
+):
+    known_urns = load_known_urns(username) if incremental else []
+    card_html_snippets: Optional[List[str]] = [] if save_cards else None
+    card_urns: List[str] = []
+    archive_writer = archive.writer(f"https://www.linkedin.com/in/{username}") if archive is not None else None
+    try:
+        items = list(iter_user_posts(page, username, engine, batch_size, scroll_mode, known_urns, since_ms, html_sink(card_html_snippets, archive_writer), card_urns, metrics, windowed, window_detach, pipeline_workers, limiter))
+    finally:
+        if archive_writer is not None:
+            archive_writer.close()
+    if archive_writer is not None:
+        print(archive_summary(archive_writer))
+    # Save raw card HTML for analysis (and for offline re-extraction with offline.py)
+    if save_cards:
+        save_card_html(username, card_html_snippets)
+    if incremental:
+        return merge_incremental(username, items, card_urns, known_urns)
     return items
 
 
+def stream_user(
+    page,
+    username: str,
+    engine: str = ENGINE,
+    batch_size: int = BATCH_SIZE,
+    save_cards: bool = SAVE_CARDS,
+    scroll_mode: str = SCROLL_MODE,
+    incremental: bool = INCREMENTAL,
+    since_ms: Optional[int] = None,
+    compression: Optional[str] = COMPRESSION,
+    write_json: bool = WRITE_JSON,
+    compact_json: bool = JSON_COMPACT,
+    metrics=NULL_METRICS,
+    windowed: bool = WINDOWED,
+    window_detach: str = WINDOW_DETACH,
+    pipeline_workers: int = PIPELINE_WORKERS,
+    store=None,
+    limiter=UNLIMITED,
+    archive=None,
+) -> int:
+    # Streaming variant of scrape_user(): records (and card HTML) go to disk as they are extracted,
+    # so memory stays flat and a crash keeps everything written so far
+    known_urns = load_known_urns(username) if incremental else []
+    card_urns: List[str] = []
+    path = ndjson_path(username, compression)
+    # Incremental runs after the first append their new posts, so the NDJSON keeps every earlier one
+    # (with --no-json it is the only copy); a full scrape replaces it
+    append = bool(known_urns) and os.path.exists(path)
+    earlier = sum(1 for _ in iter_ndjson(path, compression)) if append else 0
+    html_writer = CardHtmlWriter(card_html_path(username)) if save_cards else None
+    archive_writer = archive.writer(f"https://www.linkedin.com/in/{username}") if archive is not None else None
+    try:
+        records = iter_user_posts(page, username, engine, batch_size, scroll_mode, known_urns, since_ms, html_sink(html_writer, archive_writer), card_urns, metrics, windowed, window_detach, pipeline_workers, limiter)
+        if store is not None:
+            records = store.tee(f"https://www.linkedin.com/in/{username}", records)
+        with metrics.phase("write"):
+            n = write_ndjson(records, path, compression, append)
+    finally:
+        if html_writer is not None:
+            html_writer.close()
+        if archive_writer is not None:
+            archive_writer.close()
+    print(f"Streamed {n} posts to {path}")
+    if archive_writer is not None:
+        print(archive_summary(archive_writer))
+    previous = None
+    if incremental:
+        save_known_urns(username, card_urns, known_urns)
+        print(f"Incremental: {n} new posts for {username}")
+        if known_urns:
+            previous = load_user_json(username)
+    if write_json:
+        with metrics.phase("write_json"):
+            total = ndjson_to_json(path, f"{username}.json", compression, previous, compact_json, skip=earlier)
+        print(f"Wrote {total} posts to {username}.json")
+    return n
+
+
+def save_user_json(username: str, data: List[Dict], compact: bool = JSON_COMPACT) -> None:
+    write_json(data, f"{username}.json", compact)
+    print(f"Wrote {len(data)} posts to {username}.json")
+
+
+def concurrent_unsupported(args) -> List[str]:
+    # Options (flags or their config defaults) the async scraper behind --concurrency > 1 cannot honour
+    bad = []
+    if args.engine != "batch":
+        bad.append(f"--engine {args.engine}")
+    if args.windowed or WINDOWED:
+        bad.append("--windowed")
+    if args.pipeline:
+        bad.append("--pipeline")
+    if args.metrics or METRICS:
+        bad.append("--metrics")
+    if args.compare_engines:
+        bad.append("--compare-engines")
+    if args.queue:
+        # Workers take USERS as given: no claims, leases, retries or skipping of finished profiles
+        bad.append("--queue (run several sequential processes on the same queue instead)")
+    return bad
+
+
 def main():
     parser = argparse.ArgumentParser(description="Simple LinkedIn posts scraper")
     parser.add_argument("--headless", action="store_true", help="Run headless (overrides HEADLESS)")
+    parser.add_argument("--engine", choices=["batch", "handles", "network"], default=ENGINE, help="Card extraction engine (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Cards per page.evaluate in the batch engine")
+    parser.add_argument("--scroll-mode", choices=["adaptive", "fixed"], default=SCROLL_MODE, help="Wait for new cards (adaptive) or sleep a fixed pause per scroll")
+    parser.add_argument("--windowed", action="store_true", help="Extract cards while scrolling and empty them from the DOM (flat memory on long feeds)")
+    parser.add_argument("--window-detach", choices=["blank", "remove"], default=WINDOW_DETACH, help="What happens to processed cards in --windowed mode")
+    parser.add_argument("--pipeline", type=int, default=PIPELINE_WORKERS, metavar="N", help="Parse card HTML in N worker processes while scrolling continues")
+    parser.add_argument("--incremental", action="store_true", help="Only collect posts newer than the last run and merge them into {username}.json")
+    parser.add_argument("--since", default=SINCE, help="Only collect posts on/after this date (ISO, e.g. 2024-05-01)")
+    parser.add_argument("--max-age", default=MAX_AGE, help="Only collect posts newer than this age, e.g. 30d, 12h, 2w")
+    parser.add_argument("--stream", action="store_true", help="Write {username}.ndjson line by line while extracting")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], default=COMPRESSION, help="Compress the NDJSON stream")
+    parser.add_argument("--no-json", action="store_true", help="With --stream, skip the final pretty-printed {username}.json")
+    parser.add_argument("--compact-json", action="store_true", help="Write {username}.json on a single line without indentation")
+    parser.add_argument("--db", default=DB_PATH, help="Also store posts in this SQLite database (see storage.py)")
+    parser.add_argument("--media-dir", default=MEDIA_DIR, help="Download post images/videos into this directory (deduplicated by content, resumable)")
+    parser.add_argument("--media-max-mb", type=float, default=MEDIA_MAX_MB, help="Skip media files larger than this (default: %(default)s)")
+    parser.add_argument("--save-cards", action="store_true", help="Also write raw card HTML to {username}.cards.html")
+    parser.add_argument("--archive", default=ARCHIVE_PATH, help="Keep card HTML in this compressed archive, indexed by URN and deduplicated across runs (see archive.py)")
+    parser.add_argument("--block", choices=list(BLOCK_PROFILES), default=BLOCK_PROFILE, help="Request blocking profile (default: %(default)s)")
+    parser.add_argument("--block-allow", action="append", default=list(BLOCK_ALLOW), metavar="GLOB", help="URL glob that is never blocked (repeatable)")
+    parser.add_argument("--block-deny", action="append", default=list(BLOCK_DENY), metavar="GLOB", help="URL glob that is always blocked (repeatable)")
+    parser.add_argument("--auth-dir", default=AUTH_DIR, help="Where the login session (storage_state) is saved and reused")
+    parser.add_argument("--fresh-login", action="store_true", help="Ignore any saved session and log in again")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="Job queue database: USERS are added to it, and profiles are claimed with a lease, retried with backoff and skipped once done")
+    parser.add_argument("--queue-wait", type=float, default=0.0, metavar="SEC", help="Keep polling the queue every SEC seconds while jobs are backing off or leased elsewhere")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per profile before a queued job is marked failed")
+    parser.add_argument("--nav-per-min", type=float, default=NAV_PER_MIN, help="Profile navigations per minute, shared by all pages (0 = unlimited)")
+    parser.add_argument("--scroll-per-min", type=float, default=SCROLL_PER_MIN, help="Scroll requests per minute, shared by all pages (0 = unlimited)")
+    parser.add_argument("--recycle-after", type=int, default=RECYCLE_AFTER, metavar="N", help="Start a fresh page/context after N profiles (0 = never)")
+    parser.add_argument("--max-heap-mb", type=float, default=MAX_HEAP_MB, help="Also recycle the page once its JS heap exceeds this after a profile (0 = no limit)")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY, help="Scrape this many profiles in parallel with async Playwright")
+    parser.add_argument("--metrics", action="store_true", help="Write {username}.metrics.json and a Prometheus textfile with per-phase timings")
+    parser.add_argument("--prom-path", default=PROM_PATH, help="Prometheus textfile written with --metrics (default: %(default)s)")
+    parser.add_argument("--compare-engines", action="store_true", help="After scrolling, diff batch vs handles extraction and print mismatches")
     args = parser.parse_args()
+    try:
+        since_ms = parse_since(args.since, args.max_age)
+    except ValueError as e:
+        raise SystemExit(str(e))
 
     if not EMAIL or not PASSWORD:
         raise SystemExit("Please set EMAIL and PASSWORD at the top of scraper.py")
-    if not USERS:
+    if not USERS and not args.queue:
         raise SystemExit("Please add at least one username to USERS at the top of scraper.py")
 
+    compact_json = args.compact_json or JSON_COMPACT
+    # One limiter shared by every page of the run
+    limiter = RateLimiter(args.nav_per_min, args.scroll_per_min) if (args.nav_per_min or args.scroll_per_min) else UNLIMITED
+    if limiter is not UNLIMITED:
+        print(f"Rate limiter on: {args.nav_per_min:g} navigations/min, {args.scroll_per_min:g} scrolls/min (0 for both turns it off)")
+    if args.concurrency > 1:
+        unsupported = concurrent_unsupported(args)
+        if unsupported:
+            raise SystemExit(f"--concurrency > 1 runs the async batch scraper, which does not support: {', '.join(unsupported)}")
+        if args.stream or STREAM:
+            print("Note: --stream applies to sequential runs; concurrent mode writes {username}.json per profile")
+        import asyncio
+        from async_scraper import scrape_users_concurrently
+
+        asyncio.run(scrape_users_concurrently(
+            USERS,
+            EMAIL,
+            PASSWORD,
+            concurrency=args.concurrency,
+            headless=(args.headless or HEADLESS),
+            batch_size=args.batch_size,
+            save_cards=(args.save_cards or SAVE_CARDS),
+            auth_dir=args.auth_dir,
+            scroll_mode=args.scroll_mode,
+            incremental=(args.incremental or INCREMENTAL),
+            since_ms=since_ms,
+            fresh_login=args.fresh_login,
+            blocker=RequestBlocker(args.block, args.block_allow, args.block_deny),
+            db_path=args.db,
+            archive_path=args.archive,
+            compact_json=compact_json,
+            limiter=limiter,
+        ))
+        if args.media_dir:
+            from media import download_media, summary
+
+            for u in USERS:
+                if os.path.exists(f"{u}.json"):
+                    print(summary(download_media(load_user_json(u), args.media_dir, max_bytes=int(args.media_max_mb * 1024 * 1024))))
+        return
+
+    from pool import PagePool
+
     with sync_playwright() as p:
-        browser = p.chromium.launch(headless=(args.headless or HEADLESS))
-        page = browser.new_page(viewport={"width": 1440, "height": 900})
-        login(page, EMAIL, PASSWORD)
-        for u in USERS:
+        blocker = RequestBlocker(args.block, args.block_allow, args.block_deny)
+
+        def setup_context(context):
+            blocker.install(context)
+            limiter.install(context)
+
+        pool = PagePool(
+            p.chromium,
+            launch_kwargs={"headless": (args.headless or HEADLESS)},
+            context_kwargs={"viewport": {"width": 1440, "height": 900}},
+            setup=setup_context,
+            recycle_after=args.recycle_after,
+            max_heap_mb=args.max_heap_mb,
+            spare=SPARE_PAGE,
+            crash_retries=CRASH_RETRIES,
+        )
+        page = pool.start(None if args.fresh_login else load_session_state(args.auth_dir))
+        with_metrics = args.metrics or METRICS
+        # Run-wide phases (login) go to the Prometheus file without a user label
+        run_metrics = Metrics() if with_metrics else NULL_METRICS
+        all_metrics = [run_metrics] if with_metrics else []
+        with run_metrics.phase("login"):
+            ensure_logged_in(pool.context, page, EMAIL, PASSWORD, args.auth_dir)
+            pool.session_ready()
+        store = None
+        if args.db:
+            from storage import PostStore
+
+            store = PostStore(args.db)
+        archive = None
+        if args.archive:
+            from archive import CardArchive
+
+            archive = CardArchive(args.archive)
+        if args.media_dir:
+            from media import download_media, summary
+        job_queue = None
+        users = USERS
+        if args.queue:
+            from jobqueue import JobQueue
+
+            job_queue = JobQueue(args.queue, max_attempts=args.max_attempts)
+            job_queue.add(USERS)
+            print(f"Queue {args.queue}: {job_queue.counts()}")
+            users = job_queue.claimed(args.queue_wait)
+        for u in users:
             print(f"Scraping {u} ...")
-            data = scrape_user(page, u)
-            with open(f"{u}.json", "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"Wrote {len(data)} posts to {u}.json")
-        browser.close()
+            metrics = Metrics(u) if with_metrics else NULL_METRICS
+            scrape_kwargs = {
+                "engine": args.engine,
+                "batch_size": args.batch_size,
+                "save_cards": (args.save_cards or SAVE_CARDS),
+                "scroll_mode": args.scroll_mode,
+                "incremental": (args.incremental or INCREMENTAL),
+                "since_ms": since_ms,
+                "metrics": metrics,
+                "windowed": (args.windowed or WINDOWED),
+                "window_detach": args.window_detach,
+                "pipeline_workers": args.pipeline,
+                "limiter": limiter,
+                "archive": archive,
+            }
 
+            def scrape_profile_once(page):
+                if args.stream or STREAM:
+                    stream_user(page, u, compression=args.compress, write_json=(WRITE_JSON and not args.no_json), compact_json=compact_json, store=store, **scrape_kwargs)
+                    return None
+                data = scrape_user(page, u, **scrape_kwargs)
+                if args.compare_engines and scrape_kwargs["windowed"]:
+                    print("Note: --compare-engines needs the full DOM and is skipped with --windowed")
+                elif args.compare_engines:
+                    diffs = compare_engines(page, f"https://www.linkedin.com/in/{u}")
+                    print(f"Engine comparison for {u}: {len(diffs)} mismatches")
+                    for d in diffs[:20]:
+                        print(f"  card {d[0]} {d[1]}: handles={d[2]!r} batch={d[3]!r}")
+                with metrics.phase("write"):
+                    save_user_json(u, data, compact_json)
+                    if store is not None:
+                        store.save_profile(f"https://www.linkedin.com/in/{u}", data)
+                return data
 
-if __name__ == "__main__":
-    main()
+            def scrape_profile(page):
+                try:
+                    return scrape_profile_once(page)
+                except SessionExpired as e:
+                    # Logged out mid-run: log in again on this page, refresh the pool's session, retry once
+                    print(f"{e}; logging in again")
+                    ensure_logged_in(pool.context, page, EMAIL, PASSWORD, args.auth_dir, force=True)
+                    pool.session_ready()
+                    return scrape_profile_once(page)
+
+            try:
+                # Retried on a fresh page if the renderer or browser crashes mid-profile
+                data = pool.run(scrape_profile, u)
+            except Exception as e:
+                if job_queue is None:
+                    raise
+                # The queue retries it later (with backoff) or marks it failed after --max-attempts
+                print(f"Failed to scrape {u}: {e} -> {job_queue.fail(u, str(e))}")
+                continue
+            with metrics.phase("recycle"):
+                pool.profile_done()
+            if args.media_dir:
+                # Plain HTTP downloads after the profile is done; the browser sits idle meanwhile
+                records = data if data is not None else iter_ndjson(ndjson_path(u, args.compress), args.compress)
+                with metrics.phase("media"):
+                    media_stats = download_media(records, args.media_dir, max_bytes=int(args.media_max_mb * 1024 * 1024))
+                print(summary(media_stats))
+                metrics.set("media_downloaded", media_stats["downloaded"])
+                metrics.set("media_bytes", media_stats["bytes"])
+            if job_queue is not None:
+                job_queue.complete(u)
+            if with_metrics:
+                metrics.set("rate_limiter", limiter.stats())
+                metrics.write_json(metrics_path(u))
+                all_metrics.append(metrics)
+        if job_queue is not None:
+            print(f"Queue {args.queue}: {job_queue.counts()}")
+            job_queue.close()
+        if store is not None:
+            store.close()
+        if archive is not None:
+            archive.close()
+        if limiter is not UNLIMITED:
+            print(limiter.summary())
+            run_metrics.set("rate_factor", limiter.factor)
+            run_metrics.set("rate_navigation_per_min", limiter.rate("navigation"))
+            run_metrics.set("rate_scroll_per_min", limiter.rate("scroll"))
+        if with_metrics:
+            write_prometheus(all_metrics, args.prom_path)
+            print(f"Wrote metrics to {args.prom_path}")
+        if blocker.enabled:
+            print(blocker.summary())
+        print(pool.summary())
+        pool.close()
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List
+
+from output import write_json_array
+from records import RECORD_KEYS
+
+
+# SQLite storage: every post is stored once, keyed by activity URN, and linked to each scraped profile
+# it appeared on (a post reposted by ten tracked people is one `posts` row and ten `profile_posts` rows).
+# Writes are batched upserts in WAL mode; the per-user JSON files can be exported from it at any time.
+
+# Per-profile keys live on the link row; everything else describes the post itself. The same post scraped
+# from another profile can come with its own action and author (a repost card names the reposter), so
+# exporting a profile gives back that profile's view of its posts rather than whichever was scraped last.
+PROFILE_KEYS = ("action", "author", "authorUrl", "profileUrl")
+LINK_KEYS = [k for k in PROFILE_KEYS if k != "profileUrl"]
+POST_KEYS = [k for k in RECORD_KEYS if k not in PROFILE_KEYS]
+ACTIVITY_ID_RE = re.compile(r"activity[-:](\d{15,})")
+UPSERT_BATCH = 500
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS posts (
+    urn TEXT PRIMARY KEY,
+    {", ".join(POST_KEYS)},
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profile_posts (
+    profileUrl TEXT NOT NULL,
+    urn TEXT NOT NULL REFERENCES posts(urn),
+    {", ".join(f"{k} TEXT" for k in LINK_KEYS)},
+    run_at REAL NOT NULL,
+    position INTEGER NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (profileUrl, urn)
+);
+"""
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_profile_posts_profile ON profile_posts (profileUrl, run_at, position);
+CREATE INDEX IF NOT EXISTS idx_posts_timestamp ON posts (postTimestamp);
+CREATE INDEX IF NOT EXISTS idx_profile_posts_author ON profile_posts (authorUrl);
+"""
+
+_POST_COLS = ", ".join(POST_KEYS)
+_POST_UPSERT = (
+    f"INSERT INTO posts (urn, {_POST_COLS}, first_seen, last_seen) VALUES (?, {', '.join('?' * len(POST_KEYS))}, ?, ?) "
+    f"ON CONFLICT(urn) DO UPDATE SET {', '.join(f'{k} = excluded.{k}' for k in POST_KEYS)}, last_seen = excluded.last_seen"
+)
+_LINK_COLS = ", ".join(LINK_KEYS)
+_LINK_UPSERT = (
+    f"INSERT INTO profile_posts (profileUrl, urn, {_LINK_COLS}, run_at, position, first_seen) "
+    f"VALUES (?, ?, {', '.join('?' * len(LINK_KEYS))}, ?, ?, ?) "
+    f"ON CONFLICT(profileUrl, urn) DO UPDATE SET {', '.join(f'{k} = excluded.{k}' for k in LINK_KEYS)}, "
+    "run_at = excluded.run_at, position = excluded.position"
+)
+
+
+def post_urn(rec: Dict) -> str:
+    # Activity URN from the permalink (reposts link to the original post, so they share its key);
+    # records without one are keyed by a content hash
+    for k in ("postUrl", "sharedPostUrl"):
+        m = ACTIVITY_ID_RE.search(rec.get(k) or "")
+        if m:
+            return f"urn:li:activity:{m.group(1)}"
+    body = json.dumps([rec.get(k) for k in POST_KEYS], ensure_ascii=False)
+    return "sha1:" + hashlib.sha1(body.encode("utf-8")).hexdigest()
+
+
+class PostStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.executescript(INDEXES)
+
+    def _migrate(self) -> None:
+        # Databases from before author/authorUrl moved to the link row: add the columns, filled from the post
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(profile_posts)")}
+        with self.conn:
+            for k in LINK_KEYS:
+                if k not in cols:
+                    self.conn.execute(f"ALTER TABLE profile_posts ADD COLUMN {k} TEXT")
+                    self.conn.execute(f"UPDATE profile_posts SET {k} = (SELECT p.{k} FROM posts p WHERE p.urn = profile_posts.urn)")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_batch(self, profile_url: str, batch: List[Dict], run_at: float, start: int) -> None:
+        posts = []
+        links = []
+        for i, rec in enumerate(batch, start=start):
+            urn = post_urn(rec)
+            posts.append((urn, *(rec.get(k) for k in POST_KEYS), run_at, run_at))
+            links.append((profile_url, urn, *(rec.get(k) for k in LINK_KEYS), run_at, i, run_at))
+        # One transaction per batch
+        with self.conn:
+            self.conn.executemany(_POST_UPSERT, posts)
+            self.conn.executemany(_LINK_UPSERT, links)
+
+    def tee(self, profile_url: str, records: Iterable[Dict], batch_size: int = UPSERT_BATCH) -> Iterator[Dict]:
+        # Passes records through unchanged while upserting them in batches (for streamed runs)
+        run_at = time.time()
+        batch: List[Dict] = []
+        n = 0
+        for rec in records:
+            batch.append(rec)
+            if len(batch) >= batch_size:
+                self._write_batch(profile_url, batch, run_at, n)
+                n += len(batch)
+                batch = []
+            yield rec
+        if batch:
+            self._write_batch(profile_url, batch, run_at, n)
+
+    def save_profile(self, profile_url: str, records: Iterable[Dict], batch_size: int = UPSERT_BATCH) -> int:
+        # records in feed order (newest first), e.g. the list scrape_user() returns
+        n = 0
+        for _ in self.tee(profile_url, records, batch_size):
+            n += 1
+        return n
+
+    def iter_profile(self, profile_url: str) -> Iterator[Dict]:
+        # Same records and key order as {username}.json: latest run first, then feed position
+        cur = self.conn.execute(
+            f"SELECT {_POST_COLS}, {', '.join(f'l.{k}' for k in PROFILE_KEYS)} FROM profile_posts l JOIN posts p ON p.urn = l.urn "
+            "WHERE l.profileUrl = ? ORDER BY l.run_at DESC, l.position",
+            (profile_url,),
+        )
+        for row in cur:
+            rec = dict(zip(POST_KEYS + list(PROFILE_KEYS), row))
+            yield {k: rec[k] for k in RECORD_KEYS}
+
+    def export_profile(self, profile_url: str, path: str) -> int:
+        return write_json_array(self.iter_profile(profile_url), path)
+
+    def profiles(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT profileUrl FROM profile_posts ORDER BY profileUrl")]
+
+    def new_since(self, ts: float) -> List[Dict]:
+        # Links first seen after ts: which tracked profile posted/reposted what
+        cur = self.conn.execute(
+            "SELECT l.profileUrl, l.urn, l.action, p.postUrl, p.postTimestamp FROM profile_posts l "
+            "JOIN posts p ON p.urn = l.urn WHERE l.first_seen > ? ORDER BY l.first_seen, l.profileUrl, l.position",
+            (ts,),
+        )
+        return [dict(zip(("profileUrl", "urn", "action", "postUrl", "postTimestamp"), r)) for r in cur]
+
+    def stats(self) -> Dict:
+        q = lambda sql: self.conn.execute(sql).fetchone()[0]
+        return {
+            "posts": q("SELECT COUNT(*) FROM posts"),
+            "profile_posts": q("SELECT COUNT(*) FROM profile_posts"),
+            "profiles": q("SELECT COUNT(DISTINCT profileUrl) FROM profile_posts"),
+            "shared_posts": q("SELECT COUNT(*) FROM (SELECT urn FROM profile_posts GROUP BY urn HAVING COUNT(*) > 1)"),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query or export the SQLite post store")
+    parser.add_argument("db", help="SQLite database written with scraper.py --db")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_export = sub.add_parser("export", help="Write {username}.json for stored profiles")
+    p_export.add_argument("users", nargs="*", help="Usernames (default: every stored profile)")
+    p_export.add_argument("--out-dir", default=".")
+    p_import = sub.add_parser("import", help="Load existing {username}.json files")
+    p_import.add_argument("files", nargs="+")
+    p_new = sub.add_parser("new", help="Posts first seen after a time")
+    p_new.add_argument("--since-hours", type=float, default=24.0)
+    sub.add_parser("stats", help="Row counts")
+    args = parser.parse_args()
+
+    with PostStore(args.db) as store:
+        if args.cmd == "export":
+            urls = [f"https://www.linkedin.com/in/{u}" for u in args.users] or store.profiles()
+            os.makedirs(args.out_dir, exist_ok=True)
+            for url in urls:
+                path = os.path.join(args.out_dir, f"{url.rstrip('/').rsplit('/', 1)[-1]}.json")
+                print(f"Wrote {store.export_profile(url, path)} posts to {path}")
+        elif args.cmd == "import":
+            for path in args.files:
+                with open(path, encoding="utf-8") as f:
+                    data = json.load(f)
+                if data:
+                    print(f"Stored {store.save_profile(data[0]['profileUrl'], data)} posts from {path}")
+        elif args.cmd == "new":
+            for row in store.new_since(time.time() - args.since_hours * 3600):
+                print(json.dumps(row, ensure_ascii=False))
+        else:
+            print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
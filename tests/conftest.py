@@ -0,0 +1,66 @@
+import os
+import sys
+
+import pytest
+
+# Flat layout: the modules live at the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+
+
+@pytest.fixture(scope="session")
+def browser():
+    # Headless Chromium shared by the browser tests; they are skipped where it isn't installed
+    sync_api = pytest.importorskip("playwright.sync_api")
+    with sync_api.sync_playwright() as p:
+        try:
+            b = p.chromium.launch(headless=True)
+        except Exception as e:
+            pytest.skip(f"Chromium not available ({type(e).__name__}); run: python -m playwright install chromium")
+        yield b
+        b.close()
+
+
+@pytest.fixture
+def page(browser):
+    context = browser.new_context(viewport={"width": 1440, "height": 900})
+    page = context.new_page()
+    yield page
+    context.close()
+
+
+# End-to-end runs of scraper.main() go through a subprocess: it opens its own sync_playwright, which can't
+# nest inside the session's. The driver fills in the config, points BASE_URL at a local feed and skips login.
+CLI_DRIVER = """
+import sys
+sys.path.insert(0, {root!r})
+import scraper
+scraper.EMAIL = scraper.PASSWORD = "test"
+scraper.USERS = {users!r}
+scraper.BASE_URL = {base_url!r}
+scraper.ensure_logged_in = lambda *args, **kwargs: None
+sys.argv = ["scraper.py", "--headless", "--fresh-login", "--nav-per-min", "0", "--scroll-per-min", "0"] + {args!r}
+scraper.main()
+"""
+
+
+@pytest.fixture
+def run_scraper(tmp_path):
+    # run_scraper(base_url, users, args) -> CompletedProcess, run in tmp_path; skipped without Chromium
+    import subprocess
+
+    check = subprocess.run(
+        [sys.executable, "-c", "import os\nfrom playwright.sync_api import sync_playwright\n"
+         "with sync_playwright() as p:\n    print(os.path.exists(p.chromium.executable_path))"],
+        capture_output=True, text=True,
+    )
+    if check.stdout.strip() != "True":
+        pytest.skip("Chromium not available; run: python -m playwright install chromium")
+
+    def run(base_url, users, args):
+        driver = tmp_path / "run_scraper.py"
+        driver.write_text(CLI_DRIVER.format(root=ROOT, users=list(users), base_url=base_url, args=list(args)), encoding="utf-8")
+        return subprocess.run([sys.executable, str(driver)], cwd=str(tmp_path), capture_output=True, text=True, timeout=300)
+
+    return run
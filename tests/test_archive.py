@@ -0,0 +1,49 @@
+import pytest
+
+from archive import CardArchive
+
+PROFILE_URL = "https://www.linkedin.com/in/fixture-user"
+
+
+def _cards(first, n):
+    return [
+        (f"urn:li:activity:{i}", f'<div class="feed-shared-update-v2" data-urn="urn:li:activity:{i}"><p>card {i} of the feed</p></div>')
+        for i in range(first, first + n)
+    ]
+
+
+def test_write_then_read(tmp_path):
+    cards = _cards(1, 5)
+    with CardArchive(str(tmp_path / "cards.arc")) as arc:
+        assert arc.write(PROFILE_URL, cards, 1.0, 0) == {"stored": 5, "unchanged": 0}
+        assert [arc.get(urn) for urn, _ in cards] == [html for _, html in cards]
+        assert arc.write(PROFILE_URL, cards, 2.0, 0) == {"stored": 0, "unchanged": 5}
+
+
+def test_reopen_then_read(tmp_path):
+    path = str(tmp_path / "cards.arc")
+    cards = _cards(1, 5)
+    with CardArchive(path) as arc:
+        arc.write(PROFILE_URL, cards, 1.0, 0)
+    with CardArchive(path) as arc:
+        assert list(arc.iter_profile(PROFILE_URL)) == cards
+        assert arc.get(cards[2][0]) == cards[2][1]
+
+
+def test_write_after_rollback_uses_a_stored_dictionary(tmp_path, monkeypatch):
+    # The first write builds the dictionary and then fails; the next one must not compress with that
+    # dictionary, which was rolled back with the rest of the transaction
+    path = str(tmp_path / "cards.arc")
+    with CardArchive(path) as arc:
+        def boom(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(arc, "_compress", boom)
+        with pytest.raises(OSError):
+            arc.write(PROFILE_URL, _cards(100, 5), 1.0, 0)
+        monkeypatch.undo()
+        assert arc.conn.execute("SELECT COUNT(*) FROM meta").fetchone()[0] == 0
+        cards = _cards(1, 5)
+        assert arc.write(PROFILE_URL, cards, 2.0, 0)["stored"] == 5
+    with CardArchive(path) as arc:
+        assert list(arc.iter_profile(PROFILE_URL)) == cards
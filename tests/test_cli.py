@@ -0,0 +1,43 @@
+from argparse import Namespace
+
+import scraper
+
+
+def _args(**kw):
+    base = dict(engine="batch", windowed=False, pipeline=0, metrics=False, compare_engines=False, queue=None)
+    base.update(kw)
+    return Namespace(**base)
+
+
+def test_concurrency_accepts_batch_defaults(monkeypatch):
+    monkeypatch.setattr(scraper, "WINDOWED", False)
+    monkeypatch.setattr(scraper, "METRICS", False)
+    assert scraper.concurrent_unsupported(_args()) == []
+
+
+def test_concurrency_rejects_sequential_only_flags(monkeypatch):
+    monkeypatch.setattr(scraper, "WINDOWED", False)
+    monkeypatch.setattr(scraper, "METRICS", True)
+    bad = scraper.concurrent_unsupported(_args(engine="network", pipeline=2, compare_engines=True))
+    assert bad == ["--engine network", "--pipeline", "--metrics", "--compare-engines"]
+
+
+def test_concurrency_rejects_queue(monkeypatch):
+    monkeypatch.setattr(scraper, "WINDOWED", False)
+    monkeypatch.setattr(scraper, "METRICS", False)
+    bad = scraper.concurrent_unsupported(_args(queue="queue.db"))
+    assert len(bad) == 1 and bad[0].startswith("--queue")
+
+
+def test_scroll_rounds_give_up_after_idle_rounds():
+    rounds = scraper.ScrollRounds(max_idle_rounds=2, initial_latency=1.0, max_rounds=10)
+    arg, timeout_ms = rounds.start("div.card", 5)
+    assert arg["prev"] == 5 and timeout_ms == 3000
+    rounds.finish(True)
+    assert rounds.more() and rounds.idle_rounds == 0
+    for _ in range(2):
+        rounds.start("div.card", 5)
+        rounds.finish(False)
+    assert not rounds.more()
+    stats = rounds.stats("adaptive", 5)
+    assert (stats["rounds"], stats["idle_rounds"], stats["cards"]) == (3, 2, 5)
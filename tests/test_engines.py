@@ -0,0 +1,37 @@
+import bench
+import scraper
+
+
+def test_default_engine_is_batch():
+    assert scraper.ENGINE == "batch"
+
+
+def test_batch_engine_matches_handles_engine(page, monkeypatch):
+    # Both engines over the same DOM (bench.py's synthetic feed, every card type) must give identical records
+    cards = bench.make_cards(70)
+    server = bench.serve_feed(cards, lazy=False)
+    monkeypatch.setattr(scraper, "BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        scraper.open_user_posts(page, bench.BENCH_USER)
+        assert len(scraper.find_cards(page)) == len(cards)
+        assert scraper.compare_engines(page, bench.PROFILE_URL) == []
+    finally:
+        server.shutdown()
+
+
+def test_batch_engine_over_lazy_feed(page, monkeypatch):
+    # Infinite scroll: every card is loaded and extracted once, in feed order
+    cards = bench.make_cards(45)
+    server = bench.serve_feed(cards, lazy=True, page_size=15, delay_ms=50)
+    monkeypatch.setattr(scraper, "BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    try:
+        records = list(scraper.iter_user_posts(page, bench.BENCH_USER, engine="batch"))
+    finally:
+        server.shutdown()
+    assert [r["postUrl"] for r in records] == [r["postUrl"] for r in _offline_records(cards)]
+
+
+def _offline_records(cards):
+    from offline import extract_records
+
+    return extract_records(["".join(cards)], bench.PROFILE_URL)
@@ -0,0 +1,28 @@
+from jobqueue import JobQueue
+
+
+def test_queue_uses_rollback_journal(tmp_path):
+    q = JobQueue(str(tmp_path / "queue.db"))
+    try:
+        assert q.conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    finally:
+        q.close()
+
+
+def test_terminal_writes_stop_the_heartbeat_first(tmp_path, capsys):
+    # A lease this short renews every 10 ms, so a heartbeat still running past complete()/fail() would report it lost
+    q = JobQueue(str(tmp_path / "queue.db"), lease_sec=0.03, max_attempts=1)
+    try:
+        q.add(["alice", "bob"])
+        for u in q.claimed():
+            for _ in range(50):
+                q.renew(u)
+            if u == "alice":
+                q.complete(u)
+            else:
+                q.fail(u, "boom")
+        assert not q._heartbeats
+        assert {j["username"]: j["status"] for j in q.jobs()} == {"alice": "done", "bob": "failed"}
+    finally:
+        q.close()
+    assert "Lost the lease" not in capsys.readouterr().out
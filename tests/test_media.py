@@ -0,0 +1,92 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import media
+from media import download_media, media_key
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + b"x" * 4096
+
+
+def test_media_key_drops_cdn_signature():
+    a = "https://media.licdn.com/dms/image/v2/D4E22AQF/feedshare-shrink_800/0/1700000000000?e=1730000000&v=beta&t=abc"
+    b = "https://media.licdn.com/dms/image/v2/D4E22AQF/feedshare-shrink_800/0/1700000000000?e=1731111111&v=beta&t=xyz"
+    assert media_key(a) == media_key(b) == "https://media.licdn.com/dms/image/v2/D4E22AQF/feedshare-shrink_800/0/1700000000000?v=beta"
+    assert media_key("https://example.com/a.png") == "https://example.com/a.png"
+
+
+def test_media_key_keeps_other_hosts_query():
+    # Only licdn.com is known to sign its URLs; elsewhere the parameters may select the file
+    for url in ("https://example.com/a.png?e=1&t=2", "https://notlicdn.com/a.png?e=1&t=2"):
+        assert media_key(url) == url
+
+
+def _serve(hits):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "image/png")
+            self.send_header("Content-Length", str(len(IMAGE)))
+            self.end_headers()
+            self.wfile.write(IMAGE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_resigned_urls_are_fetched_once(tmp_path, monkeypatch):
+    # The local server stands in for the CDN
+    monkeypatch.setattr(media, "SIGNED_HOSTS", media.SIGNED_HOSTS + ("127.0.0.1",))
+    hits = []
+    server = _serve(hits)
+    base = f"http://127.0.0.1:{server.server_address[1]}/dms/image/feedshare/0/1700000000000"
+    try:
+        first = download_media([{"imgUrl": f"{base}?e=1&v=beta&t=a"}, {"imgUrl": f"{base}?e=2&v=beta&t=b"}], str(tmp_path))
+        # Next run: the CDN signed the same image differently
+        second = download_media([{"imgUrl": f"{base}?e=3&v=beta&t=c"}], str(tmp_path))
+    finally:
+        server.shutdown()
+    assert len(hits) == 1
+    assert (first["downloaded"], first["cached"], len(first["files"])) == (1, 0, 2)
+    assert (second["downloaded"], second["cached"]) == (0, 1)
+    assert set(first["files"].values()) == set(second["files"].values())
+
+
+def test_download_media_under_a_running_event_loop(tmp_path):
+    # Playwright's sync API keeps a loop running on the scraper's thread while main() downloads media
+    import asyncio
+
+    hits = []
+    server = _serve(hits)
+    url = f"http://127.0.0.1:{server.server_address[1]}/img/1.png"
+
+    async def inside_loop():
+        return download_media([{"imgUrl": url}], str(tmp_path))
+
+    try:
+        stats = asyncio.run(inside_loop())
+    finally:
+        server.shutdown()
+    assert stats["downloaded"] == 1 and len(hits) == 1
+
+
+def test_sequential_run_downloads_media(run_scraper, tmp_path):
+    import bench
+
+    hits = []
+    media_server = _serve(hits)
+    media_base = f"http://127.0.0.1:{media_server.server_address[1]}"
+    cards = [c.replace("https://media.example.invalid", media_base) for c in bench.make_cards(6)]
+    feed = bench.serve_feed(cards, lazy=False)
+    try:
+        proc = run_scraper(f"http://127.0.0.1:{feed.server_address[1]}", [bench.BENCH_USER], ["--media-dir", "media"])
+    finally:
+        feed.shutdown()
+        media_server.shutdown()
+    assert proc.returncode == 0, proc.stderr
+    assert "Media: " in proc.stdout and "0 failed" in proc.stdout
+    assert hits and (tmp_path / "media" / "index.db").exists()
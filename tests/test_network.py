@@ -0,0 +1,202 @@
+import html
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import scraper
+from conftest import FIXTURES
+from network import FeedResponseCollector
+
+# Recorded Voyager payloads (trimmed): the server-rendered first page (a <code id="bpr-guid-..."> blob with an
+# article post whose counts hang off a SocialDetail -> SocialActivityCounts chain) and the next page fetched
+# over XHR (a reshare of someone else's image post, and a video post, with standalone SocialActivityCounts)
+USER = "fixture-user"
+PROFILE_URL = f"https://www.linkedin.com/in/{USER}"
+FEED_XHR = "/voyager/api/feed/dash/profileUpdates?count=2&start=1"
+
+EXPECTED = [
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7250000000000000001/",
+        "sharedJobUrl": None,
+        "imgUrl": None,
+        "postContent": "Notes from profiling our scraper: batch your page.evaluate calls.",
+        "type": "article",
+        "likeCount": 42,
+        "commentCount": 7,
+        "repostCount": 3,
+        "postDate": "3d",
+        "action": "repost",
+        "author": "Fixture User",
+        "authorUrl": PROFILE_URL,
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-10T04:31:38.486Z",
+        "videoUrl": None,
+        "sharedPostUrl": "https://example.com/blog/scraper-perf",
+    },
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7249000000000000002/",
+        "sharedJobUrl": None,
+        "imgUrl": "https://media.licdn.com/dms/image/v2/D4E22AQF/feedshare-shrink_1280/0/1700000000000?e=1730000000&v=beta&t=def",
+        "postContent": "Worth reading.",
+        "type": "image",
+        "likeCount": 5,
+        "commentCount": 0,
+        "repostCount": 1,
+        "postDate": "1w",
+        "action": "repost",
+        "author": "Jane Original",
+        "authorUrl": "https://www.linkedin.com/in/jane-original",
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-07T10:17:59.907Z",
+        "videoUrl": None,
+        "sharedPostUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7100000000000000009/",
+    },
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7248000000000000003/",
+        "sharedJobUrl": None,
+        "imgUrl": None,
+        "postContent": "Short demo of the windowed mode.",
+        "type": "video",
+        "likeCount": 12,
+        "commentCount": 2,
+        "repostCount": 0,
+        "postDate": "2mo",
+        "action": "post",
+        "author": "Fixture User",
+        "authorUrl": PROFILE_URL,
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-04T16:04:21.328Z",
+        "videoUrl": "https://dms.licdn.com/playlist/vid/v2/D4E05AQ/mp4-720p-30fp-crf28/0/1700000000001?e=1730000000&v=beta&t=ghi",
+        "sharedPostUrl": None,
+    },
+]
+URNS = ["urn:li:activity:7250000000000000001", "urn:li:activity:7249000000000000002", "urn:li:activity:7248000000000000003"]
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _assert_records(records):
+    assert len(records) == len(EXPECTED)
+    for rec, want in zip(records, EXPECTED):
+        for key, value in want.items():
+            assert rec[key] == value, (want["postUrl"], key)
+
+
+class _Response:
+    def __init__(self, url, body):
+        self.url = url
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class _Page:
+    # collect_embedded() only evaluates EMBEDDED_PAYLOADS_JS
+    def __init__(self, blobs):
+        self.blobs = blobs
+
+    def evaluate(self, js):
+        return self.blobs
+
+
+def test_collector_resolves_recorded_payloads():
+    collector = FeedResponseCollector()
+    collector.on_response(_Response("https://www.linkedin.com" + FEED_XHR, _fixture("voyager_feed.json")))
+    collector.on_response(_Response("https://www.linkedin.com/voyager/api/me", "{}"))
+    # The embedded first page is read after scrolling but still comes first
+    collector.collect_embedded(_Page([_fixture("voyager_embedded.json"), "not json"]))
+    assert collector.responses == 1
+    pairs = list(collector.iter_records(PROFILE_URL))
+    assert [urn for urn, _ in pairs] == URNS
+    _assert_records([rec for _, rec in pairs])
+
+
+PAGE = """<!doctype html>
+<html><body><main id="feed">
+<div class="feed-shared-update-v2" data-urn="{first}"><p>first page card</p></div>
+</main>
+<code id="bpr-guid-1001" style="display: none">{embedded}</code>
+<script>
+fetch("{xhr}").then((r) => r.json()).then((payload) => {{
+  const feed = document.getElementById("feed");
+  for (const ref of payload.data.data.feedDashProfileUpdatesByMemberShareFeed["*elements"]) {{
+    const card = document.createElement("div");
+    card.className = "feed-shared-update-v2";
+    card.setAttribute("data-urn", ref.match(/urn:li:activity:\\d+/)[0]);
+    card.textContent = "xhr card";
+    feed.appendChild(card);
+  }}
+}});
+</script>
+</body></html>
+"""
+
+
+def _serve():
+    page_html = PAGE.format(first=URNS[0], embedded=html.escape(_fixture("voyager_embedded.json")), xhr=FEED_XHR).encode("utf-8")
+    feed_json = _fixture("voyager_feed.json").encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.endswith("/recent-activity/all/"):
+                body, ctype = page_html, "text/html; charset=utf-8"
+            elif self.path == FEED_XHR:
+                body, ctype = feed_json, "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_network_engine_over_recorded_feed(page, monkeypatch):
+    server = _serve()
+    monkeypatch.setattr(scraper, "BASE_URL", f"http://127.0.0.1:{server.server_address[1]}")
+    html_snippets, card_urns = [], []
+    try:
+        records = list(scraper.iter_user_posts(page, USER, engine="network", card_html_snippets=html_snippets, card_urns=card_urns))
+    finally:
+        server.shutdown()
+    _assert_records(records)
+    assert card_urns == URNS
+    # --save-cards / --archive get the rendered card of every post
+    assert [f'data-urn="{urn}"' in snippet for urn, snippet in zip(URNS, html_snippets)] == [True] * 3
+
+
+class _ListenerPage:
+    def __init__(self):
+        self.listeners = []
+
+    def on(self, event, fn):
+        self.listeners.append((event, fn))
+
+    def remove_listener(self, event, fn):
+        self.listeners.remove((event, fn))
+
+
+def test_collector_detached_when_opening_fails(monkeypatch):
+    def expired(page, username, limiter):
+        raise scraper.SessionExpired("redirected to the login page")
+
+    monkeypatch.setattr(scraper, "open_user_posts", expired)
+    page = _ListenerPage()
+    with pytest.raises(scraper.SessionExpired):
+        list(scraper.iter_user_posts(page, USER, engine="network"))
+    assert page.listeners == []
@@ -0,0 +1,109 @@
+import os
+
+import offline
+from conftest import FIXTURES
+
+# A saved {username}.cards.html (the format scrape_user(save_cards=True) writes): an edited text post, an image
+# post, a repost of someone else's video, a job share, the first card again (rendered twice while scrolling)
+# and a non-activity card
+PATH = os.path.join(FIXTURES, "fixture-user.cards.html")
+PROFILE_URL = "https://www.linkedin.com/in/fixture-user"
+
+EXPECTED = [
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7250000000000000001/",
+        "sharedJobUrl": None,
+        "imgUrl": None,
+        "postContent": "Notes from profiling our scraper:\nbatch your page.evaluate calls.",
+        "type": "text",
+        "likeCount": 42,
+        "commentCount": 7,
+        "repostCount": 3,
+        "postDate": "3d",
+        "action": "post",
+        "author": "Fixture User",
+        "authorUrl": PROFILE_URL,
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-10T04:31:38.486Z",
+        "videoUrl": None,
+        "sharedPostUrl": None,
+    },
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7249000000000000002/",
+        "sharedJobUrl": None,
+        "imgUrl": "https://media.licdn.com/dms/image/v2/D4E22AQF/feedshare-shrink_800/0/1700000000000?e=1730000000&v=beta&t=abc",
+        "postContent": "Whiteboard from today's session.",
+        "type": "image",
+        "likeCount": 1204,
+        "commentCount": 18,
+        "repostCount": None,
+        "postDate": "1w",
+        "action": "post",
+        "author": "Fixture User",
+        "authorUrl": PROFILE_URL,
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-07T10:17:59.907Z",
+        "videoUrl": None,
+        "sharedPostUrl": None,
+    },
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7248000000000000003/",
+        "sharedJobUrl": None,
+        "imgUrl": None,
+        "postContent": "Short demo of the windowed mode.",
+        "type": "video",
+        "likeCount": 2100,
+        "commentCount": 96,
+        "repostCount": 12,
+        "postDate": "2mo",
+        "action": "repost",
+        "author": "Jane Original",
+        "authorUrl": "https://www.linkedin.com/in/jane-original/",
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-04T16:04:21.328Z",
+        "videoUrl": "https://dms.licdn.com/playlist/vid/v2/D4E05AQ/mp4-720p-30fp-crf28/0/1700000000001?e=1730000000&v=beta&t=ghi",
+        "sharedPostUrl": None,
+    },
+    {
+        "postUrl": "https://www.linkedin.com/feed/update/urn:li:activity:7247000000000000004/",
+        "sharedJobUrl": "https://www.linkedin.com/jobs/view/4000000123/",
+        "imgUrl": None,
+        "postContent": "We're hiring a backend engineer.",
+        "type": "text",
+        "likeCount": None,
+        "commentCount": None,
+        "repostCount": None,
+        "postDate": "1yr",
+        "action": "post",
+        "author": "Fixture User",
+        "authorUrl": PROFILE_URL,
+        "profileUrl": PROFILE_URL,
+        "postTimestamp": "2024-10-01T21:50:42.749Z",
+        "videoUrl": None,
+        "sharedPostUrl": None,
+    },
+]
+
+
+def _html():
+    with open(PATH, encoding="utf-8") as f:
+        return f.read()
+
+
+def _assert_records(records):
+    assert len(records) == len(EXPECTED)
+    for rec, want in zip(records, EXPECTED):
+        for key, value in want.items():
+            assert rec[key] == value, (want["postUrl"], key)
+
+
+def test_extract_records_from_saved_cards():
+    _assert_records(offline.extract_records([_html()], PROFILE_URL))
+
+
+def test_card_by_card_matches_whole_file():
+    # record_from_card_html() is what the worker processes run on single cards
+    cards = _html().split("\n<!-- CARD ")[1:]
+    records = [offline.record_from_card_html(c.split("-->\n", 1)[1], PROFILE_URL) for c in cards[:4]]
+    _assert_records(records)
+    assert offline.record_from_card_html("<p>not a card</p>", PROFILE_URL) is None
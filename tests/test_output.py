@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import output
+import scraper
+from output import iter_ndjson, ndjson_to_json, write_json, write_json_array, write_ndjson
+from records import RECORD_KEYS, Post
+
+
+def _post(i):
+    return {"postUrl": f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/", "postContent": f"post {i}"}
+
+
+def _record(i):
+    # Every key, with the values that need care: non-ASCII and line breaks, nulls, large counts
+    rec = dict.fromkeys(RECORD_KEYS)
+    rec.update(_post(i), postContent=f"Café ☕ #{i}\n\"quoted\" \u2028 text", likeCount=10**12 + i, author="Zoë")
+    return rec
+
+
+def _records():
+    return [_record(1), Post.from_dict(_record(2)), _record(3)]
+
+
+def _urn(rec):
+    return rec["postUrl"].split("/")[-2]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+@pytest.mark.parametrize("write_json", [False, True])
+def test_incremental_stream_runs_keep_earlier_posts(tmp_path, monkeypatch, compression, write_json):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    # Stands in for the browser: yields the feed's posts newest first, stopping at the first known one
+    feed = []
+
+    def fake_iter_user_posts(page, username, engine, batch_size, scroll_mode, known_urns, since_ms, html, card_urns, *rest):
+        for rec in feed:
+            if _urn(rec) in known_urns:
+                return
+            card_urns.append(_urn(rec))
+            yield rec
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "iter_user_posts", fake_iter_user_posts)
+    feed[:] = [_post(2), _post(1)]
+    assert scraper.stream_user(None, "alice", incremental=True, compression=compression, write_json=write_json) == 2
+    feed[:] = [_post(4), _post(3), _post(2), _post(1)]
+    assert scraper.stream_user(None, "alice", incremental=True, compression=compression, write_json=write_json) == 2
+
+    path = scraper.ndjson_path("alice", compression)
+    assert list(iter_ndjson(path, compression)) == [_post(2), _post(1), _post(4), _post(3)]
+    assert scraper.load_known_urns("alice") == [_urn(_post(i)) for i in (4, 3, 2, 1)]
+    if write_json:
+        with open("alice.json", encoding="utf-8") as f:
+            assert json.load(f) == [_post(4), _post(3), _post(2), _post(1)]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("n", [0, 1, 3])
+def test_json_array_matches_write_json(tmp_path, monkeypatch, use_orjson, compact, n):
+    if use_orjson:
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(output, "orjson", None)
+    records = _records()[:n]
+    assert write_json_array(iter(records), str(tmp_path / "streamed.json"), compact) == n
+    write_json(records, str(tmp_path / "whole.json"), compact)
+    assert (tmp_path / "streamed.json").read_bytes() == (tmp_path / "whole.json").read_bytes()
+    with open(tmp_path / "streamed.json", encoding="utf-8") as f:
+        assert json.load(f) == [dict(r) for r in records]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip", "zstd"])
+def test_ndjson_round_trip(tmp_path, compression):
+    if compression == "zstd":
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / output.ndjson_path("alice", compression))
+    records = _records()
+    assert write_ndjson(records[:2], path, compression) == 2
+    # A second run appends another gzip member / zstd frame
+    assert write_ndjson(records[2:], path, compression, append=True) == 1
+    assert list(iter_ndjson(path, compression)) == [dict(r) for r in records]
+
+
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def test_ndjson_to_json(tmp_path, compression):
+    path = str(tmp_path / output.ndjson_path("alice", compression))
+    records = _records()
+    earlier = [_record(0)]
+    write_ndjson(earlier + records, path, compression)
+    previous = [_record(-1), _record(-2)]
+    # skip leaves out the record an earlier run already put in the JSON file; this run's records go before previous
+    assert ndjson_to_json(path, str(tmp_path / "alice.json"), compression, previous=previous, skip=1) == 5
+    write_json(records + previous, str(tmp_path / "expected.json"))
+    assert (tmp_path / "alice.json").read_bytes() == (tmp_path / "expected.json").read_bytes()
+    assert ndjson_to_json(path, str(tmp_path / "compact.json"), compression, compact=True) == 4
+    with open(tmp_path / "compact.json", encoding="utf-8") as f:
+        assert json.load(f) == [dict(r) for r in earlier + records]
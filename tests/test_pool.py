@@ -0,0 +1,82 @@
+from pool import PagePool
+
+
+class FakePage:
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, fn):
+        self.handlers[event] = fn
+
+    def crash(self):
+        self.handlers["crash"](self)
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+
+    def new_page(self):
+        return FakePage()
+
+    def storage_state(self):
+        return {"cookies": []}
+
+    def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def on(self, event, fn):
+        pass
+
+    def new_context(self, **kwargs):
+        return FakeContext()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeBrowserType:
+    def launch(self, **kwargs):
+        return FakeBrowser()
+
+
+def _pool(**kw):
+    pool = PagePool(FakeBrowserType(), **kw)
+    pool.start()
+    pool.session_ready()
+    return pool
+
+
+def test_spare_crash_does_not_fail_the_active_page():
+    pool = _pool(recycle_after=1, max_heap_mb=0)
+    active, spare = pool.page, pool._spare[1]
+    spare.crash()
+    assert not pool.is_crash(RuntimeError("selector timeout"))
+    assert pool.run(lambda page: page is active)
+    # The crashed spare is never handed out on the next recycle
+    pool.profile_done()
+    assert pool.page is not spare and pool.page is not active
+    assert pool._spare is not None and pool._spare[1] is not spare
+
+
+def test_active_page_crash_retries_on_a_fresh_page():
+    pool = _pool(max_heap_mb=0)
+    first = pool.page
+    seen = []
+
+    def scrape(page):
+        seen.append(page)
+        if page is first:
+            page.crash()
+            raise RuntimeError("Page.goto: Navigation failed")
+        return "ok"
+
+    assert pool.run(scrape, "alice") == "ok"
+    assert seen[0] is first and seen[1] is not first
+    assert not pool._crashed_pages
+    assert (pool.stats["crashes"], pool.stats["retries"]) == (1, 1)
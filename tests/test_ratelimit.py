@@ -0,0 +1,24 @@
+from ratelimit import RateLimiter, throttle_signal
+from scraper import auth_redirect
+
+
+def test_throttle_signals_are_statuses_only():
+    assert throttle_signal(429) == "http_429"
+    assert throttle_signal(999) == "http_999"
+    assert throttle_signal(200) is None
+    assert throttle_signal(None) is None
+
+
+def test_login_pages_are_auth_redirects_not_throttling():
+    assert auth_redirect("https://www.linkedin.com/authwall?trk=gf") == "/authwall"
+    assert auth_redirect("https://www.linkedin.com/checkpoint/challenge/AgF") == "/checkpoint/challenge/AgF"
+    assert auth_redirect("https://www.linkedin.com/uas/login?session_redirect=x") == "/uas/login"
+    assert auth_redirect("https://www.linkedin.com/login") == "/login"
+    assert auth_redirect("https://www.linkedin.com/in/loginov/recent-activity/all/") is None
+    assert auth_redirect(None) is None
+
+
+def test_throttling_halves_the_rate():
+    limiter = RateLimiter(10.0, 120.0, cooldown_sec=0.0)
+    limiter.throttled("http_429")
+    assert limiter.rate("navigation") == 5.0 and limiter.stats()["signals"] == {"http_429": 1}
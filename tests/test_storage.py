@@ -0,0 +1,81 @@
+import json
+import sqlite3
+
+from output import write_json
+from records import RECORD_KEYS
+from storage import PostStore
+
+ALICE = "https://www.linkedin.com/in/alice"
+BOB = "https://www.linkedin.com/in/bob"
+
+
+def _post(i, **kw):
+    rec = dict.fromkeys(RECORD_KEYS)
+    rec.update(
+        postUrl=f"https://www.linkedin.com/feed/update/urn:li:activity:{7200000000000000000 + i}/",
+        postContent=f"post {i}",
+        type="text",
+        likeCount=i,
+        commentCount=0,
+        repostCount=0,
+        postDate="1d",
+        action="post",
+        author="Alice",
+        authorUrl=ALICE,
+        profileUrl=ALICE,
+        postTimestamp="2024-10-10T04:31:38.486Z",
+    )
+    rec.update(kw)
+    return rec
+
+
+def test_upsert_refreshes_the_post(tmp_path):
+    with PostStore(str(tmp_path / "posts.db")) as store:
+        store.save_profile(ALICE, [_post(1), _post(2)])
+        store.save_profile(ALICE, [_post(3), _post(1, likeCount=40)])
+        assert store.stats() == {"posts": 3, "profile_posts": 3, "profiles": 1, "shared_posts": 0}
+        assert [r["likeCount"] for r in store.iter_profile(ALICE)] == [3, 40, 2]
+
+
+def test_shared_post_keeps_each_profiles_view(tmp_path):
+    shared = _post(1)
+    bobs = _post(1, action="repost", author="Bob", authorUrl=BOB, profileUrl=BOB, likeCount=5)
+    with PostStore(str(tmp_path / "posts.db")) as store:
+        store.save_profile(ALICE, [shared])
+        store.save_profile(BOB, [bobs, _post(2, author="Bob", authorUrl=BOB, profileUrl=BOB)])
+        assert store.stats() == {"posts": 2, "profile_posts": 3, "profiles": 2, "shared_posts": 1}
+        assert store.profiles() == [ALICE, BOB]
+        # The post itself is refreshed by the later scrape; the link fields are not
+        assert list(store.iter_profile(ALICE)) == [dict(shared, likeCount=5)]
+        assert next(store.iter_profile(BOB)) == bobs
+        assert [(r["profileUrl"], r["action"]) for r in store.new_since(0)] == [(ALICE, "post"), (BOB, "repost"), (BOB, "post")]
+
+
+def test_export_matches_the_scraped_json(tmp_path):
+    records = [_post(3), _post(2, type="image", imgUrl="https://media.licdn.com/x.png"), _post(1, action="repost", author="Carol")]
+    write_json(records, str(tmp_path / "alice.json"))
+    with PostStore(str(tmp_path / "posts.db")) as store:
+        assert store.save_profile(ALICE, records) == 3
+        assert store.export_profile(ALICE, str(tmp_path / "export.json")) == 3
+    assert (tmp_path / "export.json").read_bytes() == (tmp_path / "alice.json").read_bytes()
+    with open(tmp_path / "export.json", encoding="utf-8") as f:
+        assert json.load(f) == records
+
+
+def test_older_database_gets_the_link_columns(tmp_path):
+    # Before author/authorUrl were kept per profile they were only on the post
+    path = str(tmp_path / "posts.db")
+    old_keys = [k for k in RECORD_KEYS if k not in ("action", "profileUrl")]
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        f"CREATE TABLE posts (urn TEXT PRIMARY KEY, {', '.join(old_keys)}, first_seen REAL NOT NULL, last_seen REAL NOT NULL);"
+        "CREATE TABLE profile_posts (profileUrl TEXT NOT NULL, urn TEXT NOT NULL, action TEXT, run_at REAL NOT NULL, "
+        "position INTEGER NOT NULL, first_seen REAL NOT NULL, PRIMARY KEY (profileUrl, urn));"
+        "INSERT INTO posts (urn, author, authorUrl, first_seen, last_seen) VALUES ('urn:li:activity:1', 'Alice', 'a', 1, 1);"
+        f"INSERT INTO profile_posts VALUES ('{ALICE}', 'urn:li:activity:1', 'post', 1, 0, 1);"
+    )
+    conn.close()
+    with PostStore(path) as store:
+        assert store.conn.execute("SELECT author, authorUrl FROM profile_posts").fetchall() == [("Alice", "a")]
+        store.save_profile(ALICE, [_post(2)])
+        assert [r["author"] for r in store.iter_profile(ALICE)] == ["Alice", "Alice"]
@@ -0,0 +1,24 @@
+import json
+import os
+
+import pytest
+
+from conftest import FIXTURES
+from scraper import counts_from_text, date_action_from_texts
+from textparse import parse_counts, parse_date_action
+
+# card_texts.json: cardText/likeAria/likeSpan/dateTexts as the snapshot JS reads them, from bench.py's synthetic
+# cards (via offline.iter_snapshots), textparse.SAMPLE_CORPUS and hand-written edge cases (suffixes, casing,
+# malformed numbers, empty snippets)
+with open(os.path.join(FIXTURES, "card_texts.json"), encoding="utf-8") as f:
+    CORPUS = json.load(f)
+
+
+@pytest.mark.parametrize("item", CORPUS)
+def test_parse_counts_matches_reference(item):
+    assert parse_counts(item["cardText"], item["likeAria"], item["likeSpan"]) == counts_from_text(item["likeAria"], item["likeSpan"], item["cardText"])
+
+
+@pytest.mark.parametrize("item", CORPUS)
+def test_parse_date_action_matches_reference(item):
+    assert parse_date_action(item["dateTexts"]) == date_action_from_texts(item["dateTexts"])
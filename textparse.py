@@ -0,0 +1,193 @@
+import argparse
+import json
+import os
+import re
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Compiled, single-pass versions of the text parsing in scraper.py (parse_int, counts_from_text,
+# date_action_from_texts). Results are identical; the patterns are compiled once and each card text is
+# scanned once for all four counts, and once for relative time + action.
+
+_NUMBER_RE = re.compile(r"^([0-9]*\.?[0-9]+)\s*([kmb]?)$")
+_SUFFIX = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+_ARIA_LIKES_RE = re.compile(r"([0-9][\d,\.]*\s*[kmb]?)\s+reactions?", re.I)
+# Leftmost-first over every count kind at once; matches of different kinds can never overlap,
+# so the first match per kind equals a separate re.search per kind
+_COUNTS_RE = re.compile(r"([0-9][\d,\.]*\s*[kmb]?)\s+(likes|reactions?|comments?|reposts?|views?)\b", re.I)
+_COUNT_KIND = {
+    "likes": 0, "reaction": 0, "reactions": 0,
+    "comment": 1, "comments": 1,
+    "repost": 2, "reposts": 2,
+    "view": 3, "views": 3,
+}
+# "10 years ago" is already matched by the compact form, so one relative-time pattern is enough
+_DATE_ACTION_RE = re.compile(
+    r"(?P<num>\b\d+)\s*(?P<unit>h|hr|hrs|hour|hours|d|day|days|w|wk|wks|week|weeks|mo|month|months|y|yr|yrs|year|years)\b"
+    r"|(?P<action>reposted|shared|commented|liked)",
+    re.I,
+)
+_UNIT = {}
+for _suffix, _units in (("h", "h hr hrs hour hours"), ("d", "d day days"), ("w", "w wk wks week weeks"), ("mo", "mo month months"), ("yr", "y yr yrs year years")):
+    for _u in _units.split():
+        _UNIT[_u] = _suffix
+
+Counts = Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]
+DateAction = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def parse_number(text: Optional[str]) -> Optional[int]:
+    # Same results as scraper.parse_int ("1,234" -> 1234, "1.2K" -> 1200)
+    if not text:
+        return None
+    t = text.strip().lower().replace(",", "")
+    m = _NUMBER_RE.match(t)
+    try:
+        if not m:
+            return int(t)
+        return int(float(m.group(1)) * _SUFFIX[m.group(2)])
+    except Exception:
+        return None
+
+
+def parse_counts(text: str, like_aria: Optional[str] = None, like_span: Optional[str] = None) -> Counts:
+    counts: List[Optional[int]] = [None, None, None, None]
+    if like_aria is not None:
+        m = _ARIA_LIKES_RE.search(like_aria)
+        if m:
+            counts[0] = parse_number(m.group(1))
+    if counts[0] is None and like_span is not None:
+        counts[0] = parse_number(like_span.strip())
+    # A structured like count wins over the text; otherwise the first "N likes/reactions" does
+    found = [counts[0] is not None, False, False, False]
+    for m in _COUNTS_RE.finditer(text):
+        kind = _COUNT_KIND[m.group(2).lower()]
+        if found[kind]:
+            continue
+        found[kind] = True
+        counts[kind] = parse_number(m.group(1))
+        if all(found):
+            break
+    return counts[0], counts[1], counts[2], counts[3]
+
+
+def parse_date_action(texts: Sequence[str]) -> DateAction:
+    text = " ".join(texts)
+    rel = action = None
+    for m in _DATE_ACTION_RE.finditer(text):
+        if m.group("action") is not None:
+            if action is None:
+                action = m.group("action").lower()
+        elif rel is None:
+            rel = m.group("num") + _UNIT[m.group("unit").lower()]
+        if rel is not None and action is not None:
+            break
+    if rel:
+        return rel, action, rel
+    # Fallback to first non-empty snippet
+    for raw in texts:
+        if raw:
+            return raw, action, raw
+    return None, action, None
+
+
+def parse_counts_batch(items: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> List[Counts]:
+    # items: (card text, like button aria-label, like count span text)
+    return [parse_counts(text, aria, span) for text, aria, span in items]
+
+
+def parse_date_action_batch(items: Iterable[Sequence[str]]) -> List[DateAction]:
+    return [parse_date_action(texts) for texts in items]
+
+
+SAMPLE_CORPUS: List[Dict] = [
+    {"cardText": "Jane Doe\n3d • Edited\nShipping v2 today!\n1,234 reactions\n56 comments\n7 reposts", "likeAria": "1,234 reactions", "likeSpan": "1,234", "dateTexts": ["3d • Edited •", "3d"]},
+    {"cardText": "John Smith reposted this\n2w\nGreat thread\n1.2K likes · 300 Comments · 12 reposts · 4,567 views", "likeAria": None, "likeSpan": None, "dateTexts": ["2 weeks ago"]},
+    {"cardText": "Someone commented on this\n10 years ago\nNo counts here", "likeAria": "", "likeSpan": "", "dateTexts": ["10 years ago", "Visible to anyone"]},
+    {"cardText": "1 comment 1 repost 2M views 5 reactions", "likeAria": "Reactions", "likeSpan": "5", "dateTexts": ["Promoted"]},
+    {"cardText": "Shared by Alex • 5h\n5 hours ago 0 likes", "likeAria": None, "likeSpan": None, "dateTexts": ["5 hours ago • shared"]},
+    {"cardText": "", "likeAria": None, "likeSpan": None, "dateTexts": []},
+]
+
+
+# The card texts tests/test_textparse.py checks: snapshots of bench.py's generated cards, SAMPLE_CORPUS and
+# hand-written edge cases. Timings on it are synthetic; pass saved .cards.html files for figures from real feeds.
+FIXTURE_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tests", "fixtures", "card_texts.json")
+
+
+def load_corpus(paths: List[str]) -> List[Dict]:
+    # Card texts from saved {username}.cards.html files (via the offline extractor's snapshots),
+    # or from .json lists of them like FIXTURE_CORPUS
+    from offline import iter_snapshots
+
+    corpus = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".json"):
+                corpus.extend(json.load(f))
+                continue
+            for snap in iter_snapshots(f.read()):
+                corpus.append({k: snap[k] for k in ("cardText", "likeAria", "likeSpan", "dateTexts")})
+    return corpus
+
+
+def check_equivalence(corpus: List[Dict]) -> List[Tuple[int, str, object, object]]:
+    from scraper import counts_from_text, date_action_from_texts
+
+    diffs = []
+    for i, c in enumerate(corpus):
+        ref = counts_from_text(c["likeAria"], c["likeSpan"], c["cardText"])
+        new = parse_counts(c["cardText"], c["likeAria"], c["likeSpan"])
+        if ref != new:
+            diffs.append((i, "counts", ref, new))
+        ref = date_action_from_texts(c["dateTexts"])
+        new = parse_date_action(c["dateTexts"])
+        if ref != new:
+            diffs.append((i, "date_action", ref, new))
+    return diffs
+
+
+def benchmark(corpus: List[Dict], repeat: int = 200) -> Dict[str, float]:
+    from scraper import counts_from_text, date_action_from_texts
+
+    def timed(fn) -> float:
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - t0) / (repeat * max(len(corpus), 1)) * 1e6
+
+    return {
+        "reference_us_per_card": timed(lambda: [(counts_from_text(c["likeAria"], c["likeSpan"], c["cardText"]), date_action_from_texts(c["dateTexts"])) for c in corpus]),
+        "compiled_us_per_card": timed(lambda: [(parse_counts(c["cardText"], c["likeAria"], c["likeSpan"]), parse_date_action(c["dateTexts"])) for c in corpus]),
+        "batch_us_per_card": timed(lambda: (
+            parse_counts_batch((c["cardText"], c["likeAria"], c["likeSpan"]) for c in corpus),
+            parse_date_action_batch(c["dateTexts"] for c in corpus),
+        )),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the compiled text parser against scraper.py's reference helpers")
+    parser.add_argument("corpus", nargs="*", help="Saved {username}.cards.html files (default: the synthetic test fixture corpus)")
+    parser.add_argument("--repeat", type=int, default=200, help="Passes over the corpus per timing")
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus, source = load_corpus(args.corpus), "saved cards"
+    elif os.path.exists(FIXTURE_CORPUS):
+        corpus, source = load_corpus([FIXTURE_CORPUS]), "synthetic fixture corpus"
+    else:
+        corpus, source = SAMPLE_CORPUS, "synthetic built-in samples"
+    diffs = check_equivalence(corpus)
+    print(f"{len(corpus)} cards ({source}), {len(diffs)} mismatches")
+    for d in diffs[:20]:
+        print(f"  card {d[0]} {d[1]}: reference={d[2]!r} compiled={d[3]!r}")
+    for k, v in benchmark(corpus, args.repeat).items():
+        print(f"{k}: {v:.2f} ({source})")
+    if diffs:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()